@@ -0,0 +1,563 @@
+# File Name : benchmark.py
+# Benchmark merge SLiMS dengan dataset sintetis
+
+import mysql.connector
+from mysql.connector import Error
+import argparse
+import configparser
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+MERGER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database_merger.py')
+
+# Source dan target benchmark ada di satu server: tanpa server_side_merge=no hanya jalur
+# INSERT ... SELECT di server yang terukur, bukan jalur baca/tulis client
+MERGE_PATHS = {
+    'client': {'server_side_merge': 'no'},
+    'server': {'server_side_merge': 'yes'},
+}
+
+# Struktur tabel SLiMS (subset) yang dipakai DatabaseMerger.relations
+SCHEMA = [
+    """CREATE TABLE mst_gmd (
+  gmd_id int(11) NOT NULL AUTO_INCREMENT,
+  gmd_code varchar(3) DEFAULT NULL,
+  gmd_name varchar(30) NOT NULL,
+  input_date date DEFAULT NULL,
+  last_update date DEFAULT NULL,
+  PRIMARY KEY (gmd_id),
+  UNIQUE KEY gmd_name (gmd_name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE mst_language (
+  language_id char(5) NOT NULL,
+  language_name varchar(20) NOT NULL,
+  input_date date DEFAULT NULL,
+  last_update date DEFAULT NULL,
+  PRIMARY KEY (language_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE mst_publisher (
+  publisher_id int(11) NOT NULL AUTO_INCREMENT,
+  publisher_name varchar(100) NOT NULL,
+  input_date date DEFAULT NULL,
+  last_update date DEFAULT NULL,
+  PRIMARY KEY (publisher_id),
+  UNIQUE KEY publisher_name (publisher_name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE mst_place (
+  place_id int(11) NOT NULL AUTO_INCREMENT,
+  place_name varchar(30) NOT NULL,
+  input_date date DEFAULT NULL,
+  last_update date DEFAULT NULL,
+  PRIMARY KEY (place_id),
+  UNIQUE KEY place_name (place_name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE mst_author (
+  author_id int(11) NOT NULL AUTO_INCREMENT,
+  author_name varchar(100) NOT NULL,
+  author_year varchar(20) DEFAULT NULL,
+  authority_type enum('p','o','c') DEFAULT 'p',
+  auth_list varchar(20) DEFAULT NULL,
+  input_date date DEFAULT NULL,
+  last_update date DEFAULT NULL,
+  PRIMARY KEY (author_id),
+  UNIQUE KEY author_name (author_name,authority_type)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE mst_topic (
+  topic_id int(11) NOT NULL AUTO_INCREMENT,
+  topic varchar(50) NOT NULL,
+  topic_type enum('t','g','n','tm','gr','oc') NOT NULL,
+  auth_list varchar(20) DEFAULT NULL,
+  classification varchar(50) DEFAULT NULL,
+  input_date date DEFAULT NULL,
+  last_update date DEFAULT NULL,
+  PRIMARY KEY (topic_id),
+  UNIQUE KEY topic (topic,topic_type)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE user (
+  user_id int(11) NOT NULL AUTO_INCREMENT,
+  username varchar(50) NOT NULL,
+  realname varchar(100) NOT NULL,
+  passwd varchar(64) NOT NULL,
+  last_login datetime DEFAULT NULL,
+  input_date date DEFAULT NULL,
+  last_update date DEFAULT NULL,
+  PRIMARY KEY (user_id),
+  UNIQUE KEY username (username)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE member (
+  member_id varchar(20) NOT NULL,
+  member_name varchar(100) NOT NULL,
+  gender int(1) NOT NULL DEFAULT 0,
+  member_type_id int(6) DEFAULT NULL,
+  member_email varchar(100) DEFAULT NULL,
+  expire_date date NOT NULL,
+  input_date date DEFAULT NULL,
+  last_update date DEFAULT NULL,
+  PRIMARY KEY (member_id),
+  KEY member_name (member_name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE biblio (
+  biblio_id int(11) NOT NULL AUTO_INCREMENT,
+  gmd_id int(3) DEFAULT NULL,
+  title text NOT NULL,
+  isbn_issn varchar(20) DEFAULT NULL,
+  publisher_id int(11) DEFAULT NULL,
+  publish_year varchar(20) DEFAULT NULL,
+  language_id char(5) DEFAULT 'en',
+  publish_place_id int(11) DEFAULT NULL,
+  call_number varchar(50) DEFAULT NULL,
+  notes text,
+  input_date datetime DEFAULT NULL,
+  last_update datetime DEFAULT NULL,
+  uid int(11) DEFAULT NULL,
+  PRIMARY KEY (biblio_id),
+  KEY references_idx (gmd_id,publisher_id,language_id,publish_place_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE biblio_author (
+  biblio_id int(11) NOT NULL DEFAULT 0,
+  author_id int(11) NOT NULL DEFAULT 0,
+  level int(1) NOT NULL DEFAULT 1,
+  PRIMARY KEY (biblio_id,author_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE biblio_topic (
+  biblio_id int(11) NOT NULL DEFAULT 0,
+  topic_id int(11) NOT NULL DEFAULT 0,
+  level int(1) NOT NULL DEFAULT 1,
+  PRIMARY KEY (biblio_id,topic_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE item (
+  item_id int(11) NOT NULL AUTO_INCREMENT,
+  biblio_id int(11) DEFAULT NULL,
+  call_number varchar(50) DEFAULT NULL,
+  coll_type_id int(3) DEFAULT NULL,
+  item_code varchar(20) DEFAULT NULL,
+  location_id varchar(3) DEFAULT NULL,
+  item_status_id char(3) DEFAULT NULL,
+  input_date datetime DEFAULT NULL,
+  last_update datetime DEFAULT NULL,
+  uid int(11) DEFAULT NULL,
+  PRIMARY KEY (item_id),
+  UNIQUE KEY item_code (item_code),
+  KEY biblio_id_idx (biblio_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE loan (
+  loan_id int(11) NOT NULL AUTO_INCREMENT,
+  item_code varchar(20) DEFAULT NULL,
+  member_id varchar(20) DEFAULT NULL,
+  loan_date date NOT NULL,
+  due_date date NOT NULL,
+  is_return int(1) NOT NULL DEFAULT 0,
+  return_date date DEFAULT NULL,
+  input_date datetime DEFAULT NULL,
+  last_update datetime DEFAULT NULL,
+  PRIMARY KEY (loan_id),
+  KEY item_code (item_code),
+  KEY member_id (member_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE fines (
+  fines_id int(11) NOT NULL AUTO_INCREMENT,
+  fines_date date NOT NULL,
+  member_id varchar(20) NOT NULL,
+  debet int(11) DEFAULT 0,
+  credit int(11) DEFAULT 0,
+  description varchar(255) DEFAULT NULL,
+  PRIMARY KEY (fines_id),
+  KEY member_id (member_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE files (
+  file_id int(11) NOT NULL AUTO_INCREMENT,
+  file_title text NOT NULL,
+  file_name text NOT NULL,
+  mime_type varchar(100) DEFAULT NULL,
+  uploader_id int(11) NOT NULL,
+  input_date datetime NOT NULL,
+  last_update datetime NOT NULL,
+  PRIMARY KEY (file_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE biblio_attachment (
+  biblio_id int(11) NOT NULL,
+  file_id int(11) NOT NULL,
+  access_type enum('public','private') NOT NULL,
+  KEY biblio_id (biblio_id),
+  KEY file_id (file_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4""",
+]
+
+# Rasio jumlah baris terhadap jumlah biblio per source (perkiraan katalog SLiMS)
+RATIOS = {
+    'mst_publisher': 0.02,
+    'mst_place': 0.005,
+    'mst_author': 0.4,
+    'mst_topic': 0.05,
+    'member': 0.15,
+    'item': 1.8,
+    'files': 0.02,
+}
+LOANS_PER_ITEM = 1.2
+FINES_PER_MEMBER = 0.3
+AUTHORS_PER_BIBLIO = (1, 3)
+TOPICS_PER_BIBLIO = (0, 3)
+
+# Kata untuk nama/judul; nama master diambil dari pool bersama agar
+# sebagian muncul di beberapa source (seperti katalog antar cabang)
+WORDS = [
+    'sejarah', 'pengantar', 'ilmu', 'perpustakaan', 'informasi', 'ekonomi', 'hukum',
+    'pendidikan', 'matematika', 'fisika', 'kimia', 'biologi', 'bahasa', 'sastra',
+    'indonesia', 'dasar', 'teori', 'praktik', 'manajemen', 'sistem', 'komputer',
+    'jaringan', 'data', 'analisis', 'metode', 'penelitian', 'kebijakan', 'sosial',
+]
+FIRST_NAMES = [
+    'Agus', 'Budi', 'Citra', 'Dewi', 'Eko', 'Fitri', 'Gita', 'Hadi', 'Indah', 'Joko',
+    'Kartika', 'Lestari', 'Made', 'Nur', 'Putri', 'Rahmat', 'Sari', 'Tono', 'Wati', 'Yusuf',
+]
+LAST_NAMES = [
+    'Santoso', 'Wijaya', 'Saputra', 'Hidayat', 'Kusuma', 'Pratama', 'Nugroho', 'Setiawan',
+    'Purnomo', 'Siregar', 'Nasution', 'Lubis', 'Sembiring', 'Harahap', 'Simanjuntak',
+]
+
+
+def master_name(index):
+    """Nama deterministik ke-index dari pool bersama"""
+    first = FIRST_NAMES[index % len(FIRST_NAMES)]
+    last = LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)]
+    return f"{last}, {first} {index // (len(FIRST_NAMES) * len(LAST_NAMES))}"
+
+
+def sample_pool(rng, count, overlap=0.5):
+    """Ambil count indeks unik dari pool bersama; makin besar overlap, makin banyak yang sama antar source"""
+    pool_size = max(count, int(count / overlap)) if overlap else count * 1000
+    return rng.sample(range(pool_size), count)
+
+
+class DatasetGenerator:
+    """Pembuat database SLiMS sintetis dengan rasio antar tabel yang realistis"""
+
+    def __init__(self, server, biblio_rows, seed=42, insert_rows=2000):
+        self.server = server
+        self.biblio_rows = biblio_rows
+        self.seed = seed
+        self.insert_rows = insert_rows
+
+    def count(self, table_name):
+        return max(1, int(self.biblio_rows * RATIOS[table_name]))
+
+    def generate(self, database, source_index):
+        """Buat ulang satu database source dan isi semua tabel"""
+        rng = random.Random(self.seed * 1000 + source_index)
+        prefix = f"S{source_index}"
+        started = time.perf_counter()
+
+        conn = mysql.connector.connect(**self.server)
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"DROP DATABASE IF EXISTS `{database}`")
+            cursor.execute(f"CREATE DATABASE `{database}` CHARACTER SET utf8mb4")
+            cursor.execute(f"USE `{database}`")
+            cursor.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+            for create_stmt in SCHEMA:
+                cursor.execute(create_stmt)
+
+            today = date.today()
+            now = datetime.now().replace(microsecond=0)
+            n_biblio = self.biblio_rows
+            n_publisher = self.count('mst_publisher')
+            n_place = self.count('mst_place')
+            n_author = self.count('mst_author')
+            n_topic = self.count('mst_topic')
+            n_member = self.count('member')
+            n_item = self.count('item')
+            n_files = self.count('files')
+            n_user = 5 + n_biblio // 20000
+
+            self.insert(cursor, conn, 'mst_gmd', ['gmd_code', 'gmd_name', 'input_date', 'last_update'], (
+                (f"G{i:02d}", f"GMD {i}", today, today) for i in range(10)
+            ))
+            self.insert(cursor, conn, 'mst_language', ['language_id', 'language_name', 'input_date', 'last_update'], (
+                (code, name, today, today)
+                for code, name in [('id', 'Indonesia'), ('en', 'English'), ('ar', 'Arab'), ('jv', 'Jawa'), ('su', 'Sunda')]
+            ))
+            self.insert(cursor, conn, 'mst_publisher', ['publisher_name', 'input_date', 'last_update'], (
+                (f"Penerbit {master_name(i)}", today, today) for i in sample_pool(rng, n_publisher)
+            ))
+            self.insert(cursor, conn, 'mst_place', ['place_name', 'input_date', 'last_update'], (
+                (f"Kota {i}", today, today) for i in sample_pool(rng, n_place)
+            ))
+            self.insert(cursor, conn, 'mst_author', ['author_name', 'authority_type', 'input_date', 'last_update'], (
+                (master_name(i), 'p', today, today) for i in sample_pool(rng, n_author)
+            ))
+            self.insert(cursor, conn, 'mst_topic', ['topic', 'topic_type', 'input_date', 'last_update'], (
+                (f"{WORDS[i % len(WORDS)]} {i}", 't', today, today) for i in sample_pool(rng, n_topic)
+            ))
+            self.insert(cursor, conn, 'user', ['username', 'realname', 'passwd', 'input_date', 'last_update'], (
+                (f"{prefix.lower()}_admin{i}", master_name(i), 'x' * 60, today, today) for i in range(n_user)
+            ))
+            self.insert(cursor, conn, 'member', ['member_id', 'member_name', 'gender', 'member_type_id',
+                                                 'member_email', 'expire_date', 'input_date', 'last_update'], (
+                (f"{prefix}M{i:07d}", master_name(rng.randrange(n_member * 10)), rng.randint(0, 1), rng.randint(1, 3),
+                 f"anggota{i}@{prefix.lower()}.example", today + timedelta(days=365), today, today)
+                for i in range(n_member)
+            ))
+            self.insert(cursor, conn, 'biblio', ['gmd_id', 'title', 'isbn_issn', 'publisher_id', 'publish_year',
+                                                 'language_id', 'publish_place_id', 'call_number', 'notes',
+                                                 'input_date', 'last_update', 'uid'], (
+                (rng.randint(1, 10), ' '.join(rng.choices(WORDS, k=rng.randint(2, 8))).title(),
+                 f"978{rng.randrange(10 ** 10):010d}", rng.randint(1, n_publisher), str(rng.randint(1970, 2025)),
+                 rng.choice(['id', 'id', 'id', 'en', 'ar']), rng.randint(1, n_place),
+                 f"{rng.randint(0, 999):03d}.{rng.randint(0, 99)}", None if rng.random() < 0.7 else ' '.join(rng.choices(WORDS, k=30)),
+                 now, now, rng.randint(1, n_user))
+                for _ in range(n_biblio)
+            ))
+            self.insert(cursor, conn, 'biblio_author', ['biblio_id', 'author_id', 'level'], (
+                (biblio_id, author_id, level + 1)
+                for biblio_id in range(1, n_biblio + 1)
+                for level, author_id in enumerate(rng.sample(range(1, n_author + 1), min(n_author, rng.randint(*AUTHORS_PER_BIBLIO))))
+            ))
+            self.insert(cursor, conn, 'biblio_topic', ['biblio_id', 'topic_id', 'level'], (
+                (biblio_id, topic_id, 1)
+                for biblio_id in range(1, n_biblio + 1)
+                for topic_id in rng.sample(range(1, n_topic + 1), min(n_topic, rng.randint(*TOPICS_PER_BIBLIO)))
+            ))
+            self.insert(cursor, conn, 'item', ['biblio_id', 'call_number', 'coll_type_id', 'item_code', 'location_id',
+                                               'item_status_id', 'input_date', 'last_update', 'uid'], (
+                (rng.randint(1, n_biblio), None, rng.randint(1, 3), f"{prefix}B{i:08d}", 'SL', '0', now, now, 1)
+                for i in range(n_item)
+            ))
+            self.insert(cursor, conn, 'loan', ['item_code', 'member_id', 'loan_date', 'due_date', 'is_return',
+                                               'return_date', 'input_date', 'last_update'], (
+                self.loan_row(rng, prefix, n_item, n_member, today)
+                for _ in range(int(n_item * LOANS_PER_ITEM))
+            ))
+            self.insert(cursor, conn, 'fines', ['fines_date', 'member_id', 'debet', 'credit', 'description'], (
+                (today - timedelta(days=rng.randint(0, 700)), f"{prefix}M{rng.randrange(n_member):07d}",
+                 rng.choice([500, 1000, 2000]), 0, 'Denda keterlambatan')
+                for _ in range(int(n_member * FINES_PER_MEMBER))
+            ))
+            self.insert(cursor, conn, 'files', ['file_title', 'file_name', 'mime_type', 'uploader_id',
+                                                'input_date', 'last_update'], (
+                (f"Lampiran {i}", f"lampiran_{prefix.lower()}_{i}.pdf", 'application/pdf', 1, now, now)
+                for i in range(n_files)
+            ))
+            self.insert(cursor, conn, 'biblio_attachment', ['biblio_id', 'file_id', 'access_type'], (
+                (rng.randint(1, n_biblio), file_id, 'public') for file_id in range(1, n_files + 1)
+            ))
+        finally:
+            cursor.close()
+            conn.close()
+
+        print(f"  {database}: {n_biblio} biblio, {n_item} item dibuat dalam {time.perf_counter() - started:.1f} detik")
+
+    @staticmethod
+    def loan_row(rng, prefix, n_item, n_member, today):
+        loan_date = today - timedelta(days=rng.randint(0, 1500))
+        returned = rng.random() < 0.9
+        return (
+            f"{prefix}B{rng.randrange(n_item):08d}", f"{prefix}M{rng.randrange(n_member):07d}",
+            loan_date, loan_date + timedelta(days=7), int(returned),
+            loan_date + timedelta(days=rng.randint(1, 14)) if returned else None, loan_date, loan_date
+        )
+
+    def insert(self, cursor, conn, table_name, columns, rows):
+        """Insert multi-row per insert_rows baris, commit per batch"""
+        query = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.insert_rows:
+                cursor.executemany(query, batch)
+                conn.commit()
+                batch = []
+        if batch:
+            cursor.executemany(query, batch)
+            conn.commit()
+
+
+def write_merge_config(path, server, sources, target, merge_options):
+    """Tulis file konfigurasi DatabaseMerger untuk database benchmark"""
+    config = configparser.ConfigParser()
+    endpoint = {
+        'host': server['host'], 'user': server['user'],
+        'password': server['password'], 'port': str(server['port']),
+    }
+    config['TARGET'] = {**endpoint, 'database': target}
+    for index, database in enumerate(sources, 1):
+        config[f'SOURCE_{index}'] = {**endpoint, 'database': database}
+    config['MERGE'] = merge_options
+    with open(path, 'w') as f:
+        config.write(f)
+
+
+def run_benchmark(args):
+    """Jalankan run_merge untuk setiap jalur merge dan kumpulkan hasil per fase"""
+    return {
+        'params': {
+            'sources': args.sources, 'biblio': args.biblio, 'seed': args.seed,
+            'merge': args.merge_option, 'paths': args.paths,
+        },
+        'runs': {path: run_merge_path(args, path) for path in args.paths},
+    }
+
+
+def run_merge_path(args, path):
+    """Satu merge penuh ke target baru dengan jalur merge tertentu (lihat MERGE_PATHS)"""
+    work_dir = tempfile.mkdtemp(prefix=f'slims_bench_{path}_')
+    config_path = os.path.join(work_dir, 'benchmark_config.ini')
+    metrics_path = os.path.join(work_dir, 'metrics.json')
+
+    merge_options = dict(option.split('=', 1) for option in args.merge_option)
+    merge_options.update(MERGE_PATHS[path])
+    merge_options.update({
+        'metrics_file': metrics_path,
+        'journal_file': os.path.join(work_dir, 'merge_journal.sqlite'),
+    })
+    sources = [f"{args.prefix}_{i}" for i in range(1, args.sources + 1)]
+    write_merge_config(config_path, args.server, sources, f"{args.prefix}_merged", merge_options)
+
+    # Proses terpisah: peak RSS merge tidak tercampur memori pembuatan dataset.
+    # Exit status bukan 0 bila ada unit gagal atau verifikasi MISSING/MISMATCH/ERROR
+    print(f"\nMerge jalur {path} ({', '.join(f'{k}={v}' for k, v in MERGE_PATHS[path].items())})...")
+    subprocess.run([sys.executable, MERGER_SCRIPT, '--config', config_path], check=True)
+
+    with open(metrics_path) as f:
+        metrics = json.load(f)
+
+    rows_read = sum(table['rows_read'] for table in metrics['tables'])
+    rows_written = sum(table['inserted'] for table in metrics['tables'])
+    phases = {}
+    for name, seconds in metrics['phases'].items():
+        phases[name] = {
+            'seconds': seconds,
+            'peak_memory_mb': metrics['peak_memory_mb'].get(name),
+            'memory_growth_mb': metrics.get('memory_growth_mb', {}).get(name),
+        }
+    if phases.get('merge', {}).get('seconds'):
+        phases['merge']['rows_per_second'] = round(rows_read / phases['merge']['seconds'], 1)
+
+    return {
+        'started_at': metrics['started_at'],
+        'total_seconds': metrics['total_seconds'],
+        'rows_read': rows_read,
+        'rows_written': rows_written,
+        'phases': phases,
+    }
+
+
+def compare_with_baseline(result, baseline, tolerance, min_seconds=0.5):
+    """Bandingkan hasil dengan baseline; daftar regresi (kosong jika aman), None jika tidak sebanding"""
+    if baseline['params'] != result['params']:
+        print("Parameter benchmark berbeda dengan baseline, hasil tidak bisa dibandingkan")
+        print(f"  baseline: {baseline['params']}")
+        print(f"  sekarang: {result['params']}")
+        return None
+
+    regressions = []
+    print("\nPerbandingan dengan baseline:")
+    # Memori adalah peak RSS proses merge sampai akhir fase (kumulatif, bukan per fase)
+    print("Phase".ljust(24) + "Baseline".ljust(12) + "Sekarang".ljust(12) + "Selisih".ljust(10) + "Peak RSS (MB)")
+    print("-" * 72)
+
+    phases = [
+        (f"{path}/{name}", base, result['runs'][path]['phases'].get(name))
+        for path, run in baseline['runs'].items()
+        for name, base in run['phases'].items()
+    ]
+    for name, base, current in phases:
+        if current is None:
+            continue
+        change = (current['seconds'] - base['seconds']) / base['seconds'] if base['seconds'] else 0.0
+        print(
+            f"{name.ljust(24)}{base['seconds']:<12.2f}{current['seconds']:<12.2f}{change:<+10.0%}"
+            f"{base.get('peak_memory_mb')} -> {current.get('peak_memory_mb')}"
+        )
+
+        # Fase yang sangat singkat terlalu terpengaruh noise untuk dibandingkan
+        if change > tolerance and current['seconds'] - base['seconds'] > min_seconds:
+            regressions.append(f"{name}: {base['seconds']:.2f}s -> {current['seconds']:.2f}s ({change:+.0%})")
+        base_rate = base.get('rows_per_second')
+        rate = current.get('rows_per_second')
+        if base_rate and rate and rate < base_rate * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base_rate:.0f} -> {rate:.0f} baris/detik")
+        base_memory = base.get('peak_memory_mb')
+        memory = current.get('peak_memory_mb')
+        if base_memory and memory and memory > base_memory * (1 + tolerance):
+            regressions.append(f"{name}: peak memory {base_memory} -> {memory} MB")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark merge database SLiMS dengan dataset sintetis")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=3306)
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--password', default='root')
+    parser.add_argument('--prefix', default='bench_slims', help="awalan nama database benchmark")
+    parser.add_argument('--sources', type=int, default=3, help="jumlah database source (default: 3)")
+    parser.add_argument('--biblio', type=int, default=10000, help="jumlah biblio per source (default: 10000)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skip-generate', action='store_true', help="pakai database source yang sudah dibuat sebelumnya")
+    parser.add_argument('--merge-option', action='append', default=[], metavar='KEY=VALUE',
+                        help="opsi [MERGE] untuk run_merge, mis. workers=8 (boleh berulang)")
+    parser.add_argument('--path', dest='paths', action='append', choices=sorted(MERGE_PATHS),
+                        help="jalur merge yang diukur: client dan/atau server (default: keduanya)")
+    parser.add_argument('--output', default='benchmark_result.json', help="file hasil benchmark")
+    parser.add_argument('--baseline', default='benchmark_baseline.json', help="file baseline untuk perbandingan")
+    parser.add_argument('--save-baseline', action='store_true', help="simpan hasil sebagai baseline baru")
+    parser.add_argument('--tolerance', type=float, default=0.15, help="batas regresi relatif (default: 0.15)")
+    args = parser.parse_args()
+    args.server = {'host': args.host, 'port': args.port, 'user': args.user, 'password': args.password}
+    args.paths = args.paths or list(MERGE_PATHS)
+
+    try:
+        if not args.skip_generate:
+            print(f"Membuat {args.sources} database sintetis ({args.biblio} biblio per source)...")
+            generator = DatasetGenerator(args.server, args.biblio, args.seed)
+            for index in range(1, args.sources + 1):
+                generator.generate(f"{args.prefix}_{index}", index)
+
+        result = run_benchmark(args)
+    except (Error, subprocess.CalledProcessError) as e:
+        print(f"Error benchmark: {e}")
+        return 1
+
+    with open(args.output, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"\nHasil benchmark disimpan di {args.output}")
+    for path, run in result['runs'].items():
+        print(
+            f"  {path}: {run['rows_read']} baris dibaca, {run['rows_written']} ditulis "
+            f"dalam {run['total_seconds']:.1f} detik"
+        )
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"Baseline disimpan di {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"Baseline {args.baseline} belum ada; jalankan dengan --save-baseline")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare_with_baseline(result, baseline, args.tolerance)
+    if regressions is None:
+        return 2
+    if regressions:
+        print("\nREGRESI terdeteksi:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print("\nTidak ada regresi terhadap baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
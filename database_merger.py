@@ -5,43 +5,912 @@
 
 import mysql.connector
 from mysql.connector import Error
+import argparse
+import bisect
 import configparser
+import csv
+import gzip
+import heapq
+import json
 import os
-from datetime import datetime
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import closing, contextmanager
+from itertools import islice
+from queue import Queue, Empty, Full
+from datetime import datetime, date, time as dt_time, timedelta
+from mysql.connector import errorcode
+from mysql.connector.errors import PoolError
+
+try:
+    import resource
+except ImportError:  # Windows: peak memory tidak dicatat
+    resource = None
+
+class PooledConnection:
+    """Proxy koneksi dari ConnectionPool; close() mengembalikan koneksi ke pool"""
+    
+    def __init__(self, pool, conn, query=False):
+        self._pool = pool
+        self._conn = conn
+        # Slot max_queries host yang dipegang sampai close() (lihat ConnectionPool.get_connection)
+        self._query = query
+        # Statement untuk mengembalikan variabel sesi sebelum koneksi dipakai ulang
+        # (bukan reset_session agar method MySQLConnection.reset_session tidak tertutup)
+        self.reset_statement = None
+    
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise PoolError("Koneksi sudah dikembalikan ke pool")
+        return getattr(self._conn, name)
+    
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            try:
+                self._pool.release(conn, self.reset_statement)
+            finally:
+                if self._query:
+                    self._pool.limiter.release_query()
+
+class HostLimiter:
+    """Batas koneksi dan query berat bersamaan ke satu host MySQL (0 = tidak dibatasi)
+    
+    Slot koneksi bisa diambil beberapa sekaligus secara atomik, sehingga
+    unit yang membutuhkan koneksi source dan target di host yang sama tidak
+    saling menunggu (deadlock) dengan unit lain. Setiap koneksi terbuka,
+    termasuk yang idle di pool, memegang satu slot koneksi; bila host
+    penuh, koneksi idle di pool host ini ditutup lebih dulu.
+    """
+    
+    def __init__(self, max_connections=0, max_queries=0, timeout=300):
+        self.max_connections = max_connections
+        self.max_queries = max_queries
+        self.timeout = timeout
+        self._connections = 0
+        self._queries = 0
+        self._condition = threading.Condition()
+        self._pools = []
+    
+    def add_pool(self, pool):
+        """Daftarkan pool yang koneksi idle-nya boleh ditutup saat host penuh"""
+        with self._condition:
+            self._pools.append(pool)
+    
+    def _reserve_connections(self, count):
+        # Dipanggil dengan _condition terkunci (RLock): evict_idle melepas slot lewat release_connections
+        excess = self._connections + count - self.max_connections
+        for pool in self._pools:
+            if excess <= 0:
+                break
+            excess -= pool.evict_idle(excess)
+        if self._connections + count > self.max_connections:
+            return False
+        self._connections += count
+        return True
+    
+    def acquire_connections(self, count=1):
+        if not self.max_connections:
+            return
+        if count > self.max_connections:
+            # Tidak akan pernah terpenuhi; gagal langsung daripada menunggu timeout
+            raise PoolError(f"Butuh {count} koneksi sekaligus, batas host hanya {self.max_connections}")
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._reserve_connections(count), timeout=self.timeout):
+                raise PoolError(
+                    f"Batas {self.max_connections} koneksi per host tercapai lebih dari {self.timeout} detik"
+                )
+    
+    def release_connections(self, count=1):
+        if not self.max_connections:
+            return
+        with self._condition:
+            self._connections -= count
+            self._condition.notify_all()
+    
+    def try_acquire_query(self):
+        """Ambil satu slot query tanpa menunggu; False jika host sedang penuh"""
+        with self._condition:
+            if self.max_queries and self._queries >= self.max_queries:
+                return False
+            self._queries += 1
+            return True
+    
+    def acquire_query(self):
+        """Ambil satu slot query, menunggu sampai timeout bila host sedang penuh"""
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: not self.max_queries or self._queries < self.max_queries, timeout=self.timeout
+            ):
+                raise PoolError(
+                    f"Batas {self.max_queries} query per host tercapai lebih dari {self.timeout} detik"
+                )
+            self._queries += 1
+    
+    def release_query(self):
+        with self._condition:
+            self._queries -= 1
+            self._condition.notify_all()
+
+class ConnectionPool:
+    """Pool koneksi MySQL untuk satu endpoint (host, port, user, database)"""
+    
+    def __init__(self, db_config, max_size=5, health_check_interval=30, timeout=300, limiter=None):
+        self.db_config = dict(db_config)
+        self.max_size = max_size
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+        self.limiter = limiter or HostLimiter()
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self.limiter.add_pool(self)
+    
+    def get_connection(self, reserved=False, query=False):
+        """Ambil koneksi idle yang sehat, atau buat baru jika pool belum penuh
+        
+        reserved=True berarti slot koneksi host sudah diambil pemanggil
+        (lihat DatabaseMerger.get_connections). Slot itu dipakai koneksi
+        baru; koneksi idle sudah memegang slot sendiri sehingga slot yang
+        diambil dilepas lagi. query=True juga mengambil slot max_queries
+        host (menunggu bila penuh) yang dilepas saat koneksi di-close().
+        """
+        if query:
+            self.limiter.acquire_query()
+        try:
+            if not reserved:
+                self.limiter.acquire_connections()
+            if not self._slots.acquire(timeout=self.timeout):
+                self.limiter.release_connections()
+                raise PoolError(
+                    f"Pool {self.db_config.get('database', 'unknown')} penuh "
+                    f"({self.max_size} koneksi) lebih dari {self.timeout} detik"
+                )
+        except BaseException:
+            if query:
+                self.limiter.release_query()
+            raise
+        
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    conn, last_used = self._idle.pop()
+                
+                if self.is_healthy(conn, last_used):
+                    self.limiter.release_connections()
+                    return PooledConnection(self, conn, query)
+                self._discard(conn)
+            
+            return PooledConnection(self, mysql.connector.connect(**self.db_config), query)
+        except BaseException:
+            self._slots.release()
+            self.limiter.release_connections()
+            if query:
+                self.limiter.release_query()
+            raise
+    
+    def is_healthy(self, conn, last_used):
+        """Health check: ping koneksi yang sudah lama menganggur"""
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Error:
+            return False
+    
+    def release(self, conn, reset_statement=None):
+        """Kembalikan koneksi ke pool; koneksi yang bermasalah dibuang
+        
+        Koneksi idle tetap memegang slot koneksi host sampai dibuang.
+        """
+        try:
+            if getattr(conn, 'unread_result', False):
+                # Sisa hasil streaming tidak bisa dipakai ulang dengan aman
+                self._discard(conn)
+                return
+            conn.rollback()
+            if reset_statement:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(reset_statement)
+                finally:
+                    cursor.close()
+            with self._lock:
+                self._idle.append((conn, time.monotonic()))
+        except Error:
+            self._discard(conn)
+        finally:
+            self._slots.release()
+    
+    def _discard(self, conn):
+        """Tutup koneksi dan lepas slot koneksi host-nya"""
+        try:
+            conn.close()
+        except Error:
+            pass
+        finally:
+            self.limiter.release_connections()
+    
+    def evict_idle(self, count):
+        """Tutup sampai count koneksi idle (yang paling lama menganggur dulu); jumlah yang ditutup"""
+        with self._lock:
+            evicted = [self._idle.popleft()[0] for _ in range(min(count, len(self._idle)))]
+        for conn in evicted:
+            self._discard(conn)
+        return len(evicted)
+    
+    def close_all(self):
+        """Tutup semua koneksi idle"""
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn, _ in idle:
+            self._discard(conn)
+
+class IdSegments:
+    """Pemetaan ID source ke ID target dalam beberapa rentang (low, high] dengan shift masing-masing
+    
+    Merge penuh menghasilkan satu rentang per (tabel, source). Setiap merge
+    inkremental menambah rentang baru untuk ID yang lahir setelah sync
+    terakhir, ditempatkan di atas ID tertinggi target.
+    """
+    
+    def __init__(self, segments):
+        self.segments = sorted(segments)
+        self._lows = [low for low, _, _ in self.segments]
+        self._shifts = [shift for _, _, shift in self.segments]
+    
+    def map(self, value):
+        index = max(bisect.bisect_left(self._lows, value) - 1, 0)
+        return value + self._shifts[index]
+
+class MergeJournal:
+    """Journal progres merge di file SQLite agar merge yang terputus bisa dilanjutkan
+    
+    Menyimpan offset yang dihitung merge_data beserta nilai MAX source
+    yang menjadi dasarnya, status setiap pasangan (source, tabel) atau
+    bagian rentang key-nya, dan key source terakhir yang sudah di-commit.
+    """
+    
+    VERSION = 2
+    
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < self.VERSION:
+            # Format progres lama (tanpa kolom part) tidak bisa dipakai untuk resume
+            self._conn.execute("DROP TABLE IF EXISTS progress")
+            self._conn.execute(f"PRAGMA user_version = {self.VERSION}")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE TABLE IF NOT EXISTS offsets (
+                table_name TEXT,
+                db_name TEXT,
+                offset INTEGER,
+                PRIMARY KEY (table_name, db_name)
+            );
+            CREATE TABLE IF NOT EXISTS max_values (
+                table_name TEXT PRIMARY KEY,
+                max_value INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS source_max_values (
+                db_name TEXT,
+                table_name TEXT,
+                max_value INTEGER,
+                PRIMARY KEY (db_name, table_name)
+            );
+            CREATE TABLE IF NOT EXISTS id_segments (
+                table_name TEXT,
+                db_name TEXT,
+                src_low INTEGER,
+                src_high INTEGER,
+                shift INTEGER,
+                PRIMARY KEY (table_name, db_name, src_low)
+            );
+            CREATE TABLE IF NOT EXISTS sync_marks (
+                db_name TEXT,
+                table_name TEXT,
+                high_water INTEGER,
+                synced_at TEXT,
+                PRIMARY KEY (db_name, table_name)
+            );
+            CREATE TABLE IF NOT EXISTS id_remap (
+                table_name TEXT,
+                db_name TEXT,
+                src_id INTEGER,
+                target_id INTEGER,
+                PRIMARY KEY (table_name, db_name, src_id)
+            );
+            CREATE TABLE IF NOT EXISTS progress (
+                db_name TEXT,
+                table_name TEXT,
+                part INTEGER DEFAULT 0,
+                status TEXT,
+                last_key INTEGER,
+                rows_done INTEGER DEFAULT 0,
+                inserted INTEGER DEFAULT 0,
+                skipped INTEGER DEFAULT 0,
+                updated_at TEXT,
+                PRIMARY KEY (db_name, table_name, part)
+            );
+        """)
+    
+    def reset(self, signature):
+        """Kosongkan journal untuk merge baru"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            for table in (
+                'meta', 'offsets', 'max_values', 'source_max_values',
+                'id_segments', 'sync_marks', 'id_remap', 'progress'
+            ):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._conn.execute("INSERT INTO meta VALUES ('signature', ?)", (signature,))
+            self._conn.execute("COMMIT")
+    
+    def get_meta(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def set_meta(self, key, value):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+    
+    def save_offsets(self, offsets, current_max_values, source_max_values=None):
+        """Simpan offset per (tabel, source), nilai maksimum gabungan dan MAX tiap source
+        
+        source_max_values: {(source, tabel): MAX} hasil analisis yang menjadi dasar offset.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO source_max_values VALUES (?, ?, ?)",
+                [
+                    (db_name, table_name, max_value)
+                    for (db_name, table_name), max_value in (source_max_values or {}).items()
+                ]
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO offsets VALUES (?, ?, ?)",
+                [
+                    (table_name, db_name, offset)
+                    for table_name, per_source in offsets.items()
+                    for db_name, offset in per_source.items()
+                ]
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO max_values VALUES (?, ?)",
+                list(current_max_values.items())
+            )
+            self._conn.execute("COMMIT")
+    
+    def load_offsets(self):
+        """Baca kembali offset dan nilai maksimum; (None, None) jika belum ada"""
+        with self._lock:
+            offset_rows = self._conn.execute("SELECT table_name, db_name, offset FROM offsets").fetchall()
+            max_rows = self._conn.execute("SELECT table_name, max_value FROM max_values").fetchall()
+        
+        if not max_rows:
+            return None, None
+        
+        offsets = {}
+        for table_name, db_name, offset in offset_rows:
+            offsets.setdefault(table_name, {})[db_name] = offset
+        return offsets, dict(max_rows)
+    
+    def load_source_max_values(self):
+        """MAX tiap (source, tabel) yang disimpan bersama offset: {(source, tabel): MAX}"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT db_name, table_name, max_value FROM source_max_values"
+            ).fetchall()
+        return {(db_name, table_name): max_value for db_name, table_name, max_value in rows}
+    
+    def save_segments(self, segments):
+        """Simpan seluruh pemetaan ID: {tabel: {source: [(low, high, shift), ...]}}"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM id_segments")
+            self._conn.executemany(
+                "INSERT INTO id_segments VALUES (?, ?, ?, ?, ?)",
+                [
+                    (table_name, db_name, low, high, shift)
+                    for table_name, per_source in segments.items()
+                    for db_name, ranges in per_source.items()
+                    for low, high, shift in ranges
+                ]
+            )
+            self._conn.execute("COMMIT")
+    
+    def load_segments(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT table_name, db_name, src_low, src_high, shift FROM id_segments "
+                "ORDER BY table_name, db_name, src_low"
+            ).fetchall()
+        segments = {}
+        for table_name, db_name, low, high, shift in rows:
+            segments.setdefault(table_name, {}).setdefault(db_name, []).append((low, high, shift))
+        return segments
+    
+    def save_remap(self, remap):
+        """Simpan pemetaan ID duplikat ke ID kanonik: {(tabel, source): {id_source: id_target}}"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM id_remap")
+            self._conn.executemany(
+                "INSERT INTO id_remap VALUES (?, ?, ?, ?)",
+                [
+                    (table_name, db_name, src_id, target_id)
+                    for (table_name, db_name), mapping in remap.items()
+                    for src_id, target_id in mapping.items()
+                ]
+            )
+            self._conn.execute("COMMIT")
+    
+    def load_remap(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT table_name, db_name, src_id, target_id FROM id_remap"
+            ).fetchall()
+        remap = {}
+        for table_name, db_name, src_id, target_id in rows:
+            remap.setdefault((table_name, db_name), {})[src_id] = target_id
+        return remap
+    
+    def save_sync_marks(self, marks):
+        """Simpan high-water mark per (source, tabel): {(db, tabel): (key_tertinggi, waktu_sync)}"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM sync_marks")
+            self._conn.executemany(
+                "INSERT INTO sync_marks VALUES (?, ?, ?, ?)",
+                [(db_name, table_name, high, synced_at) for (db_name, table_name), (high, synced_at) in marks.items()]
+            )
+            self._conn.execute("COMMIT")
+    
+    def load_sync_marks(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT db_name, table_name, high_water, synced_at FROM sync_marks"
+            ).fetchall()
+        return {(db_name, table_name): (high, synced_at) for db_name, table_name, high, synced_at in rows}
+    
+    def get_progress(self, db_name, table_name, part=0):
+        """Progres satu (source, tabel, bagian), None jika belum pernah dimulai"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, last_key, rows_done, inserted, skipped FROM progress "
+                "WHERE db_name = ? AND table_name = ? AND part = ?",
+                (db_name, table_name, part)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('status', 'last_key', 'rows_done', 'inserted', 'skipped'), row))
+    
+    def record_chunk(self, db_name, table_name, last_key, rows_done, inserted, skipped, status='running', part=0):
+        """Catat chunk yang sudah di-commit di target"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO progress VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    db_name, table_name, part, status, last_key, rows_done, inserted, skipped,
+                    datetime.now().isoformat(timespec='seconds')
+                )
+            )
+    
+    def mark_done(self, db_name, table_name, rows_done, inserted, skipped, part=0):
+        self.record_chunk(db_name, table_name, None, rows_done, inserted, skipped, status='done', part=part)
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class MergeMetrics:
+    """Metrik performa merge: waktu per fase dan statistik per (source, tabel)
+    
+    Dipakai bersama oleh semua worker, setiap pencatatan dilindungi lock.
+    Waktu baca/transform/tulis dijumlahkan per batch, sehingga tabel yang
+    dipecah menjadi beberapa rentang key dihitung dari total waktu sibuknya.
+    """
+    
+    FIELDS = [
+        'rows_read', 'inserted', 'skipped', 'bytes',
+        'read_seconds', 'transform_seconds', 'write_seconds'
+    ]
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._progress_stop = None
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self.phases = {}
+        self.peak_memory = {}
+        self.memory_growth = {}
+        self.tables = {}
+    
+    @staticmethod
+    def get_peak_memory_mb():
+        """Peak RSS proses sejauh ini (MB), None bila tidak tersedia"""
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux melaporkan KB, macOS byte
+        return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    
+    @contextmanager
+    def phase(self, name):
+        """Catat wall time satu fase (analysis, create_tables, merge, ...) dan memorinya
+        
+        ru_maxrss adalah peak proses sejak start, jadi peak_memory bersifat
+        kumulatif sampai akhir fase. memory_growth adalah kenaikan peak
+        selama fase itu (0 bila fase tidak melampaui peak sebelumnya).
+        """
+        started = time.perf_counter()
+        peak_before = self.get_peak_memory_mb()
+        try:
+            yield
+        finally:
+            peak = self.get_peak_memory_mb()
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+                self.peak_memory[name] = peak
+                if peak is not None:
+                    self.memory_growth[name] = round(
+                        self.memory_growth.get(name, 0.0) + peak - peak_before, 1
+                    )
+    
+    def record(self, db_name, table_name, **values):
+        """Tambahkan nilai metrik (lihat FIELDS) untuk satu (source, tabel)"""
+        with self._lock:
+            stats = self.tables.setdefault((db_name, table_name), dict.fromkeys(self.FIELDS, 0))
+            for field, value in values.items():
+                stats[field] += value
+    
+    def table_rows(self):
+        """Statistik per (source, tabel) beserta throughput baris per detik"""
+        with self._lock:
+            items = sorted((key, dict(stats)) for key, stats in self.tables.items())
+        
+        rows = []
+        for (db_name, table_name), stats in items:
+            busy = stats['read_seconds'] + stats['transform_seconds'] + stats['write_seconds']
+            for field in ('read_seconds', 'transform_seconds', 'write_seconds'):
+                stats[field] = round(stats[field], 3)
+            rows.append({
+                'source': db_name,
+                'table': table_name,
+                **stats,
+                'rows_per_second': round(stats['rows_read'] / busy, 1) if busy else None,
+            })
+        return rows
+    
+    def start_progress(self, interval):
+        """Cetak baris progres setiap interval detik sampai stop_progress dipanggil"""
+        self._progress_stop = threading.Event()
+        
+        def report(stop):
+            while not stop.wait(interval):
+                with self._lock:
+                    written = sum(stats['inserted'] for stats in self.tables.values())
+                    read = sum(stats['rows_read'] for stats in self.tables.values())
+                elapsed = time.perf_counter() - self._started
+                print(f"  [progres] {read} baris dibaca, {written} ditulis ({read / elapsed:.0f} baris/detik)")
+        
+        threading.Thread(target=report, args=(self._progress_stop,), daemon=True).start()
+    
+    def stop_progress(self):
+        if self._progress_stop:
+            self._progress_stop.set()
+            self._progress_stop = None
+    
+    def write_report(self, path):
+        """Simpan laporan ke JSON, atau CSV bila nama file berakhiran .csv"""
+        phases = {name: round(seconds, 3) for name, seconds in self.phases.items()}
+        tables = self.table_rows()
+        
+        if path.lower().endswith('.csv'):
+            # Kolom kind membedakan baris fase (wall time di kolom seconds) dari baris tabel
+            fieldnames = (
+                ['kind', 'phase', 'seconds', 'peak_memory_mb', 'memory_growth_mb', 'source', 'table']
+                + self.FIELDS + ['rows_per_second']
+            )
+            with open(path, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer.writeheader()
+                for name, seconds in phases.items():
+                    writer.writerow({
+                        'kind': 'phase',
+                        'phase': name,
+                        'seconds': seconds,
+                        'peak_memory_mb': self.peak_memory.get(name),
+                        'memory_growth_mb': self.memory_growth.get(name),
+                    })
+                writer.writerows({'kind': 'table', **row} for row in tables)
+        else:
+            with open(path, 'w') as f:
+                json.dump({
+                    'started_at': self.started_at.isoformat(sep=' ', timespec='seconds'),
+                    'total_seconds': round(time.perf_counter() - self._started, 3),
+                    'phases': phases,
+                    'peak_memory_mb': self.peak_memory,
+                    'memory_growth_mb': self.memory_growth,
+                    'tables': tables,
+                }, f, indent=2)
 
 class DatabaseMerger:
+    # Tabel master/referensi diproses lebih dulu, kemudian tabel utama
+    MASTER_TABLES = [
+        'mst_gmd', 'mst_author', 'mst_topic', 'mst_publisher', 'mst_language',
+        'mst_place', 'mst_coll_type', 'mst_location', 'mst_item_status',
+        'mst_member_type', 'user_group', 'mst_module', 'mst_carrier_type',
+        'mst_content_type', 'mst_media_type', 'mst_frequency', 'mst_label',
+        'mst_loan_rules', 'mst_relation_term', 'mst_servers', 'mst_supplier'
+    ]
+    MAIN_TABLES = [
+        'user', 'member', 'biblio', 'item', 'files', 'content'
+    ]
+    
+    # Tabel turunan yang bisa dibangun ulang di target: (tabel dasar, key, method builder SELECT)
+    DERIVED_TABLES = {
+        'search_biblio': ('biblio', 'biblio_id', 'build_search_biblio_select'),
+    }
+    
+    # Kolom search_biblio dari tabel master: (tabel master, kolom nama, key master, kolom FK di biblio)
+    SEARCH_BIBLIO_LOOKUPS = {
+        'gmd': ('mst_gmd', 'gmd_name', 'gmd_id', 'gmd_id'),
+        'publisher': ('mst_publisher', 'publisher_name', 'publisher_id', 'publisher_id'),
+        'publish_place': ('mst_place', 'place_name', 'place_id', 'publish_place_id'),
+        'language': ('mst_language', 'language_name', 'language_id', 'language_id'),
+        'carrier_type': ('mst_carrier_type', 'carrier_type', 'id', 'carrier_type_id'),
+        'content_type': ('mst_content_type', 'content_type', 'id', 'content_type_id'),
+        'media_type': ('mst_media_type', 'media_type', 'id', 'media_type_id'),
+    }
+    
+    # Kolom search_biblio berisi daftar nilai per biblio, dipisah ' - ' seperti indexer SLiMS:
+    # (tabel per biblio, tabel master atau None, kolom nilai, key master, kolom urutan atau None)
+    SEARCH_BIBLIO_LISTS = {
+        'author': ('biblio_author', 'mst_author', 'author_name', 'author_id', 'level'),
+        'topic': ('biblio_topic', 'mst_topic', 'topic', 'topic_id', 'level'),
+        'items': ('item', None, 'item_code', None, 'item_id'),
+        'location': ('item', 'mst_location', 'location_name', 'location_id', None),
+        'collection_types': ('item', 'mst_coll_type', 'coll_type_name', 'coll_type_id', None),
+    }
+    
+    # Nilai maksimum (signed) per tipe kolom auto increment untuk cek overflow offset
+    AUTO_INCREMENT_LIMITS = {
+        'tinyint': 2 ** 7 - 1,
+        'smallint': 2 ** 15 - 1,
+        'mediumint': 2 ** 23 - 1,
+        'int': 2 ** 31 - 1,
+        'integer': 2 ** 31 - 1,
+        'bigint': 2 ** 63 - 1,
+    }
+    
+    # Natural key tabel master untuk dedupe: baris dengan nilai (dinormalisasi) sama dianggap satu
+    DEDUPE_KEYS = {
+        'mst_author': ['author_name', 'authority_type'],
+        'mst_publisher': ['publisher_name'],
+        'mst_topic': ['topic', 'topic_type'],
+        'mst_place': ['place_name'],
+    }
+    
+    # Error MySQL yang disebabkan isi baris: hanya batch dengan error ini yang dipecah dua
+    ROW_ERRORS = {
+        errorcode.ER_DUP_ENTRY, errorcode.ER_DUP_ENTRY_WITH_KEY_NAME,
+        errorcode.ER_BAD_NULL_ERROR, errorcode.ER_NO_DEFAULT_FOR_FIELD,
+        errorcode.ER_NO_REFERENCED_ROW, errorcode.ER_NO_REFERENCED_ROW_2,
+        errorcode.ER_TRUNCATED_WRONG_VALUE, errorcode.ER_TRUNCATED_WRONG_VALUE_FOR_FIELD,
+        errorcode.ER_WARN_DATA_OUT_OF_RANGE, errorcode.WARN_DATA_TRUNCATED,
+        errorcode.ER_DATA_TOO_LONG, errorcode.ER_CHECK_CONSTRAINT_VIOLATED,
+    }
+    
+    # Error lock sementara: batch diulang utuh setelah jeda
+    RETRY_ERRORS = {errorcode.ER_LOCK_DEADLOCK, errorcode.ER_LOCK_WAIT_TIMEOUT}
+    
     def __init__(self, config_file='database_config.ini'):
         self.config_file = config_file
         self.databases = {}
         self.target_db = None
         self.auto_increment_tables = {}
         self.relations = {}
+        self.batch_size = 1000
+        self.max_allowed_packet = 4 * 1024 * 1024
+        self.fetch_size = 1000
+        self.net_write_timeout = 600
+        self.workers = 4
+        self.load_mode = 'insert'
+        self.infile_rows = 50000
+        self._load_mode_lock = threading.Lock()
+        self.infile_dir = None
+        self.server_side_merge = True
+        self.server_side_chunk = 100000
+        self.verify_chunk = 10000
+        self.verify_report_limit = 10
+        self.range_parts = 4
+        self.split_min_rows = 500000
+        self.page_size = 10000
+        self.fast_load = False
+        self.dedupe = False
+        self.pipeline_depth = 2
+        self.plan_rows_per_second = 20000
+        self.plan_mb_per_second = 10.0
+        self.metrics = MergeMetrics()
+        self.metrics_file = None
+        self.progress_interval = 0
+        self.replace_tables = set()
+        self.derived_tables = []
+        self.derived_chunk = 10000
+        self.export_dir = None
+        self.export_format = 'tsv'
+        self.export_shard_rows = 100000
+        self.export_shards = {}
+        self._export_lock = threading.Lock()
+        self.shard_progress = {}
+        self.reject_dir = 'rejects'
+        self._reject_lock = threading.Lock()
+        self.write_retries = 3
+        self.retry_delay = 0.5
+        self.id_remap = {}
+        self.index_workers = 2
+        self.deferred_indexes = {}
+        self.pool_size = None
+        self.pool_timeout = 300
+        self.health_check_interval = 30
+        self.pools = {}
+        self.host_limiters = {}
+        self.host_limits = {}
+        self.default_host_limits = (0, 0)
+        self.schema = {}
+        self.schema_cache = None
+        self.refresh_schema = False
+        self.schema_union_size = 200
+        self.journal_file = 'merge_journal.sqlite'
+        self.journal = None
+        self.resume = False
+        self.incremental = False
+        self._pools_lock = threading.Lock()
         
     def load_config(self):
         """Load konfigurasi database dari file"""
         config = configparser.ConfigParser()
         config.read(self.config_file)
         
-        # Konfigurasi database target
-        self.target_db = {
-            'host': config['TARGET']['host'],
-            'database': config['TARGET']['database'],
-            'user': config['TARGET']['user'],
-            'password': config['TARGET']['password'],
-            'port': config.getint('TARGET', 'port', fallback=3306)
+        # Konfigurasi database target (boleh tidak ada untuk --export)
+        if 'TARGET' in config:
+            self.target_db = {
+                'host': config['TARGET']['host'],
+                'database': config['TARGET']['database'],
+                'user': config['TARGET']['user'],
+                'password': config['TARGET']['password'],
+                'port': config.getint('TARGET', 'port', fallback=3306)
+            }
+        
+        # Konfigurasi database sumber: semua section SOURCE_<n>, urut nomor agar offset stabil
+        sections = sorted(
+            (int(match.group(1)), section)
+            for section in config.sections()
+            for match in [re.fullmatch(r'SOURCE_(\d+)', section)]
+            if match
+        )
+        for i, section in sections:
+            self.databases[f'source_{i}'] = {
+                'host': config[section]['host'],
+                'database': config[section]['database'],
+                'user': config[section]['user'],
+                'password': config[section]['password'],
+                'port': config.getint(section, 'port', fallback=3306)
+            }
+        
+        # Opsi proses merge
+        self.batch_size = config.getint('MERGE', 'batch_size', fallback=self.batch_size)
+        self.fetch_size = config.getint('MERGE', 'fetch_size', fallback=self.fetch_size)
+        self.net_write_timeout = config.getint('MERGE', 'net_write_timeout', fallback=self.net_write_timeout)
+        self.workers = max(1, config.getint('MERGE', 'workers', fallback=self.workers))
+        self.load_mode = config.get('MERGE', 'load_mode', fallback=self.load_mode).strip().lower()
+        self.infile_rows = config.getint('MERGE', 'infile_rows', fallback=self.infile_rows)
+        self.infile_dir = config.get('MERGE', 'infile_dir', fallback=self.infile_dir) or None
+        self.server_side_merge = config.getboolean('MERGE', 'server_side_merge', fallback=self.server_side_merge)
+        self.server_side_chunk = config.getint('MERGE', 'server_side_chunk', fallback=self.server_side_chunk)
+        self.verify_chunk = max(1, config.getint('MERGE', 'verify_chunk', fallback=self.verify_chunk))
+        self.range_parts = max(1, config.getint('MERGE', 'range_parts', fallback=self.range_parts))
+        self.split_min_rows = config.getint('MERGE', 'split_min_rows', fallback=self.split_min_rows)
+        self.page_size = config.getint('MERGE', 'page_size', fallback=self.page_size)
+        self.fast_load = config.getboolean('MERGE', 'fast_load', fallback=self.fast_load)
+        self.dedupe = config.getboolean('MERGE', 'dedupe', fallback=self.dedupe)
+        self.pipeline_depth = max(0, config.getint('MERGE', 'pipeline_depth', fallback=self.pipeline_depth))
+        self.plan_rows_per_second = config.getfloat('MERGE', 'plan_rows_per_second', fallback=self.plan_rows_per_second)
+        self.plan_mb_per_second = config.getfloat('MERGE', 'plan_mb_per_second', fallback=self.plan_mb_per_second)
+        self.metrics_file = config.get('MERGE', 'metrics_file', fallback='') or None
+        self.progress_interval = config.getint('MERGE', 'progress_interval', fallback=self.progress_interval)
+        self.replace_tables = {
+            table.strip()
+            for table in config.get('MERGE', 'replace_tables', fallback='').split(',')
+            if table.strip()
         }
+        self.reject_dir = config.get('MERGE', 'reject_dir', fallback=self.reject_dir)
+        self.write_retries = max(0, config.getint('MERGE', 'write_retries', fallback=self.write_retries))
+        self.retry_delay = config.getfloat('MERGE', 'retry_delay', fallback=self.retry_delay)
+        self.derived_tables = []
+        for table in config.get('MERGE', 'derived_tables', fallback='').split(','):
+            table = table.strip()
+            if not table:
+                continue
+            if table in self.DERIVED_TABLES:
+                self.derived_tables.append(table)
+            else:
+                print(f"derived_tables: '{table}' tidak bisa dibangun ulang, tetap disalin dari source")
+        self.derived_chunk = max(1, config.getint('MERGE', 'derived_chunk', fallback=self.derived_chunk))
+        self.index_workers = max(1, config.getint('MERGE', 'index_workers', fallback=self.index_workers))
+        if self.load_mode not in ('insert', 'infile'):
+            print(f"load_mode '{self.load_mode}' tidak dikenal, memakai 'insert'")
+            self.load_mode = 'insert'
+        if self.load_mode == 'infile' and self.target_db:
+            self.target_db['allow_local_infile'] = True
+        self.export_format = config.get('MERGE', 'export_format', fallback=self.export_format).strip().lower()
+        self.export_shard_rows = max(1, config.getint('MERGE', 'export_shard_rows', fallback=self.export_shard_rows))
+        if self.export_format not in ('tsv', 'sql'):
+            print(f"export_format '{self.export_format}' tidak dikenal, memakai 'tsv'")
+            self.export_format = 'tsv'
         
-        # Konfigurasi database sumber
-        for i in range(1, 4):
-            section = f'SOURCE_{i}'
-            if section in config:
-                self.databases[f'source_{i}'] = {
-                    'host': config[section]['host'],
-                    'database': config[section]['database'],
-                    'user': config[section]['user'],
-                    'password': config[section]['password'],
-                    'port': config.getint(section, 'port', fallback=3306)
-                }
+        # Opsi snapshot skema
+        self.schema_cache = config.get('MERGE', 'schema_cache', fallback=self.schema_cache) or None
+        self.refresh_schema = config.getboolean('MERGE', 'refresh_schema', fallback=self.refresh_schema)
+        
+        self.journal_file = config.get('MERGE', 'journal_file', fallback=self.journal_file) or None
+        
+        # Opsi connection pool; default cukup untuk satu koneksi per worker
+        self.pool_size = config.getint('POOL', 'pool_size', fallback=self.workers + 1)
+        self.pool_timeout = config.getint('POOL', 'timeout', fallback=self.pool_timeout)
+        self.health_check_interval = config.getint(
+            'POOL', 'health_check_interval', fallback=self.health_check_interval
+        )
+        
+        # Batas per host MySQL: [HOST_LIMITS] untuk default, [HOST_LIMITS <host>[:port]] per host
+        self.default_host_limits = (
+            config.getint('HOST_LIMITS', 'max_connections', fallback=0),
+            config.getint('HOST_LIMITS', 'max_queries', fallback=0)
+        )
+        for section in config.sections():
+            match = re.fullmatch(r'HOST_LIMITS\s+(\S+?)(?::(\d+))?', section)
+            if not match:
+                continue
+            endpoint = self.get_endpoint({'host': match.group(1), 'port': match.group(2) or 3306})
+            self.host_limits[endpoint] = (
+                config.getint(section, 'max_connections', fallback=self.default_host_limits[0]),
+                config.getint(section, 'max_queries', fallback=self.default_host_limits[1])
+            )
+        
+        # Satu unit merge memegang koneksi source dan target sekaligus; batas host
+        # di bawah kebutuhan satu unit membuat setiap unit gagal setelah timeout
+        needed = {}
+        for db_config in self.databases.values():
+            endpoints = [self.get_endpoint(db_config)]
+            if self.target_db:
+                endpoints.append(self.get_endpoint(self.target_db))
+            for endpoint in endpoints:
+                needed[endpoint] = max(needed.get(endpoint, 0), endpoints.count(endpoint))
+        for endpoint, count in needed.items():
+            max_connections, max_queries = self.host_limits.get(endpoint, self.default_host_limits)
+            if 0 < max_connections < count:
+                print(
+                    f"max_connections {max_connections} untuk host {endpoint[0]}:{endpoint[1]} "
+                    f"terlalu kecil (satu unit butuh {count} koneksi), memakai {count}"
+                )
+                self.host_limits[endpoint] = (count, max_queries)
     
     def create_target_database(self):
         """Membuat database target jika belum ada"""
@@ -63,55 +932,312 @@ class DatabaseMerger:
         except Error as e:
             print(f"Error creating database: {e}")
     
-    def get_connection(self, db_config):
-        """Membuat koneksi ke database"""
+    def get_pool(self, db_config):
+        """Mendapatkan pool untuk endpoint db_config, dibuat saat pertama dipakai"""
+        key = (
+            db_config.get('host'), db_config.get('port'),
+            db_config.get('user'), db_config.get('database')
+        )
+        with self._pools_lock:
+            pool = self.pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(
+                    db_config,
+                    max_size=self.pool_size or self.workers + 1,
+                    health_check_interval=self.health_check_interval,
+                    timeout=self.pool_timeout,
+                    limiter=self._get_host_limiter(self.get_endpoint(db_config))
+                )
+                self.pools[key] = pool
+            return pool
+    
+    def get_host_limiter(self, endpoint):
+        """HostLimiter bersama untuk semua database di satu host (host, port)"""
+        with self._pools_lock:
+            return self._get_host_limiter(endpoint)
+    
+    def _get_host_limiter(self, endpoint):
+        limiter = self.host_limiters.get(endpoint)
+        if limiter is None:
+            max_connections, max_queries = self.host_limits.get(endpoint, self.default_host_limits)
+            limiter = HostLimiter(max_connections, max_queries, timeout=self.pool_timeout)
+            self.host_limiters[endpoint] = limiter
+        return limiter
+    
+    def get_connection(self, db_config, query=False):
+        """Mengambil koneksi dari pool endpoint database
+        
+        query=True untuk query berat di luar unit merge (introspeksi,
+        dedupe, verifikasi): koneksi memegang satu slot max_queries host
+        sampai di-close().
+        """
         try:
-            conn = mysql.connector.connect(**db_config)
-            return conn
+            return self.get_pool(db_config).get_connection(query=query)
         except Error as e:
             print(f"Error connecting to database {db_config.get('database', 'unknown')}: {e}")
             return None
     
+    def get_connections(self, *db_configs):
+        """Mengambil beberapa koneksi sekaligus (mis. source dan target)
+        
+        Slot koneksi tiap host diambil secara atomik dengan urutan host yang
+        tetap, sehingga unit yang source dan target-nya satu host tidak bisa
+        saling mengunci dengan unit lain. Koneksi yang gagal bernilai None.
+        """
+        counts = {}
+        for db_config in db_configs:
+            endpoint = self.get_endpoint(db_config)
+            counts[endpoint] = counts.get(endpoint, 0) + 1
+        
+        reserved = []
+        for endpoint in sorted(counts):
+            try:
+                self.get_host_limiter(endpoint).acquire_connections(counts[endpoint])
+            except Error as e:
+                for other in reserved:
+                    self.get_host_limiter(other).release_connections(counts[other])
+                print(f"Error connecting to host {endpoint[0]}:{endpoint[1]}: {e}")
+                return [None] * len(db_configs)
+            reserved.append(endpoint)
+        
+        connections = []
+        for db_config in db_configs:
+            try:
+                connections.append(self.get_pool(db_config).get_connection(reserved=True))
+            except Error as e:
+                # Slot milik koneksi ini sudah dilepas oleh pool
+                print(f"Error connecting to database {db_config.get('database', 'unknown')}: {e}")
+                connections.append(None)
+        return connections
+    
+    def close_pools(self):
+        """Menutup semua koneksi di semua pool"""
+        with self._pools_lock:
+            pools = list(self.pools.values())
+            self.pools.clear()
+        for pool in pools:
+            pool.close_all()
+    
+    def introspect_source(self, db_name, db_config, include_create=False):
+        """Membaca struktur satu source dengan beberapa query batch
+        
+        Tabel, kolom, kolom auto increment dan nilai MAX-nya dikumpulkan dari
+        INFORMATION_SCHEMA plus query UNION ALL, bukan satu query per tabel.
+        """
+        conn = self.get_connection(db_config, query=True)
+        if not conn:
+            return None
+        
+        cursor = conn.cursor()
+        tables = {}
+        create_statements = {}
+        
+        try:
+            cursor.execute(
+                """
+                SELECT TABLE_NAME, TABLE_ROWS, DATA_LENGTH, INDEX_LENGTH
+                FROM INFORMATION_SCHEMA.TABLES
+                WHERE TABLE_SCHEMA = %s AND TABLE_TYPE = 'BASE TABLE'
+                ORDER BY TABLE_NAME
+                """,
+                (db_config['database'],)
+            )
+            for table_name, table_rows, data_length, index_length in cursor.fetchall():
+                tables[table_name] = {
+                    'columns': [],
+                    'has_unique_key': False,
+                    'primary_key': [],
+                    'ai_column': None,
+                    'ai_data_type': None,
+                    'max_value': 0,
+                    'rows': int(table_rows or 0),
+                    'data_length': int(data_length or 0),
+                    'index_length': int(index_length or 0)
+                }
+            
+            cursor.execute(
+                """
+                SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, EXTRA, COLUMN_KEY
+                FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE TABLE_SCHEMA = %s
+                ORDER BY TABLE_NAME, ORDINAL_POSITION
+                """,
+                (db_config['database'],)
+            )
+            for table_name, column_name, data_type, extra, column_key in cursor.fetchall():
+                table = tables.get(table_name)
+                if table is None:
+                    continue
+                table['columns'].append(column_name)
+                if column_key in ('PRI', 'UNI'):
+                    table['has_unique_key'] = True
+                if column_key == 'PRI':
+                    table['primary_key'].append(column_name)
+                if 'auto_increment' in (extra or '').lower():
+                    table['ai_column'] = column_name
+                    table['ai_data_type'] = data_type
+            
+            server_time = self.read_max_values(cursor, db_name, tables)
+            
+            if include_create:
+                for table_name in tables:
+                    cursor.execute(f"SHOW CREATE TABLE {table_name}")
+                    create_result = cursor.fetchone()
+                    if create_result:
+                        create_statements[table_name] = create_result[1]
+        
+        except Error as e:
+            print(f"Error reading schema of {db_name}: {e}")
+            return None
+        finally:
+            cursor.close()
+            conn.close()
+        
+        return {
+            'host': db_config['host'],
+            'port': db_config['port'],
+            'database': db_config['database'],
+            'server_time': server_time,
+            'tables': tables,
+            'create_statements': create_statements
+        }
+    
+    def read_max_values(self, cursor, db_name, tables):
+        """Isi max_value setiap tabel auto increment lewat UNION ALL; mengembalikan waktu server"""
+        ai_tables = [name for name, table in tables.items() if table['ai_column']]
+        for start in range(0, len(ai_tables), self.schema_union_size):
+            chunk = ai_tables[start:start + self.schema_union_size]
+            try:
+                cursor.execute(' UNION ALL '.join(
+                    f"SELECT '{name}', MAX({tables[name]['ai_column']}) FROM {name}"
+                    for name in chunk
+                ))
+                for table_name, max_val in cursor.fetchall():
+                    tables[table_name]['max_value'] = int(max_val or 0)
+            except Error as e:
+                print(f"    Error getting max values in {db_name}, dicoba per tabel: {e}")
+                for name in chunk:
+                    column_name = tables[name]['ai_column']
+                    try:
+                        cursor.execute(f"SELECT MAX({column_name}) FROM {name}")
+                        tables[name]['max_value'] = int(cursor.fetchone()[0] or 0)
+                    except Error as e2:
+                        print(f"    Error getting max value for {name}.{column_name}: {e2}")
+        
+        # Waktu server source, batas perubahan untuk merge inkremental berikutnya
+        cursor.execute("SELECT NOW()")
+        return str(cursor.fetchone()[0])
+    
+    def refresh_max_values(self, db_name, db_config, snapshot):
+        """Baca ulang nilai MAX dan waktu server untuk snapshot dari cache; False jika gagal"""
+        conn = self.get_connection(db_config, query=True)
+        if not conn:
+            return False
+        
+        cursor = conn.cursor()
+        try:
+            snapshot['server_time'] = self.read_max_values(cursor, db_name, snapshot['tables'])
+            return True
+        except Error as e:
+            print(f"Error reading max values of {db_name}: {e}")
+            return False
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def load_schema_snapshot(self):
+        """Membangun snapshot skema semua source (atau memuatnya dari schema_cache)"""
+        if self.schema_cache and not self.refresh_schema and os.path.exists(self.schema_cache):
+            with open(self.schema_cache, encoding='utf-8') as f:
+                cached = json.load(f)
+            if self.is_schema_snapshot_valid(cached):
+                print(f"Memakai snapshot skema dari {self.schema_cache} ({cached.get('created', '-')})")
+                # Struktur dari cache, tetapi nilai MAX selalu dibaca ulang: offset dari
+                # MAX lama akan menabrak rentang ID source berikutnya
+                self.schema = {}
+                with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                    refreshed = executor.map(
+                        lambda item: self.refresh_max_values(item[0], self.databases[item[0]], item[1]),
+                        cached['sources'].items()
+                    )
+                    for (db_name, snapshot), ok in zip(cached['sources'].items(), refreshed):
+                        if ok:
+                            self.schema[db_name] = snapshot
+                return self.schema
+            print(f"Snapshot skema {self.schema_cache} tidak cocok dengan konfigurasi, dibaca ulang")
+        
+        # Introspeksi source paralel; urutan self.databases tetap dipertahankan
+        self.schema = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            snapshots = executor.map(
+                lambda item: self.introspect_source(item[1][0], item[1][1], include_create=(item[0] == 0)),
+                enumerate(self.databases.items())
+            )
+            for db_name, snapshot in zip(self.databases, snapshots):
+                if snapshot is not None:
+                    self.schema[db_name] = snapshot
+        
+        if self.schema_cache:
+            # Hanya struktur yang disimpan; nilai MAX dan waktu server dibaca ulang setiap run
+            structure = {
+                db_name: {
+                    **snapshot,
+                    'server_time': None,
+                    'tables': {
+                        table_name: {**table, 'max_value': 0}
+                        for table_name, table in snapshot['tables'].items()
+                    }
+                }
+                for db_name, snapshot in self.schema.items()
+            }
+            with open(self.schema_cache, 'w', encoding='utf-8') as f:
+                json.dump(
+                    {'created': datetime.now().isoformat(timespec='seconds'), 'sources': structure},
+                    f, indent=1
+                )
+            print(f"Snapshot skema disimpan ke {self.schema_cache}")
+        
+        return self.schema
+    
+    def is_schema_snapshot_valid(self, cached):
+        """Snapshot dari disk hanya dipakai jika source-nya sama persis dengan konfigurasi"""
+        sources = cached.get('sources', {})
+        if list(sources) != list(self.databases):
+            return False
+        for db_name, db_config in self.databases.items():
+            snapshot = sources[db_name]
+            if (snapshot.get('host'), snapshot.get('port'), snapshot.get('database')) != (
+                db_config['host'], db_config['port'], db_config['database']
+            ):
+                return False
+        return True
+    
+    def get_source_tables(self, db_name):
+        """Daftar tabel satu source dari snapshot skema, None jika source tidak terbaca"""
+        snapshot = self.schema.get(db_name)
+        return list(snapshot['tables']) if snapshot else None
+    
+    def get_table_columns(self, db_name, table_name):
+        """Daftar kolom satu tabel dari snapshot skema"""
+        return self.schema[db_name]['tables'][table_name]['columns']
+    
     def analyze_auto_increment_tables(self):
         """Menganalisis tabel dengan auto increment"""
         print("Menganalisis tabel dengan auto increment...")
         
-        for db_name, db_config in self.databases.items():
-            conn = self.get_connection(db_config)
-            if conn:
-                cursor = conn.cursor()
-                
-                # Query untuk mendapatkan tabel dengan auto increment
-                query = """
-                SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, EXTRA
-                FROM INFORMATION_SCHEMA.COLUMNS 
-                WHERE TABLE_SCHEMA = %s 
-                AND EXTRA LIKE '%auto_increment%'
-                """
-                
-                cursor.execute(query, (db_config['database'],))
-                results = cursor.fetchall()
-                
-                for table_name, column_name, data_type, extra in results:
-                    if table_name not in self.auto_increment_tables:
-                        self.auto_increment_tables[table_name] = {
-                            'column': column_name,
-                            'data_type': data_type,
-                            'max_values': {}
-                        }
-                    
-                    # Dapatkan nilai maksimum saat ini
-                    try:
-                        max_query = f"SELECT MAX({column_name}) FROM {table_name}"
-                        cursor.execute(max_query)
-                        max_val = cursor.fetchone()[0] or 0
-                        self.auto_increment_tables[table_name]['max_values'][db_name] = max_val
-                    except Error as e:
-                        print(f"    Error getting max value for {table_name}.{column_name}: {e}")
-                        self.auto_increment_tables[table_name]['max_values'][db_name] = 0
-                
-                cursor.close()
-                conn.close()
+        self.load_schema_snapshot()
+        
+        for db_name, snapshot in self.schema.items():
+            for table_name, table in snapshot['tables'].items():
+                if not table['ai_column']:
+                    continue
+                if table_name not in self.auto_increment_tables:
+                    self.auto_increment_tables[table_name] = {
+                        'column': table['ai_column'],
+                        'data_type': table['ai_data_type'],
+                        'max_values': {}
+                    }
+                self.auto_increment_tables[table_name]['max_values'][db_name] = table['max_value']
         
         # Print hasil analisis
         for table, info in self.auto_increment_tables.items():
@@ -123,235 +1249,2018 @@ class DatabaseMerger:
         """Menganalisis hubungan antar tabel"""
         print("Menganalisis hubungan antar tabel...")
         
-        # Definisikan hubungan berdasarkan struktur database
+        # Definisikan hubungan berdasarkan struktur database:
+        # related_tables memetakan tabel anak ke nama kolom foreign key-nya
         self.relations = {
             'biblio': {
                 'primary_key': 'biblio_id',
-                'related_tables': [
-                    'biblio_attachment', 'biblio_author', 'biblio_custom', 
-                    'biblio_log', 'biblio_relation', 'biblio_topic',
-                    'comment', 'item', 'reserve', 'search_biblio', 'serial'
-                ]
+                'related_tables': {
+                    'biblio_attachment': 'biblio_id', 'biblio_author': 'biblio_id',
+                    'biblio_custom': 'biblio_id', 'biblio_log': 'biblio_id',
+                    'biblio_relation': 'biblio_id', 'biblio_topic': 'biblio_id',
+                    'comment': 'biblio_id', 'item': 'biblio_id', 'reserve': 'biblio_id',
+                    'search_biblio': 'biblio_id', 'serial': 'biblio_id'
+                }
             },
             'item': {
                 'primary_key': 'item_id',
-                'related_tables': ['loan', 'stock_take_item']
+                'related_tables': {'loan': 'item_id', 'stock_take_item': 'item_id'}
             },
             'member': {
                 'primary_key': 'member_id',
-                'related_tables': ['comment', 'fines', 'loan', 'reserve', 'visitor_count']
+                'related_tables': {
+                    'comment': 'member_id', 'fines': 'member_id', 'loan': 'member_id',
+                    'reserve': 'member_id', 'visitor_count': 'member_id'
+                }
             },
             'mst_author': {
                 'primary_key': 'author_id',
-                'related_tables': ['biblio_author']
+                'related_tables': {'biblio_author': 'author_id'}
             },
             'mst_topic': {
                 'primary_key': 'topic_id',
-                'related_tables': ['biblio_topic']
+                'related_tables': {'biblio_topic': 'topic_id'}
             },
             'files': {
                 'primary_key': 'file_id',
-                'related_tables': ['biblio_attachment', 'files_read']
+                'related_tables': {'biblio_attachment': 'file_id', 'files_read': 'file_id'}
             },
             'user': {
                 'primary_key': 'user_id',
-                'related_tables': ['backup_log', 'biblio_log', 'system_log']
+                'related_tables': {'backup_log': 'user_id', 'biblio_log': 'user_id', 'system_log': 'user_id'}
             },
             'mst_gmd': {
                 'primary_key': 'gmd_id',
-                'related_tables': ['biblio', 'serial']
+                'related_tables': {'biblio': 'gmd_id', 'serial': 'gmd_id'}
             },
             'mst_publisher': {
                 'primary_key': 'publisher_id',
-                'related_tables': ['biblio']
+                'related_tables': {'biblio': 'publisher_id'}
             },
             'mst_language': {
                 'primary_key': 'language_id',
-                'related_tables': ['biblio']
+                'related_tables': {'biblio': 'language_id'}
             },
             'mst_place': {
                 'primary_key': 'place_id',
-                'related_tables': ['biblio']
+                'related_tables': {'biblio': 'publish_place_id'}
+            },
+            'mst_carrier_type': {
+                'primary_key': 'id',
+                'related_tables': {'biblio': 'carrier_type_id'}
+            },
+            'mst_content_type': {
+                'primary_key': 'id',
+                'related_tables': {'biblio': 'content_type_id'}
+            },
+            'mst_media_type': {
+                'primary_key': 'id',
+                'related_tables': {'biblio': 'media_type_id'}
+            },
+            'mst_coll_type': {
+                'primary_key': 'coll_type_id',
+                'related_tables': {'item': 'coll_type_id'}
+            },
+            'mst_location': {
+                'primary_key': 'location_id',
+                'related_tables': {'item': 'location_id'}
             }
         }
     
-    def create_tables_in_target(self):
-        """Membuat tabel di database target berdasarkan struktur dari source pertama"""
-        print("Membuat tabel di database target...")
+    def create_tables_in_target(self):
+        """Membuat tabel di database target berdasarkan struktur dari source pertama"""
+        print("Membuat tabel di database target...")
+        
+        definitions = self.get_table_definitions()
+        if definitions is None:
+            print(f"Struktur source {next(iter(self.databases), None)} tidak tersedia, tabel tidak dibuat")
+            return
+        self.create_target_tables(definitions)
+    
+    def get_table_definitions(self):
+        """{tabel: {'create': CREATE TABLE, 'ai_column': kolom}} dari source pertama, None jika tidak ada"""
+        first_source = next(iter(self.databases), None)
+        if first_source not in self.schema:
+            return None
+        
+        tables = self.schema[first_source]['tables']
+        return {
+            table_name: {'create': create_stmt, 'ai_column': tables[table_name]['ai_column']}
+            for table_name, create_stmt in self.schema[first_source]['create_statements'].items()
+        }
+    
+    def create_target_tables(self, definitions):
+        """DROP lalu CREATE setiap tabel di target; pada fast_load index sekunder ditunda"""
+        conn_target = self.get_connection(self.target_db)
+        
+        if conn_target:
+            cursor_target = conn_target.cursor()
+            
+            try:
+                self.deferred_indexes = {}
+                
+                for table_name, definition in definitions.items():
+                    create_stmt = definition['create']
+                    if self.fast_load:
+                        # Index sekunder dibangun setelah data dimuat
+                        create_stmt, deferred = self.split_deferred_indexes(
+                            create_stmt, definition['ai_column']
+                        )
+                        if deferred:
+                            self.deferred_indexes[table_name] = deferred
+                    
+                    # Eksekusi di target
+                    cursor_target.execute(f"DROP TABLE IF EXISTS {table_name}")
+                    cursor_target.execute(create_stmt)
+                    print(f"Tabel {table_name} dibuat")
+                
+                conn_target.commit()
+                
+                if self.journal and self.deferred_indexes:
+                    self.journal.set_meta('deferred_indexes', json.dumps(self.deferred_indexes))
+                
+            except Error as e:
+                print(f"Error creating tables: {e}")
+                conn_target.rollback()
+            finally:
+                cursor_target.close()
+                conn_target.close()
+    
+    def split_deferred_indexes(self, create_stmt, ai_column=None):
+        """Pisahkan index sekunder (KEY/FULLTEXT/SPATIAL) dari CREATE TABLE
+        
+        PRIMARY KEY, UNIQUE KEY (dibutuhkan semantik INSERT IGNORE),
+        CONSTRAINT dan index yang diawali kolom auto increment tetap ikut
+        dibuat. Mengembalikan (create_stmt tanpa index tersebut, daftar
+        definisi index yang ditunda).
+        """
+        lines = create_stmt.split('\n')
+        body = []
+        deferred = []
+        
+        for line in lines[1:-1]:
+            definition = line.strip().rstrip(',')
+            is_secondary = re.match(r'(KEY|INDEX|FULLTEXT|SPATIAL)\b', definition, re.IGNORECASE)
+            first_column = re.search(r'\(\s*`?(\w+)`?', definition)
+            if is_secondary and not (ai_column and first_column and first_column.group(1) == ai_column):
+                deferred.append(definition)
+            else:
+                body.append('  ' + definition)
+        
+        return '\n'.join([lines[0], ',\n'.join(body), lines[-1]]), deferred
+    
+    def get_target_connection(self):
+        """Koneksi target untuk menulis data; pada fast_load, pengecekan sesi dilonggarkan"""
+        return self.prepare_target_connection(self.get_connection(self.target_db))
+    
+    def get_merge_connections(self, db_config):
+        """Pasangan koneksi (source, target) untuk satu unit merge, diambil sekaligus"""
+        conn_source, conn_target = self.get_connections(db_config, self.target_db)
+        return conn_source, self.prepare_target_connection(conn_target)
+    
+    def prepare_target_connection(self, conn):
+        """Matikan foreign_key_checks di sesi koneksi target bila fast_load aktif
+        
+        unique_checks tetap menyala karena INSERT IGNORE bergantung pada
+        UNIQUE key untuk menolak duplikat antar cabang. Variabel sesi
+        dikembalikan saat koneksi kembali ke pool.
+        """
+        if conn and self.fast_load:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SET SESSION foreign_key_checks = 0")
+                conn.reset_statement = "SET SESSION foreign_key_checks = DEFAULT"
+            finally:
+                cursor.close()
+        return conn
+    
+    def rebuild_deferred_indexes(self):
+        """Bangun index yang ditunda, satu ALTER TABLE per tabel, paralel antar tabel"""
+        if not self.deferred_indexes and self.journal:
+            stored = self.journal.get_meta('deferred_indexes')
+            self.deferred_indexes = json.loads(stored) if stored else {}
+        if not self.deferred_indexes:
+            return
+        
+        print(f"\nMembangun index untuk {len(self.deferred_indexes)} tabel...")
+        with ThreadPoolExecutor(max_workers=self.index_workers) as executor:
+            failed = [
+                table_name
+                for table_name, ok in zip(
+                    self.deferred_indexes,
+                    executor.map(self.rebuild_table_indexes, self.deferred_indexes.items())
+                )
+                if not ok
+            ]
+        
+        if failed:
+            print(f"  Index gagal dibangun untuk: {', '.join(failed)}")
+        elif self.journal:
+            self.journal.set_meta('deferred_indexes', json.dumps({}))
+        self.deferred_indexes = {}
+    
+    def rebuild_table_indexes(self, item):
+        """ALTER TABLE ... ADD untuk semua index tertunda satu tabel"""
+        table_name, definitions = item
+        
+        # InnoDB hanya bisa menambah satu FULLTEXT index per ALTER TABLE
+        regular = [d for d in definitions if not d.upper().startswith('FULLTEXT')]
+        fulltext = [d for d in definitions if d.upper().startswith('FULLTEXT')]
+        statements = []
+        if regular or fulltext:
+            statements.append(regular + fulltext[:1])
+        statements.extend([d] for d in fulltext[1:])
+        
+        conn = self.get_connection(self.target_db)
+        if not conn:
+            return False
+        
+        cursor = conn.cursor()
+        try:
+            for group in statements:
+                try:
+                    cursor.execute(f"ALTER TABLE {table_name} " + ', '.join(f"ADD {d}" for d in group))
+                except Error as e:
+                    if e.errno != errorcode.ER_DUP_KEYNAME:
+                        raise
+                    # Index sudah ada (mis. resume setelah rebuild sebagian)
+            print(f"  Index {table_name} selesai ({len(definitions)} index)")
+            return True
+        except Error as e:
+            print(f"  Error building indexes for {table_name}: {e}")
+            return False
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def rebuild_derived_tables(self):
+        """Bangun ulang tabel turunan (derived_tables) dari data yang sudah di-merge di target
+        
+        Tabel turunan tidak disalin dari source. Setiap tabel diisi dengan
+        REPLACE INTO ... SELECT per rentang key tabel dasar (derived_chunk),
+        paralel dan seluruhnya di server target, sehingga isinya mengikuti
+        ID, foreign key dan master hasil dedupe di target. Mengembalikan
+        daftar tabel yang gagal.
+        """
+        if not self.derived_tables:
+            return []
+        
+        print(f"\nMembangun ulang tabel turunan: {', '.join(self.derived_tables)}")
+        conn = self.get_connection(self.target_db)
+        if not conn:
+            return list(self.derived_tables)
+        
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT TABLE_NAME, COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS "
+                "WHERE TABLE_SCHEMA = DATABASE() ORDER BY TABLE_NAME, ORDINAL_POSITION"
+            )
+            target_columns = {}
+            for table_name, column_name in cursor.fetchall():
+                target_columns.setdefault(table_name, []).append(column_name)
+            
+            jobs = []
+            for table_name in self.derived_tables:
+                base_table, key_column, builder = self.DERIVED_TABLES[table_name]
+                if table_name not in target_columns or base_table not in target_columns:
+                    print(f"  {table_name} atau {base_table} tidak ada di target, dilewati")
+                    continue
+                columns, select = getattr(self, builder)(target_columns[table_name], target_columns)
+                empty = [column for column in target_columns[table_name] if column not in columns]
+                if empty:
+                    print(f"  {table_name}: kolom tanpa sumber data dibiarkan default: {', '.join(empty)}")
+                
+                cursor.execute(f"SELECT MIN({key_column}), MAX({key_column}) FROM {base_table}")
+                low, high = cursor.fetchone()
+                if high is None:
+                    continue
+                query = (
+                    f"REPLACE INTO {table_name} ({', '.join(columns)}) {select} "
+                    f"WHERE {key_column} > %s AND {key_column} <= %s"
+                )
+                start = low - 1
+                while start < high:
+                    jobs.append((table_name, query, start, min(start + self.derived_chunk, high)))
+                    start += self.derived_chunk
+        except Error as e:
+            print(f"  Error preparing derived tables: {e}")
+            return list(self.derived_tables)
+        finally:
+            cursor.close()
+            conn.close()
+        
+        # Rebuild hanya membebani target; hormati max_queries host target
+        limiter = self.get_host_limiter(self.get_endpoint(self.target_db))
+        workers = min(self.workers, limiter.max_queries or self.workers)
+        rows = {}
+        failed = set()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for (table_name, *_), count in zip(jobs, executor.map(self.rebuild_derived_chunk, jobs)):
+                if count is None:
+                    failed.add(table_name)
+                else:
+                    rows[table_name] = rows.get(table_name, 0) + count
+        
+        for table_name in self.derived_tables:
+            if table_name in failed:
+                print(f"  {table_name} gagal dibangun ulang sebagian; jalankan ulang merge untuk melengkapi")
+            elif table_name in rows:
+                print(f"  {table_name} selesai ({rows[table_name]} baris terpengaruh)")
+        return sorted(failed)
+    
+    def rebuild_derived_chunk(self, job):
+        """Jalankan satu REPLACE INTO ... SELECT untuk rentang key (lower, upper]; jumlah baris atau None"""
+        table_name, query, lower, upper = job
+        conn = self.get_target_connection()
+        if not conn:
+            return None
+        
+        cursor = conn.cursor()
+        try:
+            # GROUP_CONCAT default dipotong di 1024 byte
+            cursor.execute("SET SESSION group_concat_max_len = 1048576")
+            cursor.execute(query, (lower, upper))
+            conn.commit()
+            return cursor.rowcount
+        except Error as e:
+            conn.rollback()
+            print(f"  Error rebuilding {table_name} ({lower}, {upper}]: {e}")
+            return None
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def build_search_biblio_select(self, columns, target_columns):
+        """SELECT set-based untuk search_biblio, setara indexer SLiMS
+        
+        Hanya kolom yang sumbernya ada di target yang diisi, sehingga
+        tetap jalan pada versi SLiMS yang kolomnya berbeda. Mengembalikan
+        (kolom search_biblio yang diisi, query SELECT ... FROM biblio b).
+        """
+        available = {
+            (table_name, column) for table_name, table_columns in target_columns.items()
+            for column in table_columns
+        }
+        
+        filled = []
+        expressions = []
+        for column in columns:
+            expression = None
+            if column in self.SEARCH_BIBLIO_LOOKUPS:
+                master, name, key, foreign_key = self.SEARCH_BIBLIO_LOOKUPS[column]
+                if {(master, name), (master, key), ('biblio', foreign_key)} <= available:
+                    expression = f"(SELECT m.{name} FROM {master} m WHERE m.{key} = b.{foreign_key})"
+            elif column in self.SEARCH_BIBLIO_LISTS:
+                link, master, value, key, order = self.SEARCH_BIBLIO_LISTS[column]
+                required = {(link, 'biblio_id')}
+                if master:
+                    required |= {(link, key), (master, key), (master, value)}
+                    source = f"{link} l JOIN {master} m ON m.{key} = l.{key}"
+                    value_expression = f"m.{value}"
+                else:
+                    required.add((link, value))
+                    source = f"{link} l"
+                    value_expression = f"l.{value}"
+                if order:
+                    required.add((link, order))
+                    aggregate = f"GROUP_CONCAT({value_expression} ORDER BY l.{order} SEPARATOR ' - ')"
+                else:
+                    aggregate = f"GROUP_CONCAT(DISTINCT {value_expression} SEPARATOR ' - ')"
+                if required <= available:
+                    expression = f"(SELECT {aggregate} FROM {source} WHERE l.biblio_id = b.biblio_id)"
+            elif ('biblio', column) in available:
+                expression = f"b.{column}"
+            
+            if expression:
+                filled.append(column)
+                expressions.append(expression)
+        
+        return filled, f"SELECT {', '.join(expressions)} FROM biblio b"
+    
+    def merge_data(self):
+        """Proses merge data dari semua database source ke target; True jika semua unit berhasil"""
+        print("Memulai proses merge data...")
+        
+        if self.resume:
+            # Pakai offset dan MAX source yang sama dengan merge yang terputus
+            offsets, current_max_values = self.journal.load_offsets()
+            self.restore_analysis()
+        else:
+            offsets, current_max_values = self.compute_offsets()
+            self.check_offset_overflow(current_max_values)
+            if self.journal:
+                self.journal.save_offsets(offsets, current_max_values, self.get_source_max_values())
+                self.journal.set_meta('server_times', json.dumps({
+                    db_name: snapshot.get('server_time') for db_name, snapshot in self.schema.items()
+                }))
+        
+        # Dedupe tabel master: pemetaan ID duplikat dipakai ulang saat resume
+        if self.dedupe:
+            self.id_remap = self.journal.load_remap() if self.resume else {}
+            if not self.id_remap:
+                with self.metrics.phase('dedupe'):
+                    self.id_remap = self.build_dedupe_remap(offsets)
+                if self.journal:
+                    self.journal.save_remap(self.id_remap)
+        
+        # Baca batas ukuran paket sekali sebelum worker berjalan
+        conn_target = self.get_connection(self.target_db)
+        if conn_target:
+            self.get_max_allowed_packet(conn_target)
+            conn_target.close()
+        
+        # Proses merge semua source lewat scheduler berbasis dependency
+        with self.metrics.phase('merge'):
+            failed = self.run_scheduled_merge(offsets)
+        
+        # Tabel turunan dibangun dari data target, sebelum index tertunda agar FULLTEXT dibuat sekali
+        if self.derived_tables:
+            with self.metrics.phase('derived'):
+                self.rebuild_derived_tables()
+        
+        # Fast load: index sekunder dibangun setelah semua data masuk
+        if self.fast_load:
+            with self.metrics.phase('index_rebuild'):
+                self.rebuild_deferred_indexes()
+        
+        # Simpan pemetaan ID dan high-water mark untuk merge inkremental
+        if self.journal:
+            self.record_sync_baseline(offsets, save_marks=not failed)
+            if failed:
+                print("Merge belum lengkap; high-water mark tidak disimpan, lanjutkan dengan --resume")
+        
+        # Update auto increment values di target
+        with self.metrics.phase('auto_increment'):
+            self.update_auto_increment_values(current_max_values)
+        return not failed
+    
+    def get_source_max_values(self):
+        """MAX hasil analisis per (source, tabel auto increment)"""
+        return {
+            (db_name, table_name): max_value
+            for table_name, info in self.auto_increment_tables.items()
+            for db_name, max_value in info['max_values'].items()
+        }
+    
+    def restore_analysis(self):
+        """Kembalikan MAX source dan waktu server dari journal untuk resume
+        
+        Source yang bertambah sejak merge terputus tidak boleh memakai MAX
+        baru: rentang (0, MAX] + offset-nya akan menimpa rentang source
+        berikutnya, dan batas baca, key range serta high-water mark harus
+        sama dengan yang dipakai unit yang sudah selesai.
+        """
+        print("Resume: nilai MAX source dan waktu server diambil dari journal, bukan dari analisis ulang")
+        for (db_name, table_name), max_value in self.journal.load_source_max_values().items():
+            info = self.auto_increment_tables.get(table_name)
+            if info is not None:
+                info['max_values'][db_name] = max_value
+            table = self.schema.get(db_name, {}).get('tables', {}).get(table_name)
+            if table is not None:
+                table['max_value'] = max_value
+        
+        server_times = json.loads(self.journal.get_meta('server_times') or '{}')
+        for db_name, server_time in server_times.items():
+            if db_name in self.schema:
+                self.schema[db_name]['server_time'] = server_time
+    
+    def normalize_natural_key(self, values):
+        """Normalisasi natural key: spasi dirapikan dan huruf diseragamkan"""
+        return tuple(
+            ' '.join(str(value).split()).casefold() if value is not None else ''
+            for value in values
+        )
+    
+    def build_dedupe_remap(self, offsets):
+        """Bangun hash index natural key tabel master dan pemetaan ID duplikat ke ID kanonik
+        
+        ID kanonik adalah ID target terkecil untuk natural key yang sama
+        (source pertama, lalu key terkecil), sehingga hasilnya sama walau
+        tabel dimuat paralel. Mengembalikan {(tabel, source): {id_source: id_target}}
+        hanya untuk baris duplikat.
+        """
+        tables = [
+            table_name for table_name in self.get_processing_order(list(self.DEDUPE_KEYS))
+            if table_name in self.auto_increment_tables
+        ]
+        print(f"Dedupe tabel master: {', '.join(tables) or '-'}")
+        
+        remap = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for table_remap in executor.map(lambda table: self.dedupe_table(table, offsets), tables):
+                remap.update(table_remap)
+        return remap
+    
+    def dedupe_table(self, table_name, offsets):
+        """Pemetaan ID duplikat satu tabel master dari semua source"""
+        key_column = self.auto_increment_tables[table_name]['column']
+        index = {}
+        remap = {}
+        duplicates = 0
+        
+        for db_name, db_config in self.databases.items():
+            tables = self.get_source_tables(db_name) or []
+            if table_name not in tables:
+                continue
+            columns = self.get_table_columns(db_name, table_name)
+            key_columns = [column for column in self.DEDUPE_KEYS[table_name] if column in columns]
+            if not key_columns:
+                continue
+            
+            conn = self.get_connection(db_config, query=True)
+            if not conn:
+                continue
+            
+            offset = offsets.get(table_name, {}).get(db_name, 0)
+            mapping = {}
+            cursor = conn.cursor(buffered=False)
+            try:
+                # Baris di atas MAX hasil analisis tidak disalin, jadi tidak boleh menjadi ID kanonik
+                cursor.execute(
+                    f"SELECT {key_column}, {', '.join(key_columns)} FROM {table_name} "
+                    f"WHERE {key_column} <= %s ORDER BY {key_column}",
+                    (self.get_key_bound(table_name, columns, db_name),)
+                )
+                while True:
+                    rows = cursor.fetchmany(self.fetch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        target_id = row[0] + offset
+                        canonical = index.setdefault(self.normalize_natural_key(row[1:]), target_id)
+                        if canonical != target_id:
+                            mapping[row[0]] = canonical
+            except Error as e:
+                print(f"  Error dedupe {table_name} di {db_name}: {e}")
+                mapping = {}
+            finally:
+                cursor.close()
+                conn.close()
+            
+            if mapping:
+                remap[(table_name, db_name)] = mapping
+                duplicates += len(mapping)
+        
+        print(f"  {table_name}: {len(index)} baris unik, {duplicates} duplikat digabung")
+        return remap
+    
+    def is_dedupe_affected(self, table_name, db_name):
+        """Tabel master yang punya duplikat atau tabel yang merujuknya, untuk satu source"""
+        if (table_name, db_name) in self.id_remap:
+            return True
+        return bool(self.get_remapped_columns(table_name, self.get_table_columns(db_name, table_name), db_name))
+    
+    def get_remapped_columns(self, table_name, columns, db_name):
+        """Kolom foreign key yang merujuk tabel master hasil dedupe: {kolom: {id_source: id_target}}"""
+        remapped = {}
+        for column, ref_tables in self.get_shifted_columns(table_name, columns).items():
+            for ref_table in ref_tables:
+                mapping = self.id_remap.get((ref_table, db_name))
+                if mapping and ref_table != table_name:
+                    remapped[column] = mapping
+        return remapped
+    
+    def record_sync_baseline(self, offsets, save_marks=True):
+        """Catat pemetaan ID dan high-water mark hasil merge penuh
+        
+        High-water mark hanya disimpan bila semua unit berhasil; jika tidak,
+        --incremental akan menganggap baris yang belum tersalin sudah tersinkron.
+        """
+        segments = {}
+        for table_name, info in self.auto_increment_tables.items():
+            for db_name, max_value in info['max_values'].items():
+                offset = offsets.get(table_name, {}).get(db_name, 0)
+                segments.setdefault(table_name, {})[db_name] = [(0, max_value, offset)]
+        
+        self.journal.save_segments(segments)
+        if save_marks:
+            self.journal.save_sync_marks(self.collect_sync_marks())
+    
+    def collect_sync_marks(self, previous=None):
+        """High-water mark baru dari snapshot skema: key tertinggi dan waktu server per (source, tabel)"""
+        marks = dict(previous or {})
+        for db_name, snapshot in self.schema.items():
+            for table_name, table in snapshot['tables'].items():
+                high = table['max_value'] if table['ai_column'] else None
+                old_high = marks.get((db_name, table_name), (None, None))[0]
+                if high is not None and old_high is not None:
+                    high = max(high, old_high)
+                marks[(db_name, table_name)] = (high, snapshot.get('server_time'))
+        return marks
+    
+    def get_target_max_values(self, tables):
+        """Nilai MAX kolom auto increment di target, satu query UNION ALL per kelompok tabel"""
+        max_values = {}
+        conn = self.get_connection(self.target_db)
+        if not conn:
+            return max_values
+        
+        cursor = conn.cursor()
+        try:
+            for start in range(0, len(tables), self.schema_union_size):
+                chunk = tables[start:start + self.schema_union_size]
+                cursor.execute(' UNION ALL '.join(
+                    f"SELECT '{name}', MAX({self.auto_increment_tables[name]['column']}) FROM {name}"
+                    for name in chunk
+                ))
+                for table_name, max_val in cursor.fetchall():
+                    max_values[table_name] = int(max_val or 0)
+        finally:
+            cursor.close()
+            conn.close()
+        
+        return max_values
+    
+    def allocate_delta_segments(self, marks):
+        """Tambahkan rentang ID baru untuk baris yang lahir setelah sync terakhir
+        
+        ID baru setiap source ditempatkan berurutan di atas ID tertinggi
+        target. Rentang yang sudah tercatat (mis. dari percobaan inkremental
+        yang gagal) tidak dialokasikan ulang.
+        """
+        stored = self.journal.load_segments()
+        target_max = self.get_target_max_values(list(self.auto_increment_tables))
+        current_max_values = {}
+        
+        for table_name, info in self.auto_increment_tables.items():
+            per_source = stored.setdefault(table_name, {})
+            # ID target tertinggi: dari isi target maupun rentang yang sudah dialokasikan
+            running = max(
+                [target_max.get(table_name, 0)]
+                + [high + shift for ranges in per_source.values() for _, high, shift in ranges]
+            )
+            
+            for db_name in self.databases:
+                ranges = per_source.setdefault(db_name, [])
+                high_water = (marks.get((db_name, table_name), (None, None))[0]) or 0
+                start = max([high_water] + [high for _, high, _ in ranges])
+                max_value = info['max_values'].get(db_name, 0)
+                
+                if max_value > start:
+                    ranges.append((start, max_value, running - start))
+                    running += max_value - start
+            
+            current_max_values[table_name] = running
+        
+        self.journal.save_segments(stored)
+        segments = {
+            table_name: {db_name: IdSegments(ranges) for db_name, ranges in per_source.items() if ranges}
+            for table_name, per_source in stored.items()
+        }
+        return segments, current_max_values
+    
+    def run_incremental_merge(self):
+        """Merge inkremental: hanya baris baru/berubah sejak sync terakhir, diterapkan dengan upsert
+        
+        Mengembalikan True jika semua unit berhasil.
+        """
+        print("Memulai merge inkremental...")
+        
+        marks = self.journal.load_sync_marks()
+        segments, current_max_values = self.allocate_delta_segments(marks)
+        # Pemetaan duplikat dari merge penuh tetap berlaku untuk foreign key
+        self.id_remap = self.journal.load_remap()
+        
+        conn_target = self.get_connection(self.target_db)
+        if conn_target:
+            self.get_max_allowed_packet(conn_target)
+            conn_target.close()
+        
+        with self.metrics.phase('merge'):
+            failed = self.run_scheduled_merge(
+                segments,
+                merge_unit=lambda db_name, db_config, table_name, segments: self.merge_table_delta(
+                    db_name, db_config, table_name, segments, marks
+                )
+            )
+        
+        if failed:
+            print("Merge inkremental belum lengkap; high-water mark tidak diperbarui, jalankan ulang")
+        else:
+            self.journal.save_sync_marks(self.collect_sync_marks(marks))
+        
+        # Baris biblio yang berubah bisa ada di rentang mana pun; REPLACE membangun ulang semuanya
+        if self.derived_tables:
+            with self.metrics.phase('derived'):
+                self.rebuild_derived_tables()
+        
+        with self.metrics.phase('auto_increment'):
+            self.update_auto_increment_values(current_max_values)
+        return not failed
+    
+    def compute_offsets(self):
+        """Hitung offset auto increment per (tabel, source) dan nilai maksimum gabungan"""
+        # Offset untuk auto increment values
+        offsets = {}
+        current_max_values = {}
+        
+        # Hitung offset untuk setiap tabel auto increment
+        for table_name, info in self.auto_increment_tables.items():
+            current_max = 0
+            offsets[table_name] = {}
+            
+            for db_name in self.databases.keys():
+                offsets[table_name][db_name] = current_max
+                current_max += info['max_values'].get(db_name, 0)
+            
+            current_max_values[table_name] = current_max
+        
+        return offsets, current_max_values
+    
+    def check_offset_overflow(self, current_max_values):
+        """Peringatkan tabel yang ID gabungannya melebihi batas tipe kolom auto increment
+        
+        Dengan banyak source, jumlah MAX semua source bisa melewati batas
+        tipe kolom (mis. SMALLINT/INT). Batas memakai rentang signed agar
+        aman untuk kolom unsigned juga. Mengembalikan daftar tabel tersebut.
+        """
+        overflow = []
+        for table_name, current_max in current_max_values.items():
+            data_type = (self.auto_increment_tables[table_name].get('data_type') or '').lower()
+            limit = self.AUTO_INCREMENT_LIMITS.get(data_type)
+            if limit and current_max > limit:
+                overflow.append(table_name)
+                print(
+                    f"  Peringatan: ID gabungan {table_name} mencapai {current_max}, "
+                    f"melebihi batas {data_type.upper()} ({limit}); ubah tipe kolom di target"
+                )
+        return overflow
+    
+    def build_dependency_graph(self, tables):
+        """Membangun DAG dependency tabel dari self.relations
+        
+        Setiap tabel bergantung pada tabel induk yang primary key-nya
+        dirujuk olehnya. Tier master/utama/transaksi dari
+        get_processing_order dipakai sebagai prioritas di antara tabel
+        yang sudah siap, bukan sebagai penghalang.
+        """
+        graph = {table: set() for table in tables}
+        
+        for parent, relation_info in self.relations.items():
+            if parent not in graph:
+                continue
+            for child in relation_info['related_tables']:
+                if child in graph and child != parent:
+                    graph[child].add(parent)
+        
+        # Deteksi siklus dengan algoritma Kahn; dependency di dalam siklus dilepas
+        remaining = {table: set(parents) for table, parents in graph.items()}
+        while True:
+            ready = [table for table, parents in remaining.items() if not parents]
+            if not ready:
+                break
+            for table in ready:
+                del remaining[table]
+            for parents in remaining.values():
+                parents.difference_update(ready)
+        
+        if remaining:
+            print(f"  Peringatan: siklus dependency pada {', '.join(sorted(remaining))}, dependency diabaikan")
+            for table in remaining:
+                graph[table] -= set(remaining)
+        
+        return graph
+    
+    def run_scheduled_merge(self, offsets, merge_unit=None):
+        """Menjalankan merge (source, tabel) secara paralel sesuai DAG dependency
+        
+        Tabel besar dipecah menjadi beberapa rentang key (lihat
+        plan_key_ranges) yang dimuat bersamaan; tabel dianggap selesai bila
+        semua rentangnya selesai. merge_unit kustom (mis. mode inkremental)
+        selalu dijalankan sebagai satu stream per tabel. Tugas hanya
+        dijalankan bila host source dan target-nya masih punya slot
+        max_queries; tugas lain di antrean yang host-nya longgar didahulukan.
+        Mengembalikan himpunan unit yang gagal atau dilewati.
+        """
+        split = merge_unit is None
+        merge_unit = merge_unit or self.merge_table
+        dependencies, dependents, priority = self.build_merge_units()
+        
+        ready = sorted(
+            (unit for unit, parents in dependencies.items() if not parents),
+            key=priority.get
+        )
+        queue = []
+        running = {}
+        pending_parts = {}
+        unit_failed = set()
+        failed = set()
+        
+        print(f"  {len(dependencies)} unit (source, tabel) dijadwalkan dengan {self.workers} worker")
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while ready or queue or running:
+                # Pecah unit yang siap menjadi tugas per rentang key
+                for unit in ready:
+                    db_name, table_name = unit
+                    key_ranges = self.plan_key_ranges(db_name, table_name) if split else [None]
+                    pending_parts[unit] = len(key_ranges)
+                    queue.extend((unit, key_range) for key_range in key_ranges)
+                ready = []
+                queue.sort(key=lambda task: priority[task[0]])
+                
+                while queue and len(running) < self.workers:
+                    index = next(
+                        (index for index, (unit, _) in enumerate(queue)
+                         if self.acquire_unit_hosts(unit[0])),
+                        None
+                    )
+                    if index is None:
+                        break
+                    unit, key_range = queue.pop(index)
+                    db_name, table_name = unit
+                    args = (db_name, self.databases[db_name], table_name, offsets)
+                    if key_range is not None:
+                        args += (key_range,)
+                    running[executor.submit(merge_unit, *args)] = unit
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    unit = running.pop(future)
+                    self.release_unit_hosts(unit[0])
+                    try:
+                        ok = future.result()
+                    except Exception as e:
+                        print(f"  Error processing {unit[0]}.{unit[1]}: {e}")
+                        ok = False
+                    
+                    if not ok:
+                        unit_failed.add(unit)
+                    pending_parts[unit] -= 1
+                    if pending_parts[unit]:
+                        continue
+                    
+                    if unit in unit_failed:
+                        failed.add(unit)
+                        self._skip_dependents(unit, dependents, failed)
+                        continue
+                    
+                    for child in dependents.get(unit, []):
+                        dependencies[child].discard(unit)
+                        if child not in failed and not dependencies[child]:
+                            ready.append(child)
+        
+        if failed:
+            print(f"  {len(failed)} unit gagal atau dilewati")
+        return failed
+    
+    def get_unit_hosts(self, db_name):
+        """Host (endpoint) yang dibebani unit merge dari satu source: source dan target (kecuali --export)"""
+        hosts = {self.get_endpoint(self.databases[db_name])}
+        if not self.export_dir:
+            hosts.add(self.get_endpoint(self.target_db))
+        return sorted(hosts)
+    
+    def acquire_unit_hosts(self, db_name):
+        """Ambil slot query di semua host unit; False (tanpa mengambil apa pun) jika ada yang penuh"""
+        acquired = []
+        for endpoint in self.get_unit_hosts(db_name):
+            limiter = self.get_host_limiter(endpoint)
+            if not limiter.try_acquire_query():
+                for other in acquired:
+                    other.release_query()
+                return False
+            acquired.append(limiter)
+        return True
+    
+    def release_unit_hosts(self, db_name):
+        """Lepas slot query yang diambil acquire_unit_hosts"""
+        for endpoint in self.get_unit_hosts(db_name):
+            self.get_host_limiter(endpoint).release_query()
+    
+    def build_merge_units(self):
+        """DAG unit (source, tabel): (dependencies, dependents, prioritas)
+        
+        Di antara unit yang siap, tier tabel (master, utama, transaksi)
+        didahulukan, lalu estimasi biaya terbesar, agar tabel besar mulai
+        lebih awal dan tidak menjadi ekor panjang di akhir merge.
+        """
+        dependencies = {}
+        dependents = {}
+        priority = {}
+        
+        for source_index, db_name in enumerate(self.databases):
+            tables = self.get_source_tables(db_name)
+            if tables is None:
+                print(f"  Tidak dapat terkoneksi ke database {db_name}")
+                continue
+            
+            processing_order = self.get_processing_order(tables)
+            graph = self.build_dependency_graph(processing_order)
+            
+            for rank, table_name in enumerate(processing_order):
+                if table_name in self.derived_tables:
+                    # Dibangun ulang di target setelah merge (rebuild_derived_tables)
+                    continue
+                unit = (db_name, table_name)
+                dependencies[unit] = {
+                    (db_name, parent) for parent in graph[table_name] if parent not in self.derived_tables
+                }
+                _, seconds = self.estimate_unit_cost(db_name, table_name)
+                priority[unit] = (self.get_table_tier(table_name), -seconds, rank, source_index)
+                for parent in dependencies[unit]:
+                    dependents.setdefault(parent, []).append(unit)
+        
+        return dependencies, dependents, priority
+    
+    def estimate_unit_cost(self, db_name, table_name):
+        """Perkiraan (byte, detik) merge satu tabel dari statistik INFORMATION_SCHEMA di snapshot"""
+        table = self.schema[db_name]['tables'][table_name]
+        data_bytes = table.get('data_length') or 0
+        seconds = max(
+            (table.get('rows') or 0) / self.plan_rows_per_second,
+            data_bytes / (self.plan_mb_per_second * 1024 * 1024)
+        )
+        return data_bytes, seconds
+    
+    def calibrate_cost_model(self):
+        """Pakai throughput dari laporan metrik merge sebelumnya bila ada; True jika dipakai"""
+        if not self.metrics_file or not os.path.exists(self.metrics_file):
+            return False
+        try:
+            with open(self.metrics_file) as f:
+                tables = json.load(f)['tables']
+        except (OSError, ValueError, KeyError):
+            return False
+        
+        rows = sum(table['rows_read'] for table in tables)
+        data_bytes = sum(table['bytes'] for table in tables)
+        busy = sum(table['read_seconds'] + table['transform_seconds'] + table['write_seconds'] for table in tables)
+        if not rows or not busy:
+            return False
+        
+        self.plan_rows_per_second = rows / busy
+        if data_bytes:
+            self.plan_mb_per_second = data_bytes / busy / (1024 * 1024)
+        return True
+    
+    def simulate_schedule(self, dependencies, dependents, priority):
+        """Simulasi run_scheduled_merge memakai estimasi biaya
+        
+        Mengembalikan ({unit: [mulai, selesai]}, total waktu) dalam detik.
+        """
+        remaining = {unit: set(parents) for unit, parents in dependencies.items()}
+        ready = [unit for unit, parents in remaining.items() if not parents]
+        queue = []
+        running = []
+        pending_parts = {}
+        times = {}
+        clock = 0.0
+        sequence = 0
+        
+        while ready or queue or running:
+            for unit in ready:
+                parts = len(self.compute_key_ranges(*unit))
+                _, seconds = self.estimate_unit_cost(*unit)
+                pending_parts[unit] = parts
+                queue.extend((priority[unit], unit, seconds / parts) for _ in range(parts))
+            ready = []
+            queue.sort(key=lambda task: task[0])
+            
+            while queue and len(running) < self.workers:
+                index = next(
+                    (index for index, (_, unit, _) in enumerate(queue)
+                     if self.acquire_unit_hosts(unit[0])),
+                    None
+                )
+                if index is None:
+                    break
+                _, unit, seconds = queue.pop(index)
+                times.setdefault(unit, [clock, clock])
+                sequence += 1
+                heapq.heappush(running, (clock + seconds, sequence, unit))
+            
+            clock, _, unit = heapq.heappop(running)
+            self.release_unit_hosts(unit[0])
+            pending_parts[unit] -= 1
+            if pending_parts[unit]:
+                continue
+            
+            times[unit][1] = clock
+            for child in dependents.get(unit, []):
+                remaining[child].discard(unit)
+                if not remaining[child]:
+                    ready.append(child)
+        
+        return times, clock
+    
+    def plan_key_ranges(self, db_name, table_name):
+        """Pecah tabel besar menjadi range_parts rentang key auto increment
+        
+        Batas rentang dihitung dari nilai MAX hasil analisis, dan rentang
+        terakhir juga berhenti di MAX tersebut (lihat get_key_bound). Tabel kecil
+        atau tanpa kolom auto increment tetap satu stream ([None]). Dengan
+        journal, pembagian disimpan agar resume memakai rentang yang sama.
+        """
+        meta_key = f"key_ranges:{db_name}:{table_name}"
+        if self.journal:
+            stored = self.journal.get_meta(meta_key)
+            if stored is not None:
+                return [tuple(key_range) if key_range else None for key_range in json.loads(stored)]
+        
+        key_ranges = self.compute_key_ranges(db_name, table_name)
+        if self.journal:
+            self.journal.set_meta(meta_key, json.dumps(key_ranges))
+        return key_ranges
+    
+    def compute_key_ranges(self, db_name, table_name):
+        """Batas rentang key untuk plan_key_ranges"""
+        table = self.schema[db_name]['tables'][table_name]
+        key_column = self.get_key_column(table_name, table['columns'])
+        max_value = table['max_value']
+        
+        if (
+            self.range_parts <= 1 or key_column is None
+            or table['rows'] < self.split_min_rows or max_value < self.range_parts
+        ):
+            return [None]
+        
+        step = -(-max_value // self.range_parts)
+        key_ranges = []
+        for part in range(self.range_parts):
+            lower = part * step if part else None
+            upper = (part + 1) * step if part < self.range_parts - 1 else max_value
+            key_ranges.append((part, self.range_parts, lower, upper))
+        return key_ranges
+    
+    def _skip_dependents(self, unit, dependents, failed):
+        """Tandai seluruh turunan unit yang gagal agar tidak dijalankan"""
+        for child in dependents.get(unit, []):
+            if child not in failed:
+                print(f"  [{child[0]}] {child[1]} dilewati karena tabel induk gagal")
+                failed.add(child)
+                self._skip_dependents(child, dependents, failed)
+    
+    def merge_table(self, db_name, db_config, table_name, offsets, key_range=None):
+        """Merge satu tabel (atau satu rentang key-nya) dari satu source, True jika berhasil"""
+        part, parts, lower, upper = key_range or (0, 1, None, None)
+        label = table_name if key_range is None else f"{table_name} [bagian {part + 1}/{parts}]"
+        
+        progress = self.journal.get_progress(db_name, table_name, part) if self.journal else None
+        if progress and progress['status'] == 'done':
+            print(f"  [{db_name}] {label} sudah selesai sebelumnya, dilewati")
+            return True
+        
+        if progress:
+            print(f"  [{db_name}] Melanjutkan tabel: {label} ({progress['rows_done']} baris sudah di-commit)")
+        else:
+            print(f"  [{db_name}] Memproses tabel: {label}")
+        
+        # Source dan target di instance MySQL yang sama: merge di sisi server
+        # (kecuali tabel dengan kebijakan REPLACE dan tabel yang terkena dedupe,
+        # karena pemetaan ID-nya ada di client)
+        if (self.server_side_merge and self.is_same_instance(db_config, self.target_db)
+                and table_name not in self.replace_tables
+                and not self.is_dedupe_affected(table_name, db_name)):
+            started = time.perf_counter()
+            result = self.merge_table_server_side(db_name, db_config, table_name, offsets, progress, key_range)
+            if result is not None:
+                inserted, skipped = result
+                self.metrics.record(
+                    db_name, table_name,
+                    rows_read=inserted + skipped,
+                    inserted=inserted, skipped=skipped,
+                    bytes=(inserted + skipped) * self.get_avg_row_length(db_name, table_name),
+                    write_seconds=time.perf_counter() - started
+                )
+                self.print_table_result(db_name, label, *result)
+                return True
+        
+        conn_source, conn_target = self.get_merge_connections(db_config)
+        
+        if not conn_source or not conn_target:
+            print(f"  Tidak dapat terkoneksi ke database {db_name}")
+            for conn in (conn_source, conn_target):
+                if conn:
+                    conn.close()
+            return False
+        
+        cursor_target = conn_target.cursor()
+        
+        try:
+            columns = self.get_table_columns(db_name, table_name)
+            
+            # Dengan journal atau rentang key, tabel ber-auto increment dibaca
+            # urut key agar posisi terakhir yang di-commit bisa dipakai untuk resume
+            key_column = self.get_key_column(table_name, columns) if (self.journal or key_range) else None
+            key_bound = self.get_key_bound(table_name, columns, db_name)
+            after_key = progress['last_key'] if progress and progress['last_key'] is not None else lower
+            rows_done = progress['rows_done'] if progress else 0
+            insert_count = progress['inserted'] if progress else 0
+            skip_count = progress['skipped'] if progress else 0
+            
+            # Pipeline generator: baca per chunk -> rewrite offset/FK -> batch
+            if key_range:
+                rows = self.iter_source_range(conn_source, table_name, columns, key_column, after_key, upper)
+            else:
+                where, params = self.build_range_where(
+                    self.get_key_column(table_name, columns), after_key, key_bound
+                )
+                order_by = key_column
+                replay = False
+                if self.journal and key_column is None:
+                    if self.schema[db_name]['tables'][table_name].get('has_unique_key'):
+                        # Tanpa auto increment tetapi ada unique key: INSERT IGNORE idempoten,
+                        # resume cukup mengulang tabel dari awal; skipped dikoreksi agar baris
+                        # yang sudah di-commit tidak terhitung dua kali
+                        replay = True
+                    else:
+                        # Tanpa key sama sekali: urutan harus tetap agar resume bisa melewati
+                        # baris yang sudah di-commit berdasarkan jumlahnya
+                        order_by = ', '.join(columns)
+                rows = self.iter_source_rows(conn_source, table_name, where, params, order_by)
+                if progress and replay:
+                    skip_count -= rows_done
+                    rows_done = 0
+                elif progress and key_column is None:
+                    rows = islice(rows, rows_done, None)
+            duplicates = self.id_remap.get((table_name, db_name))
+            if duplicates:
+                # Baris master duplikat tidak disalin; FK-nya diarahkan ke ID kanonik
+                dup_index = columns.index(self.get_key_column(table_name, columns))
+                rows = (row for row in rows if row[dup_index] not in duplicates)
+            transform = self.make_row_transformer(table_name, columns, offsets, db_name)
+            
+            if key_column:
+                key_index = columns.index(key_column)
+                key_shift = self.get_column_offsets(table_name, columns, offsets, db_name).get(key_column, 0)
+            
+            if self.load_mode == 'infile':
+                batch_size, write = self.infile_rows, self.load_batch_infile
+            else:
+                batch_size, write = self.batch_size, self.write_batch
+            
+            # closing: thread pipeline berhenti sebelum koneksi source ditutup
+            with closing(self.iter_metered_batches(db_name, table_name, rows, transform, batch_size)) as batches:
+                for batch in batches:
+                    inserted, skipped = self.write_metered(
+                        write, db_name, conn_target, cursor_target, table_name, columns, batch
+                    )
+                    insert_count += inserted
+                    skip_count += skipped
+                    rows_done += len(batch)
+                    
+                    if self.journal:
+                        last_key = batch[-1][key_index] - key_shift if key_column else None
+                        self.journal.record_chunk(
+                            db_name, table_name, last_key, rows_done, insert_count, skip_count, part=part
+                        )
+            
+            if self.journal:
+                self.journal.mark_done(db_name, table_name, rows_done, insert_count, skip_count, part=part)
+            
+            self.print_table_result(db_name, label, insert_count, skip_count)
+            return True
+        
+        except Error as e:
+            print(f"Error processing {db_name}.{label}: {e}")
+            conn_target.rollback()
+            return False
+        finally:
+            cursor_target.close()
+            conn_source.close()
+            conn_target.close()
+    
+    def print_table_result(self, db_name, table_name, insert_count, skip_count):
+        """Cetak ringkasan hasil merge satu tabel"""
+        if insert_count + skip_count == 0:
+            print(f"    [{db_name}] Tabel {table_name} kosong, dilewati")
+        else:
+            print(f"    [{db_name}] {insert_count} records inserted, {skip_count} skipped in {table_name}")
+    
+    def get_endpoint(self, config):
+        """(host, port) ternormalisasi sebuah konfigurasi database"""
+        host = (config.get('host') or 'localhost').strip().lower()
+        if host in ('127.0.0.1', '::1'):
+            host = 'localhost'
+        return host, int(config.get('port', 3306))
+    
+    def is_same_instance(self, db_config, other_config):
+        """Cek apakah dua konfigurasi menunjuk ke server MySQL yang sama (host dan port)"""
+        return self.get_endpoint(db_config) == self.get_endpoint(other_config)
+    
+    def get_key_column(self, table_name, columns):
+        """Kolom auto increment tabel (key source), None jika tidak ada"""
+        info = self.auto_increment_tables.get(table_name)
+        if info and info['column'] in columns:
+            return info['column']
+        return None
+    
+    def get_key_bound(self, table_name, columns, db_name):
+        """Key source tertinggi yang disalin merge penuh: MAX hasil analisis, None tanpa auto increment
+        
+        Offset source berikutnya dihitung dari MAX ini, jadi baris yang
+        ditambahkan ke source setelah analisis tidak boleh ikut disalin: ID-nya
+        akan masuk rentang source berikutnya. Baris tersebut berada di atas
+        high-water mark dan disalin oleh --incremental.
+        """
+        if self.get_key_column(table_name, columns) is None:
+            return None
+        return self.auto_increment_tables[table_name]['max_values'].get(db_name, 0)
+    
+    def build_range_where(self, key_column, lower=None, upper=None):
+        """Klausa WHERE untuk rentang key (lower, upper]; batas None berarti terbuka"""
+        clauses = []
+        params = []
+        if key_column and lower is not None:
+            clauses.append(f"{key_column} > %s")
+            params.append(lower)
+        if key_column and upper is not None:
+            clauses.append(f"{key_column} <= %s")
+            params.append(upper)
+        if not clauses:
+            return '', ()
+        return ' WHERE ' + ' AND '.join(clauses), tuple(params)
+    
+    def iter_key_ranges(self, table_name, columns, db_name, chunk_size, after_key=None, upper_bound=None):
+        """Klausa WHERE per rentang kolom auto increment (source), atau satu rentang penuh
+        
+        Menghasilkan (where, params, upper); upper adalah key source tertinggi
+        yang tercakup rentang tersebut. Tanpa upper_bound, rentang berhenti di
+        nilai MAX hasil analisis (lihat get_key_bound).
+        """
+        key_column = self.get_key_column(table_name, columns)
+        if key_column is None:
+            yield '', (), None
+            return
+        
+        max_value = self.auto_increment_tables[table_name]['max_values'].get(db_name, 0)
+        stop = max_value if upper_bound is None else upper_bound
+        
+        lower = after_key
+        while True:
+            upper = min((lower or 0) + chunk_size, stop)
+            where, params = self.build_range_where(key_column, lower, upper)
+            yield where, params, upper
+            if upper >= stop:
+                break
+            lower = upper
+    
+    def merge_table_server_side(self, db_name, db_config, table_name, offsets, progress=None, key_range=None):
+        """Merge satu tabel dengan INSERT IGNORE ... SELECT langsung di server
+        
+        Offset auto increment dan foreign key ditulis sebagai ekspresi SQL,
+        sehingga tidak ada data baris yang lewat client. Mengembalikan
+        (inserted, skipped), atau None bila harus kembali ke jalur client.
+        """
+        part, _, lower, upper = key_range or (0, 1, None, None)
+        conn = self.get_target_connection()
+        if not conn:
+            return None
+        
+        cursor = conn.cursor()
+        source_table = f"`{db_config['database']}`.{table_name}"
+        
+        try:
+            columns = self.get_table_columns(db_name, table_name)
+            shifts = self.get_column_offsets(table_name, columns, offsets, db_name)
+            select_list = ', '.join(
+                f"{col} + {shifts[col]}" if col in shifts else col
+                for col in columns
+            )
+            
+            key_column = self.get_key_column(table_name, columns)
+            if upper is None:
+                upper = self.get_key_bound(table_name, columns, db_name)
+            where, params = self.build_range_where(key_column, lower, upper)
+            cursor.execute(f"SELECT COUNT(*) FROM {source_table}{where}", params)
+            total = cursor.fetchone()[0]
+            
+            insert_query = (
+                f"INSERT IGNORE INTO {table_name} ({', '.join(columns)}) "
+                f"SELECT {select_list} FROM {source_table}"
+            )
+            
+            insert_count = progress['inserted'] if progress else 0
+            after_key = progress['last_key'] if progress and progress['last_key'] is not None else lower
+            
+            for where, params, chunk_upper in self.iter_key_ranges(
+                table_name, columns, db_name, self.server_side_chunk, after_key, upper
+            ):
+                cursor.execute(insert_query + where, params)
+                insert_count += max(cursor.rowcount, 0)
+                conn.commit()
+                if self.journal and key_column:
+                    self.journal.record_chunk(db_name, table_name, chunk_upper, 0, insert_count, 0, part=part)
+            
+            skip_count = max(total - insert_count, 0)
+            if self.journal:
+                self.journal.mark_done(db_name, table_name, total, insert_count, skip_count, part=part)
+            
+            return insert_count, skip_count
+        
+        except Error as e:
+            conn.rollback()
+            print(f"    [{db_name}] INSERT ... SELECT gagal untuk {table_name} ({e}), memakai jalur client")
+            return None
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def build_delta_passes(self, db_name, table_name, columns, marks):
+        """Daftar bacaan (where, params, upsert) untuk baris baru/berubah sejak sync terakhir
+        
+        - Tabel ber-auto increment: key di atas high-water mark adalah baris
+          baru dan ditulis dengan INSERT IGNORE; key di bawahnya yang
+          last_update/input_date-nya berubah setelah sync terakhir di-upsert.
+        - Tabel relasi tanpa key sendiri: baris dengan foreign key ke baris
+          induk yang baru ditulis dengan INSERT IGNORE; baris yang kolom
+          waktunya berubah di-upsert.
+        Tabel tanpa kriteria di atas dibaca penuh dan di-upsert bila punya
+        unique key, atau dilewati (None) bila tidak. Upsert hanya mengubah
+        baris yang primary key-nya sudah ada di target (lihat execute_insert).
+        """
+        mark = marks.get((db_name, table_name))
+        if mark is None:
+            # Tabel belum pernah di-sync: salin seluruhnya
+            return [('', (), False)]
+        
+        high_water, synced_at = mark
+        passes = []
+        
+        changed = []
+        changed_params = []
+        if synced_at:
+            for column in ('last_update', 'input_date'):
+                if column in columns:
+                    changed.append(f"{column} > %s")
+                    changed_params.append(synced_at)
+        
+        key_column = self.get_key_column(table_name, columns)
+        if key_column:
+            passes.append((f" WHERE {key_column} > %s", (high_water or 0,), False))
+            if changed:
+                passes.append((
+                    f" WHERE {key_column} <= %s AND ({' OR '.join(changed)})",
+                    (high_water or 0, *changed_params),
+                    True
+                ))
+            return passes
+        
+        clauses = []
+        params = []
+        for column, ref_tables in self.get_shifted_columns(table_name, columns).items():
+            for ref_table in ref_tables:
+                parent_mark = marks.get((db_name, ref_table))
+                if parent_mark and parent_mark[0] is not None:
+                    clauses.append(f"{column} > %s")
+                    params.append(parent_mark[0])
+        if clauses:
+            passes.append((' WHERE ' + ' OR '.join(clauses), tuple(params), False))
+        if changed:
+            passes.append((' WHERE ' + ' OR '.join(changed), tuple(changed_params), True))
+        
+        if passes:
+            return passes
+        if self.schema[db_name]['tables'][table_name].get('has_unique_key'):
+            return [('', (), True)]
+        return None
+    
+    def merge_table_delta(self, db_name, db_config, table_name, segments, marks):
+        """Salin baris baru (INSERT IGNORE) dan baris berubah (upsert) satu tabel, True jika berhasil"""
+        columns = self.get_table_columns(db_name, table_name)
+        passes = self.build_delta_passes(db_name, table_name, columns, marks)
+        if passes is None:
+            print(f"  [{db_name}] {table_name} tanpa key/kolom waktu, dilewati pada mode inkremental")
+            return True
+        
+        print(f"  [{db_name}] Sinkronisasi tabel: {table_name}")
+        
+        conn_source, conn_target = self.get_connections(db_config, self.target_db)
+        
+        if not conn_source or not conn_target:
+            print(f"  Tidak dapat terkoneksi ke database {db_name}")
+            for conn in (conn_source, conn_target):
+                if conn:
+                    conn.close()
+            return False
+        
+        cursor_target = conn_target.cursor()
+        
+        try:
+            duplicates = self.id_remap.get((table_name, db_name))
+            transform = self.make_segment_transformer(table_name, columns, db_name, segments)
+            inserted = 0
+            updated = 0
+            
+            for where, params, upsert in passes:
+                rows = self.iter_source_rows(conn_source, table_name, where, params)
+                if duplicates:
+                    dup_index = columns.index(self.get_key_column(table_name, columns))
+                    rows = (row for row in rows if row[dup_index] not in duplicates)
+                
+                with closing(self.iter_metered_batches(db_name, table_name, rows, transform, self.batch_size)) as batches:
+                    for batch in batches:
+                        written, _ = self.write_metered(
+                            self.write_batch, db_name, conn_target, cursor_target, table_name, columns, batch,
+                            upsert=upsert
+                        )
+                        if upsert:
+                            updated += written
+                        else:
+                            inserted += written
+            
+            print(f"    [{db_name}] {inserted} records inserted, {updated} upserted in {table_name}")
+            return True
+        
+        except Error as e:
+            print(f"Error processing {db_name}.{table_name}: {e}")
+            conn_target.rollback()
+            return False
+        finally:
+            cursor_target.close()
+            conn_source.close()
+            conn_target.close()
+    
+    def iter_source_rows(self, conn_source, table_name, where='', params=(), order_by=None):
+        """Membaca tabel source secara streaming, fetch_size baris per chunk"""
+        query = f"SELECT * FROM {table_name}{where}"
+        if order_by:
+            query += f" ORDER BY {order_by}"
+        
+        cursor = conn_source.cursor(buffered=False)
+        try:
+            # Beri waktu lebih bagi server saat client sibuk menulis ke target
+            cursor.execute(f"SET SESSION net_write_timeout = {self.net_write_timeout}")
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(self.fetch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            try:
+                cursor.close()
+            except Error:
+                pass
+    
+    def iter_source_range(self, conn_source, table_name, columns, key_column, lower=None, upper=None):
+        """Membaca rentang key (lower, upper] dengan keyset pagination
+        
+        Setiap halaman adalah query terpisah WHERE key > ? ... ORDER BY key
+        LIMIT page_size, sehingga tidak ada cursor yang terbuka lama. Isi
+        halaman tetap di-stream per fetch_size baris, bukan fetchall.
+        """
+        key_index = columns.index(key_column)
+        cursor = conn_source.cursor(buffered=False)
+        try:
+            while True:
+                where, params = self.build_range_where(key_column, lower, upper)
+                cursor.execute(
+                    f"SELECT * FROM {table_name}{where} ORDER BY {key_column} LIMIT %s",
+                    params + (self.page_size,)
+                )
+                page_rows = 0
+                while True:
+                    rows = cursor.fetchmany(self.fetch_size)
+                    if not rows:
+                        break
+                    page_rows += len(rows)
+                    lower = rows[-1][key_index]
+                    yield from rows
+                if page_rows < self.page_size:
+                    break
+        finally:
+            try:
+                cursor.close()
+            except Error:
+                pass
+    
+    def iter_metered_batches(self, db_name, table_name, rows, transform, batch_size):
+        """Batch baris hasil transform; waktu baca dan transform dicatat ke metrik
+        
+        Dengan pipeline_depth > 0, pembacaan source dan transform berjalan
+        di thread sendiri (lihat iter_pipelined) sementara pemanggil menulis
+        batch sebelumnya ke target.
+        """
+        row_length = self.get_avg_row_length(db_name, table_name)
+        
+        def read_batches():
+            while True:
+                started = time.perf_counter()
+                source_rows = list(islice(rows, batch_size))
+                if not source_rows:
+                    return
+                self.metrics.record(
+                    db_name, table_name,
+                    rows_read=len(source_rows),
+                    bytes=len(source_rows) * row_length,
+                    read_seconds=time.perf_counter() - started
+                )
+                yield source_rows
+        
+        def transform_batch(source_rows):
+            started = time.perf_counter()
+            batch = [transform(row) for row in source_rows]
+            self.metrics.record(db_name, table_name, transform_seconds=time.perf_counter() - started)
+            return batch
+        
+        if self.pipeline_depth:
+            return self.iter_pipelined(read_batches(), transform_batch, self.pipeline_depth)
+        return (transform_batch(source_rows) for source_rows in read_batches())
+    
+    def iter_pipelined(self, batches, transform_batch, depth):
+        """Jalankan stage baca dan transform di thread terpisah, dihubungkan queue berbatas
+        
+        Generator ini menghasilkan batch hasil transform untuk stage tulis di
+        thread pemanggil, sehingga ketiga stage berjalan bersamaan dan
+        kecepatannya mengikuti stage paling lambat. Setiap queue menampung
+        paling banyak depth batch. Exception di stage baca/transform
+        diteruskan ke pemanggil; bila pemanggil berhenti lebih awal, kedua
+        thread dihentikan sebelum generator selesai.
+        """
+        stop = threading.Event()
+        read_queue = Queue(depth)
+        write_queue = Queue(depth)
+        
+        # Item queue: batch (list), exception dari stage sebelumnya, atau None (selesai)
+        def put(target_queue, item):
+            while not stop.is_set():
+                try:
+                    target_queue.put(item, timeout=0.1)
+                    return True
+                except Full:
+                    continue
+            return False
+        
+        def get(source_queue):
+            while not stop.is_set():
+                try:
+                    return source_queue.get(timeout=0.1)
+                except Empty:
+                    continue
+            return None
+        
+        def read_stage():
+            try:
+                for batch in batches:
+                    if not put(read_queue, batch):
+                        break
+                else:
+                    put(read_queue, None)
+            except BaseException as e:
+                put(read_queue, e)
+            finally:
+                batches.close()
+        
+        def transform_stage():
+            try:
+                while True:
+                    item = get(read_queue)
+                    if item is None or isinstance(item, BaseException):
+                        put(write_queue, item)
+                        return
+                    if not put(write_queue, transform_batch(item)):
+                        return
+            except BaseException as e:
+                put(write_queue, e)
+        
+        threads = [
+            threading.Thread(target=read_stage, daemon=True),
+            threading.Thread(target=transform_stage, daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+        
+        try:
+            while True:
+                item = write_queue.get()
+                if item is None:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+    
+    def write_metered(self, write, db_name, conn_target, cursor_target, table_name, columns, batch, **kwargs):
+        """Jalankan fungsi tulis batch dan catat waktu serta hasilnya ke metrik"""
+        started = time.perf_counter()
+        inserted, skipped = write(conn_target, cursor_target, table_name, columns, batch, **kwargs)
+        self.metrics.record(
+            db_name, table_name,
+            inserted=inserted, skipped=skipped,
+            write_seconds=time.perf_counter() - started
+        )
+        return inserted, skipped
+    
+    def get_avg_row_length(self, db_name, table_name):
+        """Perkiraan byte per baris dari statistik INFORMATION_SCHEMA di snapshot"""
+        table = self.schema.get(db_name, {}).get('tables', {}).get(table_name, {})
+        rows = table.get('rows') or 0
+        return (table.get('data_length') or 0) // rows if rows else 0
+    
+    def get_shifted_columns(self, table_name, columns):
+        """Kolom yang nilainya harus digeser, beserta tabel auto increment asal ID-nya"""
+        shifted = {}
+        
+        # Kolom auto increment milik tabel itu sendiri
+        if table_name in self.auto_increment_tables:
+            ai_column = self.auto_increment_tables[table_name]['column']
+            if ai_column in columns:
+                shifted[ai_column] = [table_name]
+        
+        # Foreign key ke tabel referensi yang memiliki auto increment
+        for related_table, relation_info in self.relations.items():
+            fk_column = relation_info['related_tables'].get(table_name)
+            if fk_column in columns and related_table in self.auto_increment_tables:
+                shifted.setdefault(fk_column, []).append(related_table)
+        
+        return shifted
+    
+    def get_column_offsets(self, table_name, columns, offsets, db_name):
+        """Offset per kolom (auto increment dan foreign key) untuk satu tabel dari satu source"""
+        shifts = {
+            column: sum(offsets.get(ref_table, {}).get(db_name, 0) for ref_table in ref_tables)
+            for column, ref_tables in self.get_shifted_columns(table_name, columns).items()
+        }
+        return {column: shift for column, shift in shifts.items() if shift}
+    
+    def make_segment_transformer(self, table_name, columns, db_name, segments):
+        """Fungsi rewrite baris untuk mode inkremental, memakai pemetaan ID per rentang"""
+        remapped = self.get_remapped_columns(table_name, columns, db_name)
+        mappers = []
+        for column, ref_tables in self.get_shifted_columns(table_name, columns).items():
+            for ref_table in ref_tables:
+                mapping = segments.get(ref_table, {}).get(db_name)
+                if mapping:
+                    mappers.append((columns.index(column), mapping.map, remapped.get(column, {})))
+        
+        def transform(row):
+            values = list(row)
+            for idx, map_id, remap in mappers:
+                if values[idx] is not None:
+                    values[idx] = remap.get(values[idx]) or map_id(values[idx])
+            return values
+        
+        return transform
+    
+    def make_row_transformer(self, table_name, columns, offsets, db_name):
+        """Membuat fungsi rewrite baris; offset kolom dihitung sekali per tabel"""
+        shifts = [
+            (columns.index(column), shift)
+            for column, shift in self.get_column_offsets(table_name, columns, offsets, db_name).items()
+        ]
+        
+        # Foreign key ke baris master duplikat diarahkan ke ID kanonik (lookup dict O(1))
+        remapped = [
+            (columns.index(column), mapping)
+            for column, mapping in self.get_remapped_columns(table_name, columns, db_name).items()
+        ]
+        
+        def transform(row):
+            values = list(row)
+            for idx, shift in shifts:
+                if values[idx] is not None:
+                    values[idx] += shift
+            for idx, mapping in remapped:
+                if row[idx] in mapping:
+                    values[idx] = mapping[row[idx]]
+            return values
+        
+        return transform
+    
+    def get_max_allowed_packet(self, conn):
+        """Membaca max_allowed_packet dari server target"""
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT @@max_allowed_packet")
+            self.max_allowed_packet = int(cursor.fetchone()[0])
+            cursor.close()
+        except Error as e:
+            print(f"  Tidak dapat membaca max_allowed_packet, memakai {self.max_allowed_packet}: {e}")
+        return self.max_allowed_packet
+    
+    def estimate_row_size(self, values):
+        """Perkiraan ukuran satu baris di dalam statement INSERT (byte)"""
+        size = 4
+        for value in values:
+            if value is None:
+                size += 5
+            elif isinstance(value, (bytes, bytearray)):
+                # Data biner bisa membesar dua kali lipat karena escaping
+                size += 2 * len(value) + 3
+            else:
+                # Hitung byte UTF-8, bukan karakter: teks non-ASCII bisa 4 byte per karakter
+                size += 2 * len(str(value).encode('utf-8')) + 3
+        return size
+    
+    def split_by_packet(self, rows):
+        """Pecah batch menjadi beberapa statement yang muat di max_allowed_packet"""
+        # Sisakan ruang untuk teks statement dan header protokol
+        limit = max(self.max_allowed_packet - 64 * 1024, 1024)
+        chunk = []
+        chunk_size = 0
+        
+        for values in rows:
+            row_size = self.estimate_row_size(values)
+            if chunk and chunk_size + row_size > limit:
+                yield chunk
+                chunk = []
+                chunk_size = 0
+            chunk.append(values)
+            chunk_size += row_size
+        
+        if chunk:
+            yield chunk
+    
+    def get_primary_key_columns(self, table_name, columns):
+        """Kolom primary key tabel (urut snapshot skema) ditambah kolom auto increment"""
+        keys = []
+        for snapshot in self.schema.values():
+            table = snapshot['tables'].get(table_name)
+            if table:
+                keys = [column for column in table.get('primary_key', []) if column in columns]
+                break
+        key_column = self.get_key_column(table_name, columns)
+        if key_column and key_column not in keys:
+            keys.append(key_column)
+        return keys
+    
+    def build_insert_query(self, table_name, columns, row_count, upsert=False):
+        """INSERT IGNORE multi-row, INSERT ... ON DUPLICATE KEY UPDATE untuk upsert,
+        atau REPLACE untuk tabel di replace_tables"""
+        row_placeholder = '(' + ', '.join(['%s'] * len(columns)) + ')'
+        values = ', '.join([row_placeholder] * row_count)
         
-        source_config = list(self.databases.values())[0]
-        conn_source = self.get_connection(source_config)
-        conn_target = self.get_connection(self.target_db)
+        if upsert:
+            # Key tidak ikut di-update: baris delta yang bentrok di UNIQUE key sekunder
+            # (mis. item_code) tidak boleh mengganti ID baris lama yang dirujuk tabel lain
+            keys = self.get_primary_key_columns(table_name, columns)
+            updates = ', '.join(f"{column} = VALUES({column})" for column in columns if column not in keys)
+            if updates:
+                return f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES {values} ON DUPLICATE KEY UPDATE {updates}"
+            return f"INSERT IGNORE INTO {table_name} ({', '.join(columns)}) VALUES {values}"
+        if table_name in self.replace_tables:
+            return f"REPLACE INTO {table_name} ({', '.join(columns)}) VALUES {values}"
+        return f"INSERT IGNORE INTO {table_name} ({', '.join(columns)}) VALUES {values}"
+    
+    def write_batch(self, conn_target, cursor_target, table_name, columns, rows, upsert=False):
+        """Tulis satu batch baris dengan INSERT IGNORE multi-row, commit per batch
         
-        if conn_source and conn_target:
-            cursor_source = conn_source.cursor()
-            cursor_target = conn_target.cursor()
-            
+        Dengan upsert=True baris yang primary key-nya sudah ada di target
+        diperbarui (lihat execute_insert); tabel di replace_tables memakai
+        REPLACE. Semua baris yang berhasil ditulis dihitung sebagai
+        inserted. Deadlock dan lock wait timeout diulang (lihat
+        execute_with_retry); batch yang gagal karena isi baris (ROW_ERRORS)
+        dipecah dua secara rekursif (lihat write_bisect) sehingga hanya
+        baris bermasalah yang ditolak. Error lain menggagalkan unit.
+        """
+        insert_count = 0
+        skip_count = 0
+        
+        for chunk in self.split_by_packet(rows):
             try:
-                # Dapatkan daftar tabel
-                cursor_source.execute("SHOW TABLES")
-                tables = [table[0] for table in cursor_source.fetchall()]
-                
-                for table_name in tables:
-                    # Dapatkan CREATE TABLE statement
-                    cursor_source.execute(f"SHOW CREATE TABLE {table_name}")
-                    create_result = cursor_source.fetchone()
-                    if create_result:
-                        create_stmt = create_result[1]
-                        
-                        # Eksekusi di target
-                        cursor_target.execute(f"DROP TABLE IF EXISTS {table_name}")
-                        cursor_target.execute(create_stmt)
-                        print(f"Tabel {table_name} dibuat")
-                
-                conn_target.commit()
-                
+                inserted = self.execute_with_retry(conn_target, cursor_target, table_name, columns, chunk, upsert)
+            except Error as e:
+                if e.errno not in self.ROW_ERRORS:
+                    # Koneksi/server/lock bermasalah, bukan baris: gagalkan unit agar bisa di-resume
+                    raise
+                inserted, rejected = self.write_bisect(conn_target, cursor_target, table_name, columns, chunk, upsert, e)
+                print(
+                    f"    Batch {table_name} gagal ({e}); {rejected} baris ditolak, "
+                    f"dicatat di {self.get_reject_path(table_name)}"
+                )
+            insert_count += inserted
+            skip_count += len(chunk) - inserted
+        
+        return insert_count, skip_count
+    
+    def execute_with_retry(self, conn_target, cursor_target, table_name, columns, rows, upsert=False):
+        """execute_insert yang diulang dengan jeda eksponensial saat deadlock/lock wait timeout
+        
+        Transaksi sudah di-rollback saat error diteruskan ke pemanggil.
+        """
+        for attempt in range(self.write_retries + 1):
+            try:
+                return self.execute_insert(conn_target, cursor_target, table_name, columns, rows, upsert)
             except Error as e:
-                print(f"Error creating tables: {e}")
                 conn_target.rollback()
-            finally:
-                cursor_source.close()
-                cursor_target.close()
-                conn_source.close()
-                conn_target.close()
+                if e.errno not in self.RETRY_ERRORS or attempt == self.write_retries:
+                    raise
+                delay = self.retry_delay * 2 ** attempt
+                print(f"    Batch {table_name} gagal ({e}), diulang dalam {delay:g} detik")
+                time.sleep(delay)
     
-    def merge_data(self):
-        """Proses merge data dari semua database source ke target"""
-        print("Memulai proses merge data...")
+    def execute_insert(self, conn_target, cursor_target, table_name, columns, rows, upsert=False):
+        """Eksekusi satu statement multi-row lalu commit; jumlah baris yang tertulis
         
-        # Offset untuk auto increment values
-        offsets = {}
-        current_max_values = {}
+        Dengan upsert=True hanya baris yang primary key-nya sudah ada di
+        target yang ditulis dengan ON DUPLICATE KEY UPDATE; sisanya memakai
+        INSERT IGNORE, sehingga baris baru yang bentrok di UNIQUE key
+        sekunder tidak menimpa baris source lain.
+        """
+        existing, fresh = self.split_existing_rows(cursor_target, table_name, columns, rows) if upsert else ([], rows)
+        inserted = 0
+        if existing:
+            # Key yang sama pasti ditemukan lebih dulu di primary key, jadi baris itu yang di-update
+            insert_query = self.build_insert_query(table_name, columns, len(existing), upsert=True)
+            cursor_target.execute(insert_query, [value for values in existing for value in values])
+            inserted += len(existing)
+        if fresh:
+            insert_query = self.build_insert_query(table_name, columns, len(fresh))
+            cursor_target.execute(insert_query, [value for values in fresh for value in values])
+            if table_name in self.replace_tables:
+                inserted += len(fresh)
+            else:
+                inserted += max(cursor_target.rowcount, 0)
+        conn_target.commit()
+        return inserted
+    
+    def split_existing_rows(self, cursor_target, table_name, columns, rows):
+        """Pisahkan baris yang primary key-nya sudah ada di target: (sudah ada, belum ada)
         
-        # Hitung offset untuk setiap tabel auto increment
-        for table_name, info in self.auto_increment_tables.items():
-            current_max = 0
-            offsets[table_name] = {}
-            
-            for db_name in self.databases.keys():
-                offsets[table_name][db_name] = current_max
-                current_max += info['max_values'].get(db_name, 0)
-            
-            current_max_values[table_name] = current_max
+        Tabel tanpa primary key tidak pernah di-upsert (semua baris dianggap baru).
+        """
+        keys = self.get_primary_key_columns(table_name, columns)
+        if not keys:
+            return [], rows
         
-        # Proses merge untuk setiap database source
-        for db_name, db_config in self.databases.items():
-            print(f"\nProcessing database: {db_name}")
-            self.merge_database_data(db_name, db_config, offsets)
+        indexes = [columns.index(column) for column in keys]
+        row_keys = [tuple(values[index] for index in indexes) for values in rows]
+        placeholder = '(' + ', '.join(['%s'] * len(keys)) + ')'
+        cursor_target.execute(
+            f"SELECT {', '.join(keys)} FROM {table_name} "
+            f"WHERE ({', '.join(keys)}) IN ({', '.join([placeholder] * len(rows))})",
+            [value for key in row_keys for value in key]
+        )
+        found = {tuple(row) for row in cursor_target.fetchall()}
         
-        # Update auto increment values di target
-        self.update_auto_increment_values(current_max_values)
+        existing = []
+        fresh = []
+        for values, key in zip(rows, row_keys):
+            (existing if key in found else fresh).append(values)
+        return existing, fresh
     
-    def merge_database_data(self, db_name, db_config, offsets):
-        """Merge data dari satu database source"""
-        conn_source = self.get_connection(db_config)
-        conn_target = self.get_connection(self.target_db)
+    def write_bisect(self, conn_target, cursor_target, table_name, columns, rows, upsert, error):
+        """Pecah batch yang gagal menjadi dua secara rekursif untuk menemukan baris bermasalah
         
-        if not conn_source or not conn_target:
-            print(f"  Tidak dapat terkoneksi ke database {db_name}")
-            return
+        Setengah yang berhasil tetap dimuat dengan statement multi-row;
+        baris tunggal yang tetap gagal ditulis ke file reject beserta error
+        MySQL-nya. Mengembalikan (inserted, rejected).
+        """
+        if len(rows) == 1:
+            self.reject_rows(table_name, rows, error)
+            return 0, 1
         
-        cursor_source = conn_source.cursor()
-        cursor_target = conn_target.cursor()
+        inserted = 0
+        rejected = 0
+        middle = len(rows) // 2
+        for half in (rows[:middle], rows[middle:]):
+            try:
+                inserted += self.execute_with_retry(conn_target, cursor_target, table_name, columns, half, upsert)
+            except Error as e:
+                if e.errno not in self.ROW_ERRORS:
+                    raise
+                half_inserted, half_rejected = self.write_bisect(
+                    conn_target, cursor_target, table_name, columns, half, upsert, e
+                )
+                inserted += half_inserted
+                rejected += half_rejected
+        return inserted, rejected
+    
+    def get_reject_path(self, table_name):
+        return os.path.join(self.reject_dir, f"{table_name}.reject.tsv")
+    
+    def reject_rows(self, table_name, rows, error):
+        """Catat baris yang ditolak: errno, pesan error, lalu nilai kolom (format TSV LOAD DATA)"""
+        message = self.encode_tsv_value(getattr(error, 'msg', None) or str(error))
+        with self._reject_lock:
+            os.makedirs(self.reject_dir, exist_ok=True)
+            with open(self.get_reject_path(table_name), 'ab') as f:
+                prefix = str(error.errno or '').encode('ascii') + b'\t' + message + b'\t'
+                for values in rows:
+                    f.write(prefix)
+                    self.write_tsv_rows(f, [values])
+    
+    @staticmethod
+    def encode_tsv_value(value):
+        """Encode satu nilai ke format teks LOAD DATA (escape backslash, NULL = \\N)"""
+        if value is None:
+            return b'\\N'
+        if isinstance(value, (bytes, bytearray)):
+            data = bytes(value)
+        elif isinstance(value, bool):
+            data = b'1' if value else b'0'
+        elif isinstance(value, datetime):
+            data = value.isoformat(sep=' ').encode('ascii')
+        elif isinstance(value, (date, dt_time)):
+            data = value.isoformat().encode('ascii')
+        elif isinstance(value, timedelta):
+            # Kolom TIME dikembalikan connector sebagai timedelta
+            sign = '-' if value < timedelta(0) else ''
+            seconds = abs(value)
+            hours, rest = divmod(seconds.days * 86400 + seconds.seconds, 3600)
+            minutes, secs = divmod(rest, 60)
+            text = f"{sign}{hours:02d}:{minutes:02d}:{secs:02d}"
+            if seconds.microseconds:
+                text += f".{seconds.microseconds:06d}"
+            data = text.encode('ascii')
+        elif isinstance(value, (set, frozenset)):
+            # Kolom SET dikembalikan sebagai set of str
+            data = ','.join(sorted(value)).encode('utf-8')
+        else:
+            data = str(value).encode('utf-8')
+        
+        return (
+            data.replace(b'\\', b'\\\\')
+            .replace(b'\t', b'\\t')
+            .replace(b'\n', b'\\n')
+            .replace(b'\r', b'\\r')
+            .replace(b'\0', b'\\0')
+        )
+    
+    @staticmethod
+    def decode_tsv_value(field):
+        """Kebalikan encode_tsv_value: bytes mentah, atau None untuk \\N"""
+        if field == b'\\N':
+            return None
+        if b'\\' not in field:
+            return field
+        return re.sub(
+            rb'\\(.)',
+            lambda match: {b't': b'\t', b'n': b'\n', b'r': b'\r', b'0': b'\0'}.get(match.group(1), match.group(1)),
+            field,
+            flags=re.DOTALL
+        )
+    
+    @classmethod
+    def encode_sql_value(cls, value):
+        """Literal SQL satu nilai; newline di-escape sehingga statement tetap satu baris
+        
+        Escape TSV (\\\\, \\t, \\n, \\r, \\0) juga berlaku di string literal MySQL,
+        jadi cukup ditambah escape tanda kutip. Data biner ditulis heksadesimal.
+        """
+        if value is None:
+            return b'NULL'
+        if isinstance(value, (bytes, bytearray)):
+            return b"X'" + bytes(value).hex().encode('ascii') + b"'"
+        if isinstance(value, (int, float)):
+            return cls.encode_tsv_value(value)
+        return b"'" + cls.encode_tsv_value(value).replace(b"'", b"\\'") + b"'"
+    
+    def write_tsv_rows(self, fileobj, rows):
+        """Tulis baris ke file TSV biner yang bisa dibaca LOAD DATA"""
+        for values in rows:
+            fileobj.write(b'\t'.join(self.encode_tsv_value(value) for value in values) + b'\n')
+    
+    def load_batch_infile(self, conn_target, cursor_target, table_name, columns, rows):
+        """Muat satu batch lewat LOAD DATA LOCAL INFILE ... IGNORE, commit per batch
+        
+        Bila worker lain sudah beralih ke mode insert, batch langsung ditulis
+        dengan write_batch tanpa mencoba LOAD DATA lagi.
+        """
+        if self.load_mode != 'infile':
+            return self.write_batch(conn_target, cursor_target, table_name, columns, rows)
         
+        fd, path = tempfile.mkstemp(prefix=f"{table_name}_", suffix='.tsv', dir=self.infile_dir)
         try:
-            # Dapatkan daftar tabel
-            cursor_source.execute("SHOW TABLES")
-            tables = [table[0] for table in cursor_source.fetchall()]
-            
-            # Urutan proses berdasarkan dependencies
-            processing_order = self.get_processing_order(tables)
+            with os.fdopen(fd, 'wb') as f:
+                self.write_tsv_rows(f, rows)
             
-            for table_name in processing_order:
-                if table_name not in tables:
-                    continue
-                    
-                print(f"  Memproses tabel: {table_name}")
-                
-                # Dapatkan semua data dari source
-                cursor_source.execute(f"SELECT * FROM {table_name}")
-                rows = cursor_source.fetchall()
-                
-                if not rows:
-                    print(f"    Tabel {table_name} kosong, dilewati")
-                    continue
-                
-                # Dapatkan nama kolom
-                cursor_source.execute(f"DESCRIBE {table_name}")
-                columns_info = cursor_source.fetchall()
-                columns = [col[0] for col in columns_info]
-                
-                placeholders = ', '.join(['%s'] * len(columns))
-                column_names = ', '.join(columns)
-                
-                insert_count = 0
-                skip_count = 0
-                
-                for row in rows:
-                    values = list(row)
-                    
-                    # Handle auto increment columns
-                    if table_name in self.auto_increment_tables:
-                        ai_column = self.auto_increment_tables[table_name]['column']
-                        if ai_column in columns:
-                            col_index = columns.index(ai_column)
-                            if values[col_index] is not None:
-                                # Apply offset
-                                original_value = values[col_index]
-                                new_value = original_value + offsets[table_name].get(db_name, 0)
-                                values[col_index] = new_value
-                    
-                    # Handle foreign keys
-                    values = self.update_foreign_keys(table_name, values, columns, offsets, db_name)
-                    
-                    # Insert data
-                    try:
-                        insert_query = f"INSERT IGNORE INTO {table_name} ({column_names}) VALUES ({placeholders})"
-                        cursor_target.execute(insert_query, values)
-                        if cursor_target.rowcount > 0:
-                            insert_count += 1
-                        else:
-                            skip_count += 1
-                    except Error as e:
-                        print(f"    Error inserting into {table_name}: {e}")
-                        # Coba insert dengan approach berbeda untuk error tertentu
-                        try:
-                            # Untuk error duplicate, coba dengan approach berbeda
-                            insert_query = f"REPLACE INTO {table_name} ({column_names}) VALUES ({placeholders})"
-                            cursor_target.execute(insert_query, values)
-                            if cursor_target.rowcount > 0:
-                                insert_count += 1
-                        except Error as e2:
-                            print(f"    Juga gagal dengan REPLACE: {e2}")
-                            skip_count += 1
-                
-                conn_target.commit()
-                print(f"    {insert_count} records inserted, {skip_count} skipped in {table_name}")
-        
+            # IGNORE mempertahankan semantik INSERT IGNORE untuk duplikat
+            duplicates = 'REPLACE' if table_name in self.replace_tables else 'IGNORE'
+            load_query = (
+                f"LOAD DATA LOCAL INFILE %s {duplicates} INTO TABLE {table_name} "
+                # Teks di file ditulis sebagai UTF-8 (encode_tsv_value); kolom biner tidak dikonversi
+                "CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+                "LINES TERMINATED BY '\\n' "
+                f"({', '.join(columns)})"
+            )
+            cursor_target.execute(load_query, (path,))
+            inserted = len(rows) if duplicates == 'REPLACE' else max(cursor_target.rowcount, 0)
+            conn_target.commit()
+            return inserted, len(rows) - inserted
         except Error as e:
-            print(f"Error processing {db_name}: {e}")
             conn_target.rollback()
+            if e.errno in (
+                errorcode.ER_NOT_ALLOWED_COMMAND,
+                errorcode.ER_CLIENT_LOCAL_FILES_DISABLED,
+                errorcode.CR_LOAD_DATA_LOCAL_INFILE_REJECTED
+            ):
+                # local_infile dimatikan di server/client: kembali ke mode INSERT (sekali untuk semua worker)
+                with self._load_mode_lock:
+                    if self.load_mode == 'infile':
+                        print(f"    LOAD DATA LOCAL INFILE tidak diizinkan ({e}), beralih ke mode insert")
+                        self.load_mode = 'insert'
+            else:
+                print(f"    Error LOAD DATA into {table_name}: {e}")
+            return self.write_batch(conn_target, cursor_target, table_name, columns, rows)
         finally:
-            cursor_source.close()
-            cursor_target.close()
-            conn_source.close()
-            conn_target.close()
+            try:
+                os.remove(path)
+            except OSError:
+                pass
     
     def get_processing_order(self, tables):
         """Mendapatkan urutan proses berdasarkan dependencies"""
-        # Prioritaskan tabel master/referensi terlebih dahulu
-        master_tables = [
-            'mst_gmd', 'mst_author', 'mst_topic', 'mst_publisher', 'mst_language',
-            'mst_place', 'mst_coll_type', 'mst_location', 'mst_item_status',
-            'mst_member_type', 'user_group', 'mst_module', 'mst_carrier_type',
-            'mst_content_type', 'mst_media_type', 'mst_frequency', 'mst_label',
-            'mst_loan_rules', 'mst_relation_term', 'mst_servers', 'mst_supplier'
-        ]
-        
-        # Kemudian tabel utama
-        main_tables = [
-            'user', 'member', 'biblio', 'item', 'files', 'content'
-        ]
+        # Prioritaskan tabel master/referensi, kemudian tabel utama
+        master_tables = self.MASTER_TABLES
+        main_tables = self.MAIN_TABLES
         
         # Terakhir tabel transaksi dan relasi
         transaction_tables = [
@@ -367,21 +3276,13 @@ class DatabaseMerger:
         
         return ordered_tables
     
-    def update_foreign_keys(self, table_name, values, columns, offsets, db_name):
-        """Update nilai foreign keys berdasarkan offset"""
-        updated_values = values.copy()
-        
-        for related_table, relation_info in self.relations.items():
-            if table_name in relation_info['related_tables']:
-                fk_column = relation_info['primary_key']
-                if fk_column in columns:
-                    idx = columns.index(fk_column)
-                    if updated_values[idx] is not None:
-                        # Apply offset jika tabel referensi memiliki auto increment
-                        if related_table in offsets:
-                            updated_values[idx] += offsets[related_table].get(db_name, 0)
-        
-        return updated_values
+    def get_table_tier(self, table_name):
+        """Tier tabel di get_processing_order: 0 master, 1 utama, 2 transaksi/relasi"""
+        if table_name in self.MASTER_TABLES:
+            return 0
+        if table_name in self.MAIN_TABLES:
+            return 1
+        return 2
     
     def update_auto_increment_values(self, current_max_values):
         """Update nilai auto increment di tabel target"""
@@ -412,96 +3313,816 @@ class DatabaseMerger:
             cursor.close()
             conn.close()
     
+    def get_verify_segments(self):
+        """Pemetaan ID yang berlaku di target: dari journal, atau dari offset merge penuh"""
+        segments = self.journal.load_segments() if self.journal else {}
+        if segments:
+            return segments
+        
+        offsets, _ = self.compute_offsets()
+        for table_name, info in self.auto_increment_tables.items():
+            for db_name, max_value in info['max_values'].items():
+                offset = offsets.get(table_name, {}).get(db_name, 0)
+                segments.setdefault(table_name, {})[db_name] = [(0, max_value, offset)]
+        return segments
+    
+    def build_id_expression(self, column, ranges):
+        """Ekspresi SQL setara IdSegments.map untuk satu kolom ID"""
+        ranges = sorted(ranges)
+        if len(ranges) == 1:
+            shift = ranges[0][2]
+            return f"{column} + {shift}" if shift else column
+        
+        cases = ' '.join(
+            f"WHEN {column} > {low} THEN {column} + {shift}"
+            for low, _, shift in reversed(ranges[1:])
+        )
+        return f"(CASE {cases} ELSE {column} + {ranges[0][2]} END)"
+    
+    def build_checksum_query(self, table_name, columns, db_name=None, segments=None):
+        """Query checksum per bucket key target: (bucket, jumlah baris, SUM(CRC32(baris)))
+        
+        Untuk source (db_name diisi), kolom auto increment dan foreign key
+        dipetakan dulu ke ID target, sehingga hasilnya bisa dijumlahkan
+        antar source dan dibandingkan langsung dengan target. Tabel tanpa
+        kolom auto increment dihitung sebagai satu bucket.
+        """
+        expressions = {column: column for column in columns}
+        if db_name is not None:
+            for column, ref_tables in self.get_shifted_columns(table_name, columns).items():
+                for ref_table in ref_tables:
+                    ranges = segments.get(ref_table, {}).get(db_name)
+                    if ranges:
+                        expressions[column] = self.build_id_expression(expressions[column], ranges)
+        
+        row_hash = "CRC32(CONCAT_WS('|', " + ', '.join(
+            f"IFNULL({expressions[column]}, 'NULL')" for column in columns
+        ) + "))"
+        
+        key_column = self.get_key_column(table_name, columns)
+        bucket = f"FLOOR(({expressions[key_column]}) / {self.verify_chunk})" if key_column else "0"
+        where = ''
+        ranges = segments.get(table_name, {}).get(db_name) if db_name is not None and key_column else None
+        if ranges:
+            # Baris source di atas rentang yang sudah di-merge belum disalin (menunggu --incremental)
+            where = f" WHERE {key_column} <= {max(high for _, high, _ in ranges)}"
+        return (
+            f"SELECT {bucket} AS bucket, COUNT(*), SUM({row_hash}) "
+            f"FROM {table_name}{where} GROUP BY bucket"
+        )
+    
+    def checksum_table(self, db_config, query):
+        """Jalankan query checksum; {bucket: (jumlah baris, checksum)}"""
+        conn = self.get_connection(db_config, query=True)
+        if not conn:
+            return None
+        
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query)
+            return {
+                int(bucket): (count, int(checksum or 0))
+                for bucket, count, checksum in cursor.fetchall()
+            }
+        finally:
+            cursor.close()
+            conn.close()
+    
     def verify_merge(self):
-        """Verifikasi hasil merge"""
+        """Verifikasi hasil merge dengan checksum per rentang key
+        
+        Setiap tabel di setiap source dan di target di-hash per bucket
+        key target (lebar verify_chunk) langsung di server, secara paralel.
+        Checksum source dijumlahkan per bucket lalu dibandingkan dengan
+        target, sehingga rentang key yang berbeda bisa ditunjukkan.
+        Mengembalikan True jika tidak ada tabel berstatus ERROR, MISSING
+        atau MISMATCH.
+        """
         print("\nVerifying merge results...")
         
         conn = self.get_connection(self.target_db)
         if not conn:
-            return
+            return False
         
         cursor = conn.cursor()
+        try:
+            cursor.execute("SHOW TABLES")
+            target_tables = [table[0] for table in cursor.fetchall()]
+        except Error as e:
+            print(f"Error during verification: {e}")
+            return False
+        finally:
+            cursor.close()
+            conn.close()
+        
+        segments = self.get_verify_segments()
+        
+        # Kolom target mengikuti source pertama yang memiliki tabel tersebut
+        columns = {}
+        for db_name in self.databases:
+            for table in self.get_source_tables(db_name) or []:
+                if table in target_tables:
+                    columns.setdefault(table, self.get_table_columns(db_name, table))
+        
+        # Dedupe: FK ke master duplikat tidak ikut di-hash (pemetaannya hanya ada di client),
+        # dan tabel master dibandingkan dari jumlah baris setelah duplikat dibuang
+        deduped = {}
+        for (table, db_name), mapping in self.id_remap.items():
+            deduped[table] = deduped.get(table, 0) + len(mapping)
+        for table in columns:
+            remapped = set()
+            for db_name in self.databases:
+                if table in (self.get_source_tables(db_name) or []):
+                    remapped.update(self.get_remapped_columns(table, columns[table], db_name))
+            columns[table] = [column for column in columns[table] if column not in remapped]
+        
+        # Tabel turunan dibangun ulang dari target: satu baris per baris tabel dasar di target
+        derived = {
+            table: self.DERIVED_TABLES[table][0] for table in self.derived_tables
+            if table in columns and self.DERIVED_TABLES[table][0] in columns
+        }
+        
+        jobs = {}
+        for db_name, db_config in self.databases.items():
+            for table in self.get_source_tables(db_name) or []:
+                if table in columns and table not in derived:
+                    source_columns = [
+                        column for column in self.get_table_columns(db_name, table)
+                        if column in columns[table]
+                    ]
+                    query = self.build_checksum_query(table, source_columns, db_name, segments)
+                    jobs[(db_name, table)] = (db_config, query)
+        for table, table_columns in columns.items():
+            jobs[(None, table)] = (self.target_db, self.build_checksum_query(table, table_columns))
+        
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(self.checksum_table, db_config, query): key
+                for key, (db_config, query) in jobs.items()
+            }
+            for future in futures:
+                db_name, table = futures[future]
+                try:
+                    results[(db_name, table)] = future.result()
+                except Error as e:
+                    print(f"    Error checksumming {table} in {db_name or 'target'}: {e}")
+        
+        # Bandingkan gabungan checksum source dengan target
+        print("\nMerge Verification Results:")
+        print("Table Name".ljust(30) + "Expected".ljust(12) + "Actual".ljust(12) + "Status")
+        print("-" * 60)
+        
+        mismatches = {}
+        passed = True
+        for table in target_tables:
+            expected = {}
+            complete = results.get((None, table)) is not None or table not in columns
+            for db_name in self.databases:
+                if (db_name, table) in jobs:
+                    buckets = results.get((db_name, table))
+                    if buckets is None:
+                        complete = False
+                        continue
+                    for bucket, (count, checksum) in buckets.items():
+                        old_count, old_checksum = expected.get(bucket, (0, 0))
+                        expected[bucket] = (old_count + count, old_checksum + checksum)
+            
+            actual = results.get((None, table)) or {}
+            expected_rows = sum(count for count, _ in expected.values())
+            actual_rows = sum(count for count, _ in actual.values())
+            differing = sorted(
+                bucket for bucket in set(expected) | set(actual)
+                if expected.get(bucket, (0, 0)) != actual.get(bucket, (0, 0))
+            )
+            
+            if table in deduped:
+                # Baris duplikat sengaja tidak disalin; cukup bandingkan jumlah baris
+                expected_rows -= deduped[table]
+                differing = []
+            if table in derived:
+                base = results.get((None, derived[table]))
+                complete = complete and base is not None
+                expected_rows = sum(count for count, _ in (base or {}).values())
+                differing = []
+            
+            if not complete:
+                status = "ERROR"
+            elif table in derived:
+                if actual_rows == expected_rows:
+                    status = "REBUILT"
+                else:
+                    status = "MISSING" if actual_rows < expected_rows else "MISMATCH"
+            elif table in deduped:
+                if actual_rows == expected_rows:
+                    status = "DEDUPED"
+                else:
+                    status = "MISSING" if actual_rows < expected_rows else "MISMATCH"
+            elif not differing:
+                status = "OK"
+            elif actual_rows < expected_rows:
+                status = "MISSING"
+            else:
+                status = "MISMATCH"
+            if complete and differing:
+                mismatches[table] = [
+                    (bucket, expected.get(bucket, (0, 0))[0], actual.get(bucket, (0, 0))[0])
+                    for bucket in differing
+                ]
+            passed = passed and status not in ('ERROR', 'MISSING', 'MISMATCH')
+            print(f"{table.ljust(30)}{str(expected_rows).ljust(12)}{str(actual_rows).ljust(12)}{status}")
+        
+        # Rentang key target yang berbeda
+        for table, buckets in mismatches.items():
+            key_column = self.get_key_column(table, columns[table])
+            print(f"\n  {table}: {len(buckets)} rentang berbeda")
+            for bucket, expected_rows, actual_rows in buckets[:self.verify_report_limit]:
+                if key_column:
+                    low = bucket * self.verify_chunk
+                    label = f"{key_column} {low}-{low + self.verify_chunk - 1}"
+                else:
+                    label = "seluruh tabel"
+                print(f"    {label}: expected {expected_rows} rows, actual {actual_rows} rows")
+            if len(buckets) > self.verify_report_limit:
+                print(f"    ... dan {len(buckets) - self.verify_report_limit} rentang lainnya")
+        return passed
+    
+    def run_plan(self):
+        """Dry-run: tampilkan rencana merge dan estimasi waktu tanpa menulis ke database"""
+        print("Menyusun rencana merge (dry-run, tidak ada data yang ditulis)...")
+        print("=" * 50)
+        
+        if not os.path.exists(self.config_file):
+            print(f"File konfigurasi {self.config_file} tidak ditemukan!")
+            return
+        
+        self.load_config()
+        if not self.target_db:
+            print("Section [TARGET] tidak ada di konfigurasi")
+            return
+        if self.calibrate_cost_model():
+            print(f"Throughput diambil dari laporan metrik {self.metrics_file}")
         
         try:
-            # Hitung total records dari semua source databases
-            total_expected = {}
-            for db_name, db_config in self.databases.items():
-                conn_source = self.get_connection(db_config)
-                if conn_source:
-                    cursor_source = conn_source.cursor()
-                    cursor_source.execute("SHOW TABLES")
-                    tables = [table[0] for table in cursor_source.fetchall()]
-                    
-                    for table in tables:
-                        try:
-                            cursor_source.execute(f"SELECT COUNT(*) as count FROM {table}")
-                            count = cursor_source.fetchone()[0]
-                            
-                            if table not in total_expected:
-                                total_expected[table] = 0
-                            total_expected[table] += count
-                        except Error as e:
-                            print(f"    Error counting {table} in {db_name}: {e}")
+            self.analyze_auto_increment_tables()
+            self.analyze_relations()
+            offsets, current_max_values = self.compute_offsets()
+            self.check_offset_overflow(current_max_values)
+            dependencies, dependents, priority = self.build_merge_units()
+            times, total_seconds = self.simulate_schedule(dependencies, dependents, priority)
+        finally:
+            self.close_pools()
+        
+        print("\nRencana Merge (urut waktu mulai):")
+        print(
+            "Mulai".ljust(10) + "Source".ljust(12) + "Table Name".ljust(26) + "Rows".ljust(12)
+            + "Data (MB)".ljust(11) + "Offset".ljust(10) + "Bagian".ljust(8) + "Estimasi"
+        )
+        print("-" * 98)
+        
+        total_rows = 0
+        total_bytes = 0
+        serial_seconds = 0.0
+        for unit in sorted(times, key=lambda unit: (times[unit][0], priority[unit])):
+            db_name, table_name = unit
+            table = self.schema[db_name]['tables'][table_name]
+            data_bytes, seconds = self.estimate_unit_cost(db_name, table_name)
+            offset = offsets.get(table_name, {}).get(db_name)
+            total_rows += table['rows'] or 0
+            total_bytes += data_bytes
+            serial_seconds += seconds
+            print(
+                str(timedelta(seconds=int(times[unit][0]))).ljust(10) + db_name.ljust(12)
+                + table_name.ljust(26) + str(table['rows'] or 0).ljust(12)
+                + f"{data_bytes / (1024 * 1024):.1f}".ljust(11)
+                + ('-' if offset is None else str(offset)).ljust(10)
+                + str(len(self.compute_key_ranges(db_name, table_name))).ljust(8)
+                + f"{seconds:.1f}s"
+            )
+        
+        print("-" * 98)
+        print(f"Total: {len(times)} unit, ~{total_rows} baris, {total_bytes / (1024 * 1024):.1f} MB")
+        print(
+            f"Throughput per worker: {self.plan_rows_per_second:.0f} baris/detik, "
+            f"{self.plan_mb_per_second:.1f} MB/detik"
+        )
+        print(
+            f"Estimasi waktu merge data: {timedelta(seconds=int(total_seconds))} dengan {self.workers} worker "
+            f"({timedelta(seconds=int(serial_seconds))} bila berurutan)"
+        )
+        print("Catatan: jumlah baris dari INFORMATION_SCHEMA.TABLES adalah perkiraan; "
+              "analisis, pembuatan index dan verifikasi tidak termasuk")
+    
+    def get_config_signature(self):
+        """Identitas konfigurasi source/target untuk memastikan resume memakai setup yang sama"""
+        endpoints = {
+            name: [config['host'], config['port'], config['database']]
+            for name, config in [('target', self.target_db)] + list(self.databases.items())
+        }
+        return json.dumps(endpoints, sort_keys=True)
+    
+    def open_journal(self, resume=False, incremental=False):
+        """Buka journal progres; untuk resume/inkremental, pastikan journal cocok dengan konfigurasi"""
+        if not self.journal_file:
+            if resume or incremental:
+                print("Resume dan mode inkremental membutuhkan journal_file di section [MERGE]")
+                return False
+            return True
+        
+        if (resume or incremental) and not os.path.exists(self.journal_file):
+            print(f"Journal {self.journal_file} tidak ditemukan, jalankan merge penuh terlebih dahulu")
+            return False
+        
+        self.journal = MergeJournal(self.journal_file)
+        signature = self.get_config_signature()
+        
+        if not (resume or incremental):
+            self.journal.reset(signature)
+            return True
+        
+        if self.journal.get_meta('signature') != signature:
+            print(f"Journal {self.journal_file} dibuat untuk konfigurasi database yang berbeda")
+        elif incremental and not self.journal.load_sync_marks():
+            print(f"Journal {self.journal_file} belum berisi hasil merge penuh, jalankan merge penuh terlebih dahulu")
+        elif resume and (self.journal.load_offsets()[0] is None or self.journal.get_meta('server_times') is None):
+            print(f"Journal {self.journal_file} belum berisi offset dan MAX source, jalankan merge dari awal")
+        else:
+            if incremental:
+                print(f"Merge inkremental berdasarkan journal {self.journal_file}")
+            else:
+                print(f"Melanjutkan merge dari journal {self.journal_file}")
+            return True
+        
+        self.journal.close()
+        self.journal = None
+        return False
+    
+    def export_table(self, db_name, db_config, table_name, offsets):
+        """Tulis satu tabel dari satu source (sudah di-rewrite offset/FK) ke shard gzip
+        
+        Shard berisi sekitar export_shard_rows baris, dalam format TSV
+        LOAD DATA atau statement SQL satu per baris. File ditulis sebagai
+        .part lalu di-rename setelah lengkap. True jika berhasil.
+        """
+        print(f"  [{db_name}] Mengekspor tabel: {table_name}")
+        conn_source = self.get_connection(db_config)
+        if not conn_source:
+            print(f"  Tidak dapat terkoneksi ke database {db_name}")
+            return False
+        
+        columns = self.get_table_columns(db_name, table_name)
+        extension = 'sql.gz' if self.export_format == 'sql' else 'tsv.gz'
+        shards = []
+        shard_file = None
+        total = 0
+        
+        try:
+            where, params = self.build_range_where(
+                self.get_key_column(table_name, columns), None, self.get_key_bound(table_name, columns, db_name)
+            )
+            rows = self.iter_source_rows(conn_source, table_name, where, params)
+            duplicates = self.id_remap.get((table_name, db_name))
+            if duplicates:
+                dup_index = columns.index(self.get_key_column(table_name, columns))
+                rows = (row for row in rows if row[dup_index] not in duplicates)
+            transform = self.make_row_transformer(table_name, columns, offsets, db_name)
+            os.makedirs(os.path.join(self.export_dir, table_name), exist_ok=True)
+            
+            with closing(self.iter_metered_batches(db_name, table_name, rows, transform, self.batch_size)) as batches:
+                for batch in batches:
+                    if shard_file is None or shards[-1]['rows'] >= self.export_shard_rows:
+                        if shard_file:
+                            self.close_export_shard(shard_file, shards[-1])
+                        shards.append({
+                            'table': table_name,
+                            'source': db_name,
+                            'file': f"{table_name}/{db_name}.{len(shards):05d}.{extension}",
+                            'columns': columns,
+                            'rows': 0
+                        })
+                        path = os.path.join(self.export_dir, shards[-1]['file'])
+                        shard_file = gzip.open(path + '.part', 'wb')
                     
-                    cursor_source.close()
-                    conn_source.close()
+                    self.write_metered(self.write_export_batch, db_name, shard_file, None, table_name, columns, batch)
+                    shards[-1]['rows'] += len(batch)
+                    total += len(batch)
             
-            # Bandingkan dengan target
-            print("\nMerge Verification Results:")
-            print("Table Name".ljust(30) + "Expected".ljust(12) + "Actual".ljust(12) + "Status")
-            print("-" * 60)
+            if shard_file:
+                self.close_export_shard(shard_file, shards[-1])
+                shard_file = None
+            with self._export_lock:
+                self.export_shards[(table_name, db_name)] = shards
             
-            cursor.execute("SHOW TABLES")
-            target_tables = [table[0] for table in cursor.fetchall()]
+            print(f"    [{db_name}] {total} records exported from {table_name} ({len(shards)} shard)")
+            return True
+        
+        except (Error, OSError) as e:
+            print(f"Error exporting {db_name}.{table_name}: {e}")
+            if shard_file:
+                shard_file.close()
+                os.remove(shard_file.name)
+            return False
+        finally:
+            conn_source.close()
+    
+    def close_export_shard(self, shard_file, shard):
+        """Tutup shard yang sudah lengkap dan beri nama akhirnya"""
+        shard_file.close()
+        os.replace(shard_file.name, os.path.join(self.export_dir, shard['file']))
+    
+    def write_export_batch(self, shard_file, _cursor, table_name, columns, rows):
+        """Tulis satu batch ke shard: baris TSV, atau statement INSERT per max_allowed_packet"""
+        if self.export_format == 'tsv':
+            self.write_tsv_rows(shard_file, rows)
+            return len(rows), 0
+        
+        verb = 'REPLACE' if table_name in self.replace_tables else 'INSERT IGNORE'
+        for chunk in self.split_by_packet(rows):
+            values = b', '.join(
+                b'(' + b', '.join(self.encode_sql_value(value) for value in row) + b')'
+                for row in chunk
+            )
+            shard_file.write(f"{verb} INTO {table_name} ({', '.join(columns)}) VALUES ".encode('ascii'))
+            shard_file.write(values + b';\n')
+        return len(rows), 0
+    
+    def run_export(self, export_dir):
+        """Merge ke file: offset/FK ditulis ulang seperti merge biasa, tanpa koneksi target
+        
+        Hasilnya shard gzip per (tabel, source) di export_dir plus
+        manifest.json (struktur tabel, daftar shard, nilai auto increment,
+        tabel turunan) yang dibaca run_load_export.
+        """
+        print("Mengekspor hasil merge ke file (tanpa koneksi target)...")
+        print("=" * 50)
+        
+        if not os.path.exists(self.config_file):
+            print(f"File konfigurasi {self.config_file} tidak ditemukan!")
+            return False
+        
+        self.load_config()
+        self.export_dir = export_dir
+        self.export_shards = {}
+        os.makedirs(export_dir, exist_ok=True)
+        manifest_path = os.path.join(export_dir, 'manifest.json')
+        # Manifest dan catatan load lama tidak boleh menunjuk ke shard yang akan ditimpa
+        for name in ('manifest.json', 'loaded.txt'):
+            if os.path.exists(os.path.join(export_dir, name)):
+                os.remove(os.path.join(export_dir, name))
+        
+        self.metrics = MergeMetrics()
+        if self.progress_interval > 0:
+            self.metrics.start_progress(self.progress_interval)
+        
+        try:
+            with self.metrics.phase('analysis'):
+                self.analyze_auto_increment_tables()
+                self.analyze_relations()
             
-            for table in target_tables:
-                try:
-                    cursor.execute(f"SELECT COUNT(*) as count FROM {table}")
-                    actual = cursor.fetchone()[0]
-                    expected = total_expected.get(table, 0)
-                    
-                    status = "OK" if actual >= expected else "MISSING"
-                    print(f"{table.ljust(30)}{str(expected).ljust(12)}{str(actual).ljust(12)}{status}")
-                except Error as e:
-                    print(f"    Error counting {table} in target: {e}")
+            offsets, current_max_values = self.compute_offsets()
+            self.check_offset_overflow(current_max_values)
+            if self.dedupe:
+                with self.metrics.phase('dedupe'):
+                    self.id_remap = self.build_dedupe_remap(offsets)
+            
+            with self.metrics.phase('export'):
+                failed = self.run_scheduled_merge(offsets, merge_unit=self.export_table)
+            definitions = self.get_table_definitions()
+        finally:
+            self.metrics.stop_progress()
+            self.close_pools()
+            if self.metrics_file:
+                self.metrics.write_report(self.metrics_file)
+                print(f"Laporan metrik disimpan di {self.metrics_file}")
+        
+        if failed or definitions is None:
+            print("\nEkspor belum lengkap; manifest tidak ditulis, jalankan ulang --export")
+            return False
+        
+        manifest = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'format': self.export_format,
+            'sources': {db_name: db_config['database'] for db_name, db_config in self.databases.items()},
+            'tables': definitions,
+            'shards': [shard for key in sorted(self.export_shards) for shard in self.export_shards[key]],
+            'auto_increment': current_max_values,
+            'derived_tables': self.derived_tables,
+            'replace_tables': sorted(self.replace_tables)
+        }
+        with open(manifest_path + '.part', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(manifest_path + '.part', manifest_path)
+        
+        print(f"\nEkspor selesai: {len(manifest['shards'])} shard, manifest di {manifest_path}")
+        return True
+    
+    def load_export_shard(self, shard):
+        """Muat satu shard ke target; True jika berhasil
+        
+        Shard TSV dimuat lewat jalur tulis biasa (load_mode, batch_size,
+        bisection dan file reject). Shard SQL dieksekusi apa adanya per
+        statement: tanpa bisection/reject, satu baris bermasalah
+        menggagalkan shard. Jumlah baris file shard yang sudah di-commit
+        dicatat setelah setiap batch/statement, sehingga shard yang
+        terputus dilanjutkan dari baris berikutnya, bukan dari awal.
+        """
+        conn = self.get_target_connection()
+        if not conn:
+            return False
+        
+        cursor = conn.cursor()
+        table_name = shard['table']
+        lines_done = self.shard_progress.get(shard['file']) or 0
+        if lines_done:
+            print(f"  Melanjutkan {shard['file']} ({lines_done} baris sudah di-commit)")
+        inserted = 0
+        skipped = 0
+        try:
+            with gzip.open(os.path.join(self.export_dir, shard['file']), 'rb') as f:
+                lines = islice(f, lines_done, None)
+                if shard['file'].endswith('.sql.gz'):
+                    for statement in lines:
+                        cursor.execute(statement.rstrip(b';\n'))
+                        inserted += max(cursor.rowcount, 0)
+                        conn.commit()
+                        lines_done += 1
+                        self.record_shard_progress(shard, lines_done)
+                    # Jumlah baris per statement tidak dicatat: skipped hanya dihitung bila shard dimuat dari awal
+                    if not self.shard_progress.get(shard['file']):
+                        skipped = max(shard['rows'] - inserted, 0)
+                else:
+                    if self.load_mode == 'infile':
+                        batch_size, write = self.infile_rows, self.load_batch_infile
+                    else:
+                        batch_size, write = self.batch_size, self.write_batch
+                    rows = ([self.decode_tsv_value(field) for field in line[:-1].split(b'\t')] for line in lines)
+                    while True:
+                        batch = list(islice(rows, batch_size))
+                        if not batch:
+                            break
+                        batch_inserted, batch_skipped = self.write_metered(
+                            write, shard['source'], conn, cursor, table_name, shard['columns'], batch
+                        )
+                        inserted += batch_inserted
+                        skipped += batch_skipped
+                        lines_done += len(batch)
+                        self.record_shard_progress(shard, lines_done)
+            
+            self.record_shard_progress(shard)
+            self.print_table_result(shard['source'], f"{table_name} ({shard['file']})", inserted, skipped)
+            return True
+        except (Error, OSError) as e:
+            conn.rollback()
+            print(f"  Error loading {shard['file']}: {e}")
+            return False
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def read_shard_progress(self, export_dir):
+        """Progres load dari loaded.txt: {file shard: baris sudah di-commit, None bila selesai}
+        
+        Setiap baris berisi nama shard (selesai) atau nama shard dan
+        jumlah baris file yang sudah di-commit, dipisah tab; catatan
+        terakhir per shard yang berlaku, kecuali shard yang sudah
+        selesai. Baris terakhir yang terpotong (tanpa newline) diabaikan.
+        """
+        progress = {}
+        loaded_path = os.path.join(export_dir, 'loaded.txt')
+        if os.path.exists(loaded_path):
+            with open(loaded_path, encoding='utf-8') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        break
+                    name, _, lines_done = line.rstrip('\n').partition('\t')
+                    if name and progress.get(name, 0) is not None:
+                        progress[name] = int(lines_done) if lines_done else None
+        return progress
+    
+    def record_shard_progress(self, shard, lines_done=None):
+        """Tambahkan progres satu shard ke loaded.txt (tanpa lines_done: shard selesai)"""
+        line = shard['file'] if lines_done is None else f"{shard['file']}\t{lines_done}"
+        with self._export_lock:
+            with open(os.path.join(self.export_dir, 'loaded.txt'), 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+    
+    def run_load_export(self, export_dir):
+        """Muat hasil --export ke target secara paralel
+        
+        Progres setiap shard dicatat di loaded.txt per batch, sehingga bila
+        dijalankan ulang hanya baris sisanya yang dimuat (tabel tidak
+        dibuat ulang). Setelah itu tabel turunan, index tertunda dan
+        AUTO_INCREMENT diselesaikan seperti merge biasa.
+        """
+        print(f"Memuat hasil ekspor dari {export_dir}...")
+        print("=" * 50)
+        
+        if not os.path.exists(self.config_file):
+            print(f"File konfigurasi {self.config_file} tidak ditemukan!")
+            return False
+        manifest_path = os.path.join(export_dir, 'manifest.json')
+        if not os.path.exists(manifest_path):
+            print(f"Manifest {manifest_path} tidak ditemukan; ekspor belum selesai?")
+            return False
+        
+        self.load_config()
+        if not self.target_db:
+            print("Section [TARGET] tidak ada di konfigurasi")
+            return False
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        self.export_dir = export_dir
+        self.derived_tables = [table for table in manifest['derived_tables'] if table in self.DERIVED_TABLES]
+        self.replace_tables = set(manifest['replace_tables'])
+        
+        self.shard_progress = self.read_shard_progress(export_dir)
+        loaded = {name for name, lines_done in self.shard_progress.items() if lines_done is None}
+        pending = sorted(
+            (shard for shard in manifest['shards'] if shard['file'] not in loaded),
+            key=lambda shard: -shard['rows']
+        )
+        
+        self.metrics = MergeMetrics()
+        if self.progress_interval > 0:
+            self.metrics.start_progress(self.progress_interval)
+        
+        self.create_target_database()
         
+        try:
+            if self.shard_progress:
+                print(
+                    f"Melanjutkan load: {len(loaded)} shard sudah dimuat, "
+                    f"{len(self.shard_progress) - len(loaded)} sebagian, tabel target dipertahankan"
+                )
+                if self.fast_load:
+                    for table_name, definition in manifest['tables'].items():
+                        _, deferred = self.split_deferred_indexes(definition['create'], definition['ai_column'])
+                        if deferred:
+                            self.deferred_indexes[table_name] = deferred
+            else:
+                with self.metrics.phase('create_tables'):
+                    print("Membuat tabel di database target...")
+                    self.create_target_tables(manifest['tables'])
+            
+            conn_target = self.get_connection(self.target_db)
+            if conn_target:
+                self.get_max_allowed_packet(conn_target)
+                conn_target.close()
+            
+            # Hanya membebani target; hormati max_queries host target
+            limiter = self.get_host_limiter(self.get_endpoint(self.target_db))
+            workers = min(self.workers, limiter.max_queries or self.workers)
+            print(f"\nMemuat {len(pending)} shard dengan {workers} worker...")
+            with self.metrics.phase('load'):
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    failed = [
+                        shard['file'] for shard, ok in zip(pending, executor.map(self.load_export_shard, pending))
+                        if not ok
+                    ]
+            if failed:
+                print(f"\n{len(failed)} shard gagal dimuat; jalankan ulang --load-export untuk melanjutkan")
+                return False
+            
+            if self.derived_tables:
+                with self.metrics.phase('derived'):
+                    self.rebuild_derived_tables()
+            if self.fast_load:
+                with self.metrics.phase('index_rebuild'):
+                    self.rebuild_deferred_indexes()
+            with self.metrics.phase('auto_increment'):
+                self.update_auto_increment_values(manifest['auto_increment'])
+            with self.metrics.phase('verify'):
+                verified = self.verify_export_load(manifest)
+        finally:
+            self.metrics.stop_progress()
+            self.close_pools()
+            if self.metrics_file:
+                self.metrics.write_report(self.metrics_file)
+                print(f"Laporan metrik disimpan di {self.metrics_file}")
+        
+        print("\nLoad process completed!")
+        return verified
+    
+    def verify_export_load(self, manifest):
+        """Bandingkan jumlah baris target dengan jumlah baris di shard manifest; True jika semua cocok"""
+        print("\nVerifying loaded data...")
+        
+        expected = {table_name: 0 for table_name in manifest['tables']}
+        for shard in manifest['shards']:
+            expected[shard['table']] = expected.get(shard['table'], 0) + shard['rows']
+        
+        conn = self.get_connection(self.target_db)
+        if not conn:
+            return False
+        
+        cursor = conn.cursor()
+        actual = {}
+        try:
+            for table_name in expected:
+                cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
+                actual[table_name] = cursor.fetchone()[0]
         except Error as e:
             print(f"Error during verification: {e}")
+            return False
         finally:
             cursor.close()
             conn.close()
+        
+        # Tabel turunan dibangun ulang: satu baris per baris tabel dasar
+        for table_name in self.derived_tables:
+            base_table = self.DERIVED_TABLES[table_name][0]
+            if table_name in expected and base_table in actual:
+                expected[table_name] = actual[base_table]
+        
+        print("\nMerge Verification Results:")
+        print("Table Name".ljust(30) + "Expected".ljust(12) + "Actual".ljust(12) + "Status")
+        print("-" * 60)
+        passed = True
+        for table_name, expected_rows in expected.items():
+            actual_rows = actual[table_name]
+            if actual_rows == expected_rows:
+                status = "REBUILT" if table_name in self.derived_tables else "OK"
+            else:
+                status = "MISSING" if actual_rows < expected_rows else "MISMATCH"
+                passed = False
+            print(f"{table_name.ljust(30)}{str(expected_rows).ljust(12)}{str(actual_rows).ljust(12)}{status}")
+        return passed
     
-    def run_merge(self):
-        """Jalankan proses merge lengkap"""
+    def run_merge(self, resume=False, incremental=False):
+        """Jalankan proses merge lengkap (atau inkremental)
+        
+        Mengembalikan True hanya bila semua unit berhasil dan verifikasi
+        tidak menemukan tabel ERROR/MISSING/MISMATCH; dipakai sebagai exit
+        status script.
+        """
         print("Starting Database Merge Process...")
         print("=" * 50)
         
         # Load configuration
         if not os.path.exists(self.config_file):
             print(f"File konfigurasi {self.config_file} tidak ditemukan!")
-            return
+            return False
         
-        self.load_config()
+        if resume and incremental:
+            print("--resume dan --incremental tidak bisa dipakai bersamaan")
+            return False
         
-        # Create target database
-        self.create_target_database()
+        self.load_config()
+        if not self.target_db:
+            print("Section [TARGET] tidak ada di konfigurasi")
+            return False
+        self.resume = resume
+        self.incremental = incremental
+        if incremental:
+            # High-water mark baru harus berasal dari data source saat ini
+            self.refresh_schema = True
         
-        # Analyze database structure
-        self.analyze_auto_increment_tables()
-        self.analyze_relations()
+        if not self.open_journal(resume, incremental):
+            return False
         
-        # Create tables in target
-        self.create_tables_in_target()
+        self.metrics = MergeMetrics()
+        if self.progress_interval > 0:
+            self.metrics.start_progress(self.progress_interval)
         
-        # Merge data
-        self.merge_data()
+        # Create target database
+        self.create_target_database()
         
-        # Verify results
-        self.verify_merge()
+        try:
+            # Analyze database structure
+            with self.metrics.phase('analysis'):
+                self.analyze_auto_increment_tables()
+                self.analyze_relations()
+            
+            if self.incremental:
+                merged = self.run_incremental_merge()
+            else:
+                # Create tables in target (tidak di-drop ulang saat resume)
+                if self.resume:
+                    print("Resume: tabel target dipertahankan")
+                else:
+                    with self.metrics.phase('create_tables'):
+                        self.create_tables_in_target()
+                
+                # Merge data
+                merged = self.merge_data()
+            
+            # Verify results
+            with self.metrics.phase('verify'):
+                verified = self.verify_merge()
+        finally:
+            self.metrics.stop_progress()
+            self.close_pools()
+            if self.journal:
+                self.journal.close()
+                self.journal = None
+            if self.metrics_file:
+                self.metrics.write_report(self.metrics_file)
+                print(f"Laporan metrik disimpan di {self.metrics_file}")
         
         print("\nMerge process completed!")
+        return merged and verified
 
-def create_config_file():
+def create_config_file(config_file='database_config.ini'):
     """Membuat file konfigurasi contoh"""
     config_content = """[TARGET]
 host = localhost
@@ -530,20 +4151,42 @@ database = slims_c
 user = root
 password = root
 port = 3306
+
+[MERGE]
+batch_size = 1000
+fetch_size = 1000
+workers = 4
+load_mode = insert
 """
     
-    with open('database_config.ini', 'w') as f:
+    with open(config_file, 'w') as f:
         f.write(config_content)
     
-    print("File konfigurasi 'database_config.ini' telah dibuat.")
+    print(f"File konfigurasi '{config_file}' telah dibuat.")
     print("Silakan edit file tersebut dengan informasi database yang sesuai.")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gabungkan beberapa database SLiMS menjadi satu database")
+    parser.add_argument('--config', default='database_config.ini', help="file konfigurasi (default: database_config.ini)")
+    parser.add_argument('--resume', action='store_true', help="lanjutkan merge yang terputus dari journal progres")
+    parser.add_argument('--incremental', action='store_true', help="salin hanya baris baru/berubah sejak merge terakhir")
+    parser.add_argument('--plan', action='store_true', help="tampilkan rencana dan estimasi waktu merge tanpa menulis apa pun")
+    parser.add_argument('--export', metavar='DIR', help="tulis hasil merge ke shard gzip di DIR tanpa koneksi target")
+    parser.add_argument('--load-export', metavar='DIR', help="muat hasil --export dari DIR ke target")
+    args = parser.parse_args()
+    
     # Buat file konfigurasi jika belum ada
-    if not os.path.exists('database_config.ini'):
-        create_config_file()
-        print("\nSilakan edit database_config.ini dengan kredensial database Anda, lalu jalankan script lagi.")
+    if not os.path.exists(args.config):
+        create_config_file(args.config)
+        print(f"\nSilakan edit {args.config} dengan kredensial database Anda, lalu jalankan script lagi.")
     else:
-        # Jalankan merge process
-        merger = DatabaseMerger()
-        merger.run_merge()
+        merger = DatabaseMerger(args.config)
+        if args.plan:
+            merger.run_plan()
+        elif args.export:
+            sys.exit(0 if merger.run_export(args.export) else 1)
+        elif args.load_export:
+            sys.exit(0 if merger.run_load_export(args.load_export) else 1)
+        else:
+            # Jalankan merge process; exit status 1 bila merge gagal atau verifikasi tidak cocok
+            sys.exit(0 if merger.run_merge(resume=args.resume, incremental=args.incremental) else 1)
@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database_merger import DatabaseMerger
+
+
+@pytest.fixture
+def merger():
+    """DatabaseMerger dengan nilai default, tanpa membaca konfigurasi atau koneksi"""
+    return DatabaseMerger(config_file=os.devnull)
@@ -0,0 +1,86 @@
+import pytest
+from mysql.connector import errorcode
+from mysql.connector.errors import DatabaseError, IntegrityError, InternalError, OperationalError
+
+COLUMNS = ['loan_id', 'item_code']
+
+
+class FakeTarget:
+    """Koneksi + cursor target palsu; fail(rows) mengembalikan error untuk statement atau None"""
+
+    def __init__(self, fail):
+        self.fail = fail
+        self.committed = []
+        self.pending = []
+        self.rowcount = 0
+        self.rollbacks = 0
+
+    def execute(self, query, params):
+        rows = [tuple(params[i:i + len(COLUMNS)]) for i in range(0, len(params), len(COLUMNS))]
+        error = self.fail(rows)
+        if error is not None:
+            raise error
+        self.pending.extend(rows)
+        self.rowcount = len(rows)
+
+    def commit(self):
+        self.committed.extend(self.pending)
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def writer(merger, tmp_path):
+    merger.reject_dir = str(tmp_path)
+    merger.retry_delay = 0
+    return merger
+
+
+def rows(count):
+    return [(index, f'B{index:03d}') for index in range(1, count + 1)]
+
+
+def test_bisect_rejects_only_bad_rows(writer, tmp_path):
+    def fail(batch):
+        if (3, 'B003') in batch:
+            return IntegrityError(msg="Duplicate entry 'B003'", errno=errorcode.ER_DUP_ENTRY)
+
+    target = FakeTarget(fail)
+    assert writer.write_batch(target, target, 'loan', COLUMNS, rows(8)) == (7, 1)
+    assert sorted(target.committed) == [row for row in rows(8) if row[0] != 3]
+    lines = (tmp_path / 'loan.reject.tsv').read_bytes().splitlines()
+    assert lines == [b"1062\tDuplicate entry 'B003'\t3\tB003"]
+
+
+@pytest.mark.parametrize('errno, error_class', [
+    (errorcode.ER_LOCK_DEADLOCK, InternalError),
+    (errorcode.ER_LOCK_WAIT_TIMEOUT, DatabaseError),
+])
+def test_lock_errors_retry_whole_batch(writer, tmp_path, errno, error_class):
+    failures = [error_class(msg='lock', errno=errno)] * 2
+
+    target = FakeTarget(lambda batch: failures.pop() if failures else None)
+    assert writer.write_batch(target, target, 'loan', COLUMNS, rows(8)) == (8, 0)
+    assert target.committed == rows(8)
+    assert target.rollbacks == 2
+    assert not (tmp_path / 'loan.reject.tsv').exists()
+
+
+def test_lock_errors_fail_unit_after_retries(writer, tmp_path):
+    writer.write_retries = 1
+    target = FakeTarget(lambda batch: InternalError(msg='deadlock', errno=errorcode.ER_LOCK_DEADLOCK))
+    with pytest.raises(InternalError):
+        writer.write_batch(target, target, 'loan', COLUMNS, rows(8))
+    assert target.rollbacks == 2
+    assert not (tmp_path / 'loan.reject.tsv').exists()
+
+
+def test_connection_errors_are_not_bisected(writer, tmp_path):
+    target = FakeTarget(lambda batch: OperationalError(msg='gone away', errno=errorcode.CR_SERVER_GONE_ERROR))
+    with pytest.raises(OperationalError):
+        writer.write_batch(target, target, 'loan', COLUMNS, rows(8))
+    assert target.rollbacks == 1
+    assert not (tmp_path / 'loan.reject.tsv').exists()
@@ -0,0 +1,52 @@
+import pytest
+
+BIBLIO_COLUMNS = ['biblio_id', 'title', 'gmd_id', 'publisher_id', 'publish_place_id']
+
+
+@pytest.fixture
+def relations_merger(merger):
+    merger.analyze_relations()
+    merger.auto_increment_tables = {
+        table: {'column': column, 'max_values': {}}
+        for table, column in [
+            ('biblio', 'biblio_id'), ('mst_gmd', 'gmd_id'),
+            ('mst_publisher', 'publisher_id'), ('mst_place', 'place_id'),
+        ]
+    }
+    return merger
+
+
+def test_place_relation_uses_biblio_column(relations_merger):
+    shifted = relations_merger.get_shifted_columns('biblio', BIBLIO_COLUMNS)
+    assert shifted['publish_place_id'] == ['mst_place']
+    assert 'place_id' not in shifted
+
+
+def test_foreign_keys_are_offset(relations_merger):
+    offsets = {'mst_place': {'source_2': 40}, 'mst_publisher': {'source_2': 7}, 'biblio': {'source_2': 1000}}
+    assert relations_merger.get_column_offsets('biblio', BIBLIO_COLUMNS, offsets, 'source_2') == {
+        'biblio_id': 1000, 'publisher_id': 7, 'publish_place_id': 40
+    }
+
+
+def test_dedupe_remaps_publish_place(relations_merger):
+    relations_merger.id_remap = {('mst_place', 'source_2'): {3: 1}}
+    remapped = relations_merger.get_remapped_columns('biblio', BIBLIO_COLUMNS, 'source_2')
+    assert remapped == {'publish_place_id': {3: 1}}
+
+    offsets = {'mst_place': {'source_2': 40}}
+    transform = relations_merger.make_row_transformer('biblio', BIBLIO_COLUMNS, offsets, 'source_2')
+    # Duplikat diarahkan ke ID kanonik, tempat lain digeser offset
+    assert transform([5, 'Judul', None, None, 3]) == [5, 'Judul', None, None, 1]
+    assert transform([6, 'Judul', None, None, 4]) == [6, 'Judul', None, None, 44]
+
+
+def test_search_biblio_lookup_keys_follow_masters(merger):
+    # Setiap FK yang dipakai join search_biblio harus terdaftar di relasi agar ikut digeser
+    merger.analyze_relations()
+    for master, _, key, foreign_key in merger.SEARCH_BIBLIO_LOOKUPS.values():
+        assert merger.relations[master]['primary_key'] == key
+        assert merger.relations[master]['related_tables']['biblio'] == foreign_key
+    for link, master, _, key, _ in merger.SEARCH_BIBLIO_LISTS.values():
+        if master is not None:
+            assert merger.relations[master]['related_tables'][link] == key
@@ -0,0 +1,78 @@
+import gzip
+
+import pytest
+from mysql.connector.errors import OperationalError
+
+from database_merger import DatabaseMerger
+
+COLUMNS = ['biblio_id', 'topic_id', 'level']
+
+
+class FakeTarget:
+    """Koneksi + cursor target palsu yang menyimpan baris yang di-commit"""
+
+    def __init__(self, committed, fail_after=None):
+        self.committed = committed
+        self.pending = []
+        self.fail_after = fail_after
+        self.rowcount = 0
+
+    def cursor(self):
+        return self
+
+    def execute(self, query, params):
+        if self.fail_after is not None and len(self.committed) >= self.fail_after:
+            raise OperationalError(msg='Lost connection', errno=2013)
+        rows = [tuple(params[i:i + len(COLUMNS)]) for i in range(0, len(params), len(COLUMNS))]
+        self.pending.extend(rows)
+        self.rowcount = len(rows)
+
+    def commit(self):
+        self.committed.extend(self.pending)
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def shard(merger, tmp_path):
+    # biblio_topic tanpa key sendiri: baris yang dimuat dua kali menjadi duplikat
+    rows = [(str(index).encode(), b'7', b'1') for index in range(1, 11)]
+    with gzip.open(tmp_path / 'biblio_topic.tsv.gz', 'wb') as f:
+        merger.write_tsv_rows(f, rows)
+    merger.export_dir = str(tmp_path)
+    merger.batch_size = 3
+    return {
+        'file': 'biblio_topic.tsv.gz', 'table': 'biblio_topic', 'source': 'source_1',
+        'columns': COLUMNS, 'rows': len(rows)
+    }
+
+
+def test_interrupted_shard_resumes_after_last_batch(merger, shard, tmp_path):
+    committed = []
+    merger.get_target_connection = lambda: FakeTarget(committed, fail_after=6)
+    assert not merger.load_export_shard(shard)
+    assert len(committed) == 6
+    assert merger.read_shard_progress(str(tmp_path)) == {shard['file']: 6}
+
+    merger.shard_progress = merger.read_shard_progress(str(tmp_path))
+    merger.get_target_connection = lambda: FakeTarget(committed)
+    assert merger.load_export_shard(shard)
+    assert [row[0] for row in committed] == [str(index).encode() for index in range(1, 11)]
+    assert merger.read_shard_progress(str(tmp_path)) == {shard['file']: None}
+
+
+def test_shard_progress_ignores_torn_line(merger, tmp_path):
+    (tmp_path / 'loaded.txt').write_text('a.tsv.gz\t3\nb.tsv.gz\na.tsv.gz\t6\nb.tsv.gz\t9\nc.tsv.gz')
+    assert merger.read_shard_progress(str(tmp_path)) == {'a.tsv.gz': 6, 'b.tsv.gz': None}
+
+
+def test_sql_literals_stay_on_one_line():
+    assert DatabaseMerger.encode_sql_value(None) == b'NULL'
+    assert DatabaseMerger.encode_sql_value(7) == b'7'
+    assert DatabaseMerger.encode_sql_value(b'\x00\xff') == b"X'00ff'"
+    assert DatabaseMerger.encode_sql_value("it's\na") == b"'it\\'s\\na'"
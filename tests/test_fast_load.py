@@ -0,0 +1,28 @@
+# Pemisahan index sekunder dari CREATE TABLE
+
+CREATE_LOAN = """CREATE TABLE `loan` (
+  `loan_id` int NOT NULL AUTO_INCREMENT,
+  `item_code` varchar(20) DEFAULT NULL,
+  `member_id` varchar(20) DEFAULT NULL,
+  PRIMARY KEY (`loan_id`),
+  UNIQUE KEY `item_member` (`item_code`,`member_id`),
+  KEY `loan_id_idx` (`loan_id`,`member_id`),
+  KEY `member_id` (`member_id`),
+  FULLTEXT KEY `item_code_ft` (`item_code`),
+  CONSTRAINT `fk_member` FOREIGN KEY (`member_id`) REFERENCES `member` (`member_id`)
+) ENGINE=InnoDB"""
+
+
+def test_split_deferred_indexes(merger):
+    create_stmt, deferred = merger.split_deferred_indexes(CREATE_LOAN, ai_column='loan_id')
+    assert deferred == ['KEY `member_id` (`member_id`)', 'FULLTEXT KEY `item_code_ft` (`item_code`)']
+    assert 'UNIQUE KEY `item_member`' in create_stmt
+    assert 'KEY `loan_id_idx`' in create_stmt
+    assert 'CONSTRAINT `fk_member`' in create_stmt
+    assert create_stmt.startswith('CREATE TABLE `loan` (\n')
+    assert create_stmt.endswith('`member_id`)\n) ENGINE=InnoDB')
+
+
+def test_split_deferred_indexes_without_ai_column(merger):
+    _, deferred = merger.split_deferred_indexes(CREATE_LOAN)
+    assert 'KEY `loan_id_idx` (`loan_id`,`member_id`)' in deferred
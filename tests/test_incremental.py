@@ -0,0 +1,128 @@
+import pytest
+
+from database_merger import IdSegments, MergeJournal
+
+SEGMENTS = [(0, 100, 1000), (100, 250, 5000), (250, 300, 9000)]
+
+
+def test_id_segments_boundaries_are_exclusive_low():
+    segments = IdSegments(SEGMENTS)
+    assert segments.map(100) == 1100
+    assert segments.map(101) == 5101
+    assert segments.map(250) == 5250
+    assert segments.map(251) == 9251
+
+
+# Rentang ID baru ditempatkan di atas ID tertinggi target
+
+@pytest.fixture
+def journal(merger, tmp_path):
+    merger.journal = MergeJournal(str(tmp_path / 'journal.sqlite'))
+    yield merger.journal
+    merger.journal.close()
+
+
+def test_delta_segments_follow_target_max(merger, journal):
+    merger.databases = {'source_1': {}, 'source_2': {}}
+    merger.auto_increment_tables = {
+        'biblio': {'column': 'biblio_id', 'max_values': {'source_1': 120, 'source_2': 70}}
+    }
+    merger.get_target_max_values = lambda tables: {'biblio': 150}
+    journal.save_segments({'biblio': {'source_1': [(0, 100, 0)], 'source_2': [(0, 50, 100)]}})
+    marks = {('source_1', 'biblio'): (100, None), ('source_2', 'biblio'): (50, None)}
+
+    segments, current_max_values = merger.allocate_delta_segments(marks)
+    assert [segments['biblio'][db].map(value) for db, value in [('source_1', 101), ('source_2', 51)]] == [151, 171]
+    # Baris lama tetap memakai offset merge penuh
+    assert segments['biblio']['source_2'].map(50) == 150
+    assert current_max_values == {'biblio': 190}
+
+    # Percobaan ulang tidak mengalokasikan rentang yang sudah tercatat
+    again, _ = merger.allocate_delta_segments(marks)
+    assert again['biblio']['source_1'].segments == segments['biblio']['source_1'].segments
+
+
+# Bacaan delta: baris baru di-insert, baris berubah di-upsert
+
+def test_delta_passes_for_auto_increment_table(merger):
+    merger.auto_increment_tables = {'biblio': {'column': 'biblio_id', 'max_values': {}}}
+    marks = {('source_1', 'biblio'): (100, '2026-01-01 00:00:00')}
+    passes = merger.build_delta_passes('source_1', 'biblio', ['biblio_id', 'title', 'last_update'], marks)
+    assert passes == [
+        (' WHERE biblio_id > %s', (100,), False),
+        (' WHERE biblio_id <= %s AND (last_update > %s)', (100, '2026-01-01 00:00:00'), True),
+    ]
+
+
+def test_delta_passes_for_relation_table(merger):
+    merger.analyze_relations()
+    merger.auto_increment_tables = {
+        'biblio': {'column': 'biblio_id', 'max_values': {}},
+        'mst_topic': {'column': 'topic_id', 'max_values': {}},
+    }
+    marks = {
+        ('source_1', 'biblio_topic'): (None, '2026-01-01 00:00:00'),
+        ('source_1', 'biblio'): (100, '2026-01-01 00:00:00'),
+        ('source_1', 'mst_topic'): (20, '2026-01-01 00:00:00'),
+    }
+    passes = merger.build_delta_passes('source_1', 'biblio_topic', ['biblio_id', 'topic_id', 'level'], marks)
+    assert passes == [(' WHERE biblio_id > %s OR topic_id > %s', (100, 20), False)]
+
+
+# Upsert hanya untuk baris yang primary key-nya sudah ada di target
+
+class FakeTarget:
+    """Koneksi + cursor target palsu dengan primary key yang sudah ada di target"""
+
+    def __init__(self, existing):
+        self.existing = existing
+        self.queries = []
+        self.rowcount = 0
+        self.commits = 0
+
+    def execute(self, query, params):
+        self.queries.append((query.split(' (')[0], params))
+        if query.startswith('SELECT'):
+            self.result = [(key,) for key in params if key in self.existing]
+        else:
+            self.rowcount = len(params) // 2
+
+    def fetchall(self):
+        return self.result
+
+    def commit(self):
+        self.commits += 1
+
+
+def use_table(merger):
+    merger.auto_increment_tables = {'item': {'column': 'item_id', 'max_values': {'source_1': 250}}}
+    merger.schema = {'source_1': {'tables': {'item': {
+        'columns': ['item_id', 'item_code'], 'primary_key': ['item_id'], 'max_value': 250, 'rows': 250
+    }}}}
+
+
+def test_upsert_updates_only_existing_keys(merger):
+    use_table(merger)
+    target = FakeTarget(existing={1, 3})
+    rows = [(1, 'B001'), (2, 'B002'), (3, 'B003')]
+    assert merger.execute_insert(target, target, 'item', ['item_id', 'item_code'], rows, upsert=True) == 3
+    assert target.queries == [
+        ('SELECT item_id FROM item WHERE', [1, 2, 3]),
+        ('INSERT INTO item', [1, 'B001', 3, 'B003']),
+        # Baris baru yang bentrok di UNIQUE item_code milik source lain tidak ditimpa
+        ('INSERT IGNORE INTO item', [2, 'B002']),
+    ]
+    assert target.commits == 1
+
+
+def test_upsert_does_not_update_keys(merger):
+    use_table(merger)
+    query = merger.build_insert_query('item', ['item_id', 'item_code'], 2, upsert=True)
+    assert query.endswith('ON DUPLICATE KEY UPDATE item_code = VALUES(item_code)')
+    assert query.count('(%s, %s)') == 2
+
+
+def test_upsert_with_only_keys_falls_back_to_ignore(merger):
+    use_table(merger)
+    query = merger.build_insert_query('item', ['item_id'], 1, upsert=True)
+    assert query == 'INSERT IGNORE INTO item (item_id) VALUES (%s)'
@@ -0,0 +1,38 @@
+from datetime import date, datetime, time as dt_time, timedelta
+
+import pytest
+
+from database_merger import DatabaseMerger
+
+
+# Encode/decode nilai untuk file TSV LOAD DATA
+
+@pytest.mark.parametrize('value', [
+    b'plain',
+    b'tab\there\nnew\rline\0nul\\slash',
+    'teks ünïcödé 漢字'.encode('utf-8'),
+    b'',
+])
+def test_tsv_round_trip(value):
+    encoded = DatabaseMerger.encode_tsv_value(value)
+    assert b'\t' not in encoded and b'\n' not in encoded
+    assert DatabaseMerger.decode_tsv_value(encoded) == value
+
+
+def test_tsv_null_and_literal_backslash_n():
+    assert DatabaseMerger.decode_tsv_value(DatabaseMerger.encode_tsv_value(None)) is None
+    assert DatabaseMerger.decode_tsv_value(DatabaseMerger.encode_tsv_value('\\N')) == b'\\N'
+
+
+@pytest.mark.parametrize('value, expected', [
+    (True, b'1'),
+    (42, b'42'),
+    (datetime(2024, 1, 2, 3, 4, 5), b'2024-01-02 03:04:05'),
+    (date(2024, 1, 2), b'2024-01-02'),
+    (dt_time(3, 4, 5), b'03:04:05'),
+    (timedelta(hours=-26, minutes=-30), b'-26:30:00'),
+    (timedelta(seconds=1, microseconds=5), b'00:00:01.000005'),
+    ({'b', 'a'}, b'a,b'),
+])
+def test_tsv_encodes_connector_types(value, expected):
+    assert DatabaseMerger.encode_tsv_value(value) == expected
@@ -0,0 +1,54 @@
+import pytest
+
+
+# Rentang key untuk merge paralel dan chunk per rentang
+
+def use_table(merger, max_value, rows):
+    merger.auto_increment_tables = {'loan': {'column': 'loan_id', 'max_values': {'source_1': max_value}}}
+    merger.schema = {'source_1': {'tables': {'loan': {
+        'columns': ['loan_id', 'item_code'], 'max_value': max_value, 'rows': rows
+    }}}}
+
+
+def test_compute_key_ranges_cover_all_keys(merger):
+    use_table(merger, max_value=1001, rows=10 ** 6)
+    merger.range_parts = 4
+    key_ranges = merger.compute_key_ranges('source_1', 'loan')
+    assert [part[:2] for part in key_ranges] == [(0, 4), (1, 4), (2, 4), (3, 4)]
+    # Rentang terakhir berhenti di MAX hasil analisis
+    assert key_ranges[0][2] is None and key_ranges[-1][3] == 1001
+    for previous, current in zip(key_ranges, key_ranges[1:]):
+        assert previous[3] == current[2]
+
+
+@pytest.mark.parametrize('max_value, rows, parts', [(1001, 10, 4), (1001, 10 ** 6, 1), (2, 10 ** 6, 4)])
+def test_compute_key_ranges_single_range(merger, max_value, rows, parts):
+    use_table(merger, max_value=max_value, rows=rows)
+    merger.range_parts = parts
+    assert merger.compute_key_ranges('source_1', 'loan') == [None]
+
+
+def test_iter_key_ranges_stop_at_analysed_max(merger):
+    use_table(merger, max_value=250, rows=250)
+    ranges = list(merger.iter_key_ranges('loan', ['loan_id', 'item_code'], 'source_1', 100))
+    assert ranges == [
+        (' WHERE loan_id <= %s', (100,), 100),
+        (' WHERE loan_id > %s AND loan_id <= %s', (100, 200), 200),
+        (' WHERE loan_id > %s AND loan_id <= %s', (200, 250), 250),
+    ]
+
+
+def test_iter_key_ranges_respects_bounds(merger):
+    use_table(merger, max_value=250, rows=250)
+    ranges = list(merger.iter_key_ranges(
+        'loan', ['loan_id', 'item_code'], 'source_1', 100, after_key=50, upper_bound=180
+    ))
+    assert ranges == [
+        (' WHERE loan_id > %s AND loan_id <= %s', (50, 150), 150),
+        (' WHERE loan_id > %s AND loan_id <= %s', (150, 180), 180),
+    ]
+
+
+def test_iter_key_ranges_without_key(merger):
+    use_table(merger, max_value=250, rows=250)
+    assert list(merger.iter_key_ranges('loan', ['item_code'], 'source_1', 100)) == [('', (), None)]
@@ -0,0 +1,141 @@
+import mysql.connector
+import pytest
+from mysql.connector.errors import InterfaceError, PoolError
+
+from database_merger import ConnectionPool, HostLimiter
+
+
+class FakeConnection:
+    unread_result = False
+
+    def __init__(self, **config):
+        self.database = config.get('database')
+        self.closed = False
+        self.executed = []
+
+    def rollback(self):
+        pass
+
+    def ping(self, reconnect=False):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def cursor(self):
+        return self
+
+    def execute(self, statement):
+        self.executed.append(statement)
+
+    def reset_session(self, user_variables=None, session_variables=None):
+        pass
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    connections = []
+
+    def connect(**config):
+        connections.append(FakeConnection(**config))
+        return connections[-1]
+
+    monkeypatch.setattr(mysql.connector, 'connect', connect)
+    return connections
+
+
+def make_pool(limiter, database='db_a'):
+    return ConnectionPool({'host': 'localhost', 'database': database}, max_size=2, timeout=0.1, limiter=limiter)
+
+
+def test_idle_connection_keeps_host_slot(opened):
+    limiter = HostLimiter(max_connections=2, timeout=0.1)
+    pool = make_pool(limiter)
+    pool.get_connection().close()
+    assert limiter._connections == 1
+
+    # Koneksi idle dipakai ulang tanpa slot tambahan
+    conn = pool.get_connection()
+    assert len(opened) == 1 and limiter._connections == 1
+    conn.close()
+
+    pool.close_all()
+    assert limiter._connections == 0 and opened[0].closed
+
+
+def test_full_host_evicts_idle_connections(opened):
+    limiter = HostLimiter(max_connections=1, timeout=0.1)
+    pool_a, pool_b = make_pool(limiter, 'db_a'), make_pool(limiter, 'db_b')
+    pool_a.get_connection().close()
+
+    conn = pool_b.get_connection()
+    assert opened[0].closed and conn.database == 'db_b'
+    assert limiter._connections == 1
+    with pytest.raises(PoolError):
+        pool_a.get_connection()
+    conn.close()
+
+
+def test_failed_connect_releases_slots(monkeypatch):
+    def connect(**config):
+        raise InterfaceError(msg="Can't connect")
+
+    monkeypatch.setattr(mysql.connector, 'connect', connect)
+    limiter = HostLimiter(max_connections=1, max_queries=1, timeout=0.1)
+    with pytest.raises(InterfaceError):
+        make_pool(limiter).get_connection(query=True)
+    assert limiter._connections == 0 and limiter._queries == 0
+
+
+def test_query_connection_holds_query_slot(opened):
+    limiter = HostLimiter(max_queries=1, timeout=0.1)
+    pool = make_pool(limiter)
+    conn = pool.get_connection(query=True)
+    assert not limiter.try_acquire_query()
+    with pytest.raises(PoolError):
+        pool.get_connection(query=True)
+
+    conn.close()
+    assert limiter.try_acquire_query()
+    limiter.release_query()
+    assert limiter._queries == 0
+
+
+def test_stale_idle_connection_is_replaced(opened):
+    limiter = HostLimiter(max_connections=2, timeout=0.1)
+    pool = make_pool(limiter)
+    pool.health_check_interval = 0
+    pool.get_connection().close()
+
+    def ping(reconnect=False):
+        raise InterfaceError(msg='MySQL server has gone away')
+
+    opened[0].ping = ping
+    conn = pool.get_connection()
+    assert len(opened) == 2 and opened[0].closed
+    assert limiter._connections == 1
+    conn.close()
+
+
+def test_exhausted_pool_times_out(opened):
+    limiter = HostLimiter(timeout=0.1)
+    pool = make_pool(limiter)
+    connections = [pool.get_connection(), pool.get_connection()]
+    with pytest.raises(PoolError):
+        pool.get_connection()
+    for conn in connections:
+        conn.close()
+    # Koneksi yang dikembalikan dipakai ulang, bukan dibuka baru
+    pool.get_connection().close()
+    assert len(opened) == 2
+
+
+def test_session_reset_runs_before_reuse(opened):
+    pool = make_pool(HostLimiter())
+    conn = pool.get_connection()
+    conn.reset_statement = "SET SESSION foreign_key_checks = DEFAULT"
+    # Method connector reset_session tidak tertutup atribut proxy
+    assert conn.reset_session == opened[0].reset_session
+    conn.close()
+    assert opened[0].executed == ["SET SESSION foreign_key_checks = DEFAULT"]
+    assert pool.get_connection().reset_statement is None
@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+TABLES = ['mst_gmd', 'biblio', 'item', 'member', 'loan']
+
+
+@pytest.fixture
+def scheduled(merger):
+    merger.analyze_relations()
+    merger.databases = {
+        'source_1': {'host': 'db1', 'port': 3306, 'database': 'slims_a'},
+        'source_2': {'host': 'db2', 'port': 3306, 'database': 'slims_b'},
+    }
+    merger.target_db = {'host': 'db3', 'port': 3306, 'database': 'slims_merged'}
+    merger.schema = {
+        db_name: {'tables': {table: {'columns': [], 'rows': 10, 'data_length': 0} for table in TABLES}}
+        for db_name in merger.databases
+    }
+    return merger
+
+
+def run(merger, fail=()):
+    """Jalankan scheduler dengan unit palsu; (unit gagal, urutan unit selesai)"""
+    finished = []
+    lock = threading.Lock()
+
+    def merge_unit(db_name, db_config, table_name, segments):
+        with lock:
+            finished.append((db_name, table_name))
+        return (db_name, table_name) not in fail
+
+    return merger.run_scheduled_merge({}, merge_unit=merge_unit), finished
+
+
+def test_units_wait_for_parent_tables(scheduled):
+    failed, finished = run(scheduled)
+    assert not failed
+    assert len(finished) == len(TABLES) * 2
+    for db_name in scheduled.databases:
+        order = [table for source, table in finished if source == db_name]
+        for parent, child in [('mst_gmd', 'biblio'), ('biblio', 'item'), ('item', 'loan'), ('member', 'loan')]:
+            assert order.index(parent) < order.index(child)
+
+
+def test_failed_unit_skips_dependents_of_same_source(scheduled):
+    failed, finished = run(scheduled, fail={('source_1', 'biblio')})
+    assert failed == {('source_1', 'biblio'), ('source_1', 'item'), ('source_1', 'loan')}
+    assert ('source_1', 'item') not in finished and ('source_1', 'loan') not in finished
+    # Source lain dan tabel yang tidak bergantung pada biblio tetap berjalan
+    assert ('source_1', 'member') in finished
+    assert {table for source, table in finished if source == 'source_2'} == set(TABLES)
+
+
+def test_query_slots_are_released(scheduled):
+    scheduled.host_limits = {('db3', 3306): (0, 1)}
+    failed, finished = run(scheduled)
+    assert not failed and len(finished) == len(TABLES) * 2
+    assert scheduled.host_limiters[('db3', 3306)].max_queries == 1
+    for limiter in scheduled.host_limiters.values():
+        assert limiter._queries == 0
@@ -0,0 +1,20 @@
+import sqlite3
+
+import pytest
+
+from database_merger import IdSegments
+
+
+# build_id_expression (SQL checksum source) harus memetakan ID sama seperti IdSegments.map
+
+SEGMENTS = [(0, 100, 1000), (100, 250, 5000), (250, 300, 9000)]
+
+
+@pytest.mark.parametrize('ranges', [SEGMENTS, SEGMENTS[:1], [(0, 50, 0)]])
+def test_id_expression_matches_segments(merger, ranges):
+    segments = IdSegments(ranges)
+    expression = merger.build_id_expression('id', ranges)
+    conn = sqlite3.connect(':memory:')
+    for value in (1, 99, 100, 101, 250, 251, 300, 400):
+        (mapped,) = conn.execute(f"SELECT {expression} FROM (SELECT ? AS id)", (value,)).fetchone()
+        assert mapped == segments.map(value), value